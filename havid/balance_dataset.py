@@ -0,0 +1,144 @@
+import argparse
+import json
+import os
+
+import numpy as np
+
+from dataset_layout import GRANULARITIES, HANDS, parse_recording_name
+from label_statistics import compute_statistics
+from record_shards import load_shard_table, record_label, record_media, save_shard_table, write_jsonl_shards
+
+# Configuration (Modify these as needed)
+INPUT_JSON = "./json_split_videos/split_videos_annotations.json"
+OUTPUT_FOLDER = "./json_split_videos/balanced"
+POLICIES = ["oversample", "undersample", "temperature"]
+TEMPERATURE = 2.0       # 1 keeps the corpus label distribution, larger values flatten it
+MAX_REPEAT = 10         # Oversampling never repeats a record more than this many times
+SEED = 0
+
+
+def label_frequencies(classes, record_counts, hand, granularity, views):
+    """
+    Frequency of every class in the annotated corpus, i.e. its number of
+    segments in the label statistics of the given views for hand/granularity.
+    If the statistics do not know some class (e.g. unknown labels), segment
+    counts and record counts would not share one scale, so the record counts
+    of the dataset are used for every class instead, with a warning.
+    """
+    frequencies = np.zeros(len(classes), dtype=np.float64)
+    for stats in compute_statistics()["folders"]:
+        if stats["hand"] != hand or stats["granularity"] != granularity or stats["view"] not in views:
+            continue
+        for c, label in enumerate(classes):
+            if label in stats["labels"]:
+                frequencies[c] += stats["labels"][label]["segments"]
+    missing = [label for label, frequency in zip(classes, frequencies) if frequency == 0]
+    if missing:
+        print(f"[WARNING] No corpus statistics for {', '.join(missing)}; using the record counts of every class")
+        return record_counts.astype(np.float64)
+    return frequencies
+
+
+def target_counts(record_counts, frequencies, policy, temperature=TEMPERATURE, target=None, max_repeat=MAX_REPEAT):
+    """
+    Number of samples to draw from every class:
+      - oversample:  raise every class to target records (default: the
+                     largest class), repeating each record at most max_repeat times
+      - undersample: cap every class at target records (default: the median
+                     class size, as the rarest labels have only a few clips)
+      - temperature: keep the dataset size (or target), distributed in
+                     proportion to frequency ** (1 / temperature)
+    """
+    if policy == "oversample":
+        target = int(record_counts.max()) if target is None else target
+        return np.maximum(record_counts, np.minimum(target, record_counts * max_repeat))
+    if policy == "undersample":
+        target = int(np.median(record_counts)) if target is None else target
+        return np.minimum(record_counts, target)
+    if policy == "temperature":
+        target = int(record_counts.sum()) if target is None else target
+        shares = frequencies ** (1.0 / temperature)
+        counts = np.maximum(np.rint(shares / shares.sum() * target).astype(np.int64), 1)
+        return np.minimum(counts, record_counts * max_repeat)
+    raise ValueError(f"Unknown balancing policy: {policy}")
+
+
+def balanced_indices(class_ids, targets, rng):
+    """
+    Draws targets[c] record indices from every class c: whole copies of the
+    class first, then a random subset without replacement for the rest.
+    Returns the indices in shuffled order.
+    """
+    order = np.argsort(class_ids, kind="stable")
+    members = np.split(order, np.cumsum(np.bincount(class_ids, minlength=len(targets)))[:-1])
+    samples = []
+    for records, target in zip(members, targets):
+        repeats, remainder = divmod(int(target), len(records))
+        samples.append(np.tile(records, repeats))
+        samples.append(rng.choice(records, remainder, replace=False))
+    return rng.permutation(np.concatenate(samples)).astype(np.int32)
+
+
+def balance_dataset(input_json, output_folder, policy, hand="lh", granularity="pt", temperature=TEMPERATURE,
+                    target=None, max_repeat=MAX_REPEAT, seed=SEED):
+    """
+    Writes every record of input_json once into JSONL shards in output_folder
+    (see record_shards), with its label as an extra column of shards.npz, and
+    the balanced sample as <policy>_index.npy: an int32 array of record ids,
+    where oversampled records simply appear several times.
+    """
+    with open(input_json, "r", encoding="utf-8") as f:
+        records = json.load(f)
+
+    labels = np.array([record_label(r) or "unknown" for r in records], dtype=str)
+    classes, class_ids = np.unique(labels, return_inverse=True)
+    record_counts = np.bincount(class_ids, minlength=len(classes))
+
+    views = set()
+    for record in records:
+        media = record_media(record)
+        parsed = parse_recording_name(media[0]) if media else None
+        if parsed is not None:
+            views.add(parsed[1])
+    frequencies = label_frequencies(classes, record_counts, hand, granularity, views)
+
+    targets = target_counts(record_counts, frequencies, policy, temperature, target, max_repeat)
+    indices = balanced_indices(class_ids, targets, np.random.default_rng(seed))
+
+    table = write_jsonl_shards(records, output_folder)
+    save_shard_table(output_folder, table, labels=labels)
+    index_path = os.path.join(output_folder, f"{policy}_index.npy")
+    np.save(index_path, indices)
+
+    for label, before, after in zip(classes, record_counts, targets):
+        print(f"{label}: {before} -> {after}")
+    print(f"{len(records)} records in {len(table['shards'])} shards, {len(indices)} samples in {index_path}")
+    return indices
+
+
+def load_balanced_index(output_folder, policy):
+    """
+    Returns (shard table, record ids) of a balanced dataset; read the records
+    with record_shards.read_record(output_folder, table, record_id).
+    """
+    return load_shard_table(output_folder), np.load(os.path.join(output_folder, f"{policy}_index.npy"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Class-balance a generated fine-tuning dataset.")
+    parser.add_argument("--input", default=INPUT_JSON)
+    parser.add_argument("--output", default=OUTPUT_FOLDER)
+    parser.add_argument("--policy", choices=POLICIES, default="temperature")
+    parser.add_argument("--hand", choices=HANDS, default="lh", help="Hand whose label statistics give the class frequencies")
+    parser.add_argument("--granularity", choices=GRANULARITIES, default="pt")
+    parser.add_argument("--temperature", type=float, default=TEMPERATURE)
+    parser.add_argument("--target", type=int, help="Records per class (over/undersample) or in total (temperature)")
+    parser.add_argument("--max-repeat", type=int, default=MAX_REPEAT)
+    parser.add_argument("--seed", type=int, default=SEED)
+    args = parser.parse_args()
+
+    balance_dataset(args.input, args.output, args.policy, args.hand, args.granularity, args.temperature,
+                    args.target, args.max_repeat, args.seed)
+
+if __name__ == "__main__":
+    main()
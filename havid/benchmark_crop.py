@@ -0,0 +1,114 @@
+import os
+import tempfile
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+# Configuration (Modify these as needed)
+VIDEO_PATH = './trimmed_videos/S02A04I01M0.mp4'   # Video to benchmark; a synthetic one is used if missing
+NUM_FRAMES = 300                                   # Frames to decode per run
+CROP_X = 350                                       # Starting x-coordinate
+CROP_Y = 120                                       # Starting y-coordinate
+CROP_WIDTH = 550                                   # Width of crop region
+CROP_HEIGHT = 550                                  # Height of crop region
+
+
+def make_synthetic_video(path, num_frames, width=1280, height=720, fps=30):
+    """
+    Writes a random-noise .mp4 of the given size so the benchmark can run
+    without the HA-ViD footage.
+    """
+    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+    out = cv2.VideoWriter(path, fourcc, fps, (width, height))
+    rng = np.random.default_rng(0)
+    for _ in range(num_frames):
+        out.write(rng.integers(0, 256, (height, width, 3), dtype=np.uint8))
+    out.release()
+
+
+def crop_per_frame_copy(cap, num_frames):
+    """
+    Original crop loop: a new decode array per frame, and a strided crop view
+    that has to be made contiguous before it can be encoded.
+    """
+    for _ in range(num_frames):
+        ret, frame = cap.read()
+        if not ret:
+            break
+        cropped_frame = frame[CROP_Y:CROP_Y + CROP_HEIGHT, CROP_X:CROP_X + CROP_WIDTH]
+        # VideoWriter.write / imwrite perform this copy implicitly
+        yield np.ascontiguousarray(cropped_frame)
+
+
+def crop_preallocated(cap, num_frames):
+    """
+    Buffered crop loop used by crop_video and extract_frames_cropped: decode
+    into a reused frame buffer and copy the crop into a preallocated output.
+    """
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    frame_buffer = np.empty((height, width, 3), dtype=np.uint8)
+    crop_buffer = np.empty((CROP_HEIGHT, CROP_WIDTH, 3), dtype=np.uint8)
+    for _ in range(num_frames):
+        ret, frame = cap.read(frame_buffer)
+        if not ret:
+            break
+        np.copyto(crop_buffer, frame[CROP_Y:CROP_Y + CROP_HEIGHT, CROP_X:CROP_X + CROP_WIDTH])
+        yield crop_buffer
+
+
+def run_benchmark(video_path, crop_loop, num_frames):
+    """
+    Runs one crop loop over the video and returns
+    (frames, seconds, allocated_bytes_per_frame).
+
+    Allocation churn is measured with tracemalloc: before each frame the peak
+    is reset, so (peak - current) after the frame is the memory that frame
+    allocated, even if it was freed again straight away.
+    """
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        print(f"[ERROR] Could not open video: {video_path}")
+        return 0, 0.0, 0.0
+
+    frames = 0
+    allocated = 0
+    tracemalloc.start()
+    start = time.perf_counter()
+    loop = crop_loop(cap, num_frames)
+    while True:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        crop = next(loop, None)
+        if crop is None:
+            break
+        _, peak = tracemalloc.get_traced_memory()
+        allocated += peak - before
+        frames += 1
+    elapsed = time.perf_counter() - start
+    tracemalloc.stop()
+    cap.release()
+
+    return frames, elapsed, allocated / max(frames, 1)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        video_path = VIDEO_PATH
+        if not os.path.exists(video_path):
+            video_path = os.path.join(tmp_dir, "synthetic.mp4")
+            print(f"[WARNING] {VIDEO_PATH} not found, benchmarking a synthetic video")
+            make_synthetic_video(video_path, NUM_FRAMES)
+
+        for name, crop_loop in [("per-frame copy", crop_per_frame_copy),
+                                ("preallocated", crop_preallocated)]:
+            frames, elapsed, per_frame = run_benchmark(video_path, crop_loop, NUM_FRAMES)
+            fps = frames / elapsed if elapsed > 0 else 0.0
+            print(f"{name:>15}: {frames} frames, {fps:.1f} fps, "
+                  f"{per_frame / 1024:.1f} KiB allocated per frame")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from benchmark_crop import make_synthetic_video
+from video_io import (BACKENDS, ENCODER_PRESETS, backend_available, close_video, close_writer, open_video, open_writer,
+                      read_frame, seek_frame, write_frame)
+
+# Configuration (Modify these as needed)
+VIDEO_PATH = './trimmed_videos/S02A04I01M0.mp4'   # Video to benchmark; a synthetic one is used if missing
+NUM_FRAMES = 300                                   # Frames to decode/encode per run
+THREAD_COUNTS = [1, 0]                             # Decoder threads to compare, 0 = backend default
+NUM_SEEKS = 20                                     # Random seeks checked against sequential decoding
+SEED = 0
+
+
+def available_backends():
+    """
+    Backends whose dependencies are installed.
+    """
+    return [backend for backend in BACKENDS if backend_available(backend)]
+
+
+def decode_benchmark(video_path, backend, threads, num_frames):
+    """
+    Decodes up to num_frames frames sequentially into a reused buffer.
+    Returns (number of frames decoded, seconds, 8x downscaled thumbnails of
+    the decoded frames).
+    """
+    video = open_video(video_path, backend, threads)
+    if video is None:
+        return 0, 0.0, []
+    buffer = np.empty((video["height"], video["width"], 3), dtype=np.uint8)
+    frames = []
+    start = time.perf_counter()
+    while len(frames) < num_frames:
+        frame = read_frame(video, buffer)
+        if frame is None:
+            break
+        frames.append(frame[::8, ::8].copy())   # Thumbnails for the seek check
+    elapsed = time.perf_counter() - start
+    close_video(video)
+    return len(frames), elapsed, frames
+
+
+def seek_benchmark(video_path, backend, threads, reference, num_seeks, seed=SEED):
+    """
+    Seeks to random frames and compares them with the sequentially decoded
+    thumbnails. Returns (seconds per seek, fraction of exact seeks).
+    """
+    if not reference:
+        return 0.0, 0.0
+    video = open_video(video_path, backend, threads)
+    if video is None:
+        return 0.0, 0.0
+    targets = np.random.default_rng(seed).integers(0, len(reference), num_seeks)
+    exact = 0
+    start = time.perf_counter()
+    for target in targets.tolist():
+        seek_frame(video, target)
+        frame = read_frame(video)
+        if frame is not None and np.abs(frame[::8, ::8].astype(np.int16) - reference[target]).mean() < 1.0:
+            exact += 1
+    elapsed = time.perf_counter() - start
+    close_video(video)
+    return elapsed / num_seeks, exact / num_seeks
+
+
+def encode_benchmark(frames_path, output_path, backend, encoder, num_frames):
+    """
+    Re-encodes the first num_frames frames of frames_path (decoded with
+    OpenCV beforehand, so only encoding is timed). Returns (fps, bytes).
+    """
+    video = open_video(frames_path, "opencv")
+    if video is None:
+        return 0.0, 0
+    frames = []
+    while len(frames) < num_frames:
+        frame = read_frame(video)
+        if frame is None:
+            break
+        frames.append(frame)
+    size = (video["width"], video["height"])
+    fps = video["fps"] or 30.0
+    close_video(video)
+
+    start = time.perf_counter()
+    writer = open_writer(output_path, fps, size, backend, encoder)
+    for frame in frames:
+        write_frame(writer, frame)
+    close_writer(writer)
+    elapsed = time.perf_counter() - start
+    return len(frames) / elapsed if elapsed > 0 else 0.0, os.path.getsize(output_path) if os.path.exists(output_path) else 0
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        video_path = VIDEO_PATH
+        if not os.path.exists(video_path):
+            video_path = os.path.join(tmp_dir, "synthetic.mp4")
+            print(f"[WARNING] {VIDEO_PATH} not found, benchmarking a synthetic video")
+            make_synthetic_video(video_path, NUM_FRAMES)
+
+        backends = available_backends()
+        print(f"Backends: {', '.join(backends)} (missing: {', '.join(b for b in BACKENDS if b not in backends) or 'none'})")
+
+        print("Decoding:")
+        for backend in backends:
+            for threads in THREAD_COUNTS:
+                frames, elapsed, reference = decode_benchmark(video_path, backend, threads, NUM_FRAMES)
+                seek_time, exact = seek_benchmark(video_path, backend, threads, reference, NUM_SEEKS)
+                fps = frames / elapsed if elapsed > 0 else 0.0
+                print(f"  {backend:>7}, {threads or 'auto':>4} threads: {fps:7.1f} fps, "
+                      f"{seek_time * 1000:6.1f} ms per seek, {exact:.0%} exact seeks")
+
+        print("Encoding:")
+        for backend in backends:
+            for encoder in ENCODER_PRESETS:
+                output_path = os.path.join(tmp_dir, f"{backend}_{encoder}.mp4")
+                try:
+                    fps, size = encode_benchmark(video_path, output_path, backend, encoder, NUM_FRAMES)
+                except (RuntimeError, ValueError, OSError) as e:
+                    print(f"  {backend:>7}, {encoder:>5}: [ERROR] {e}")
+                    continue
+                print(f"  {backend:>7}, {encoder:>5}: {fps:7.1f} fps, {size / 1024:.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
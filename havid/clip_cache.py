@@ -0,0 +1,254 @@
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from frame_cache import cached_frame, close_frame_cache, open_frame_cache
+from output_profile import resize_frame
+
+# Configuration (Modify these as needed)
+INPUT_JSON = "./json_split_videos/split_videos_annotations.json"
+CACHE_FOLDER = "./json_split_videos/clip_cache"
+FRAMES_PER_CLIP = 8         # Frames sampled uniformly over every clip (short clips repeat frames)
+FRAME_SIZE = (448, 448)     # (width, height) every sampled frame is resized to
+CACHE_BYTES = 16 << 30      # Disk budget of the decoded frames; least recently used clips are evicted beyond it
+DATA_FILE = "frames.u8"     # Raw uint8 array (slots, frames, height, width, 3), memory-mapped
+INDEX_FILE = "index.npz"
+
+
+def sample_indices(num_frames, frames_per_clip=FRAMES_PER_CLIP):
+    """
+    Frame numbers of frames_per_clip frames spread uniformly over a clip.
+    """
+    return np.linspace(0, max(num_frames - 1, 0), frames_per_clip).round().astype(int)
+
+
+def decode_clip(video_path, frames_per_clip=FRAMES_PER_CLIP, frame_size=FRAME_SIZE):
+    """
+    Decodes the sampled frames of a clip, resized to frame_size. Returns a
+    uint8 array (frames_per_clip, height, width, 3), or None if the clip
+    cannot be read or a frame inside it fails to decode. Missing frames at
+    the end (clips shorter than their container reports) repeat the last
+    decoded frame, with a warning.
+    """
+    cache = open_frame_cache(video_path, capacity=frames_per_clip,
+                             transform=lambda frame: resize_frame(frame, frame_size))
+    if cache is None:
+        return None
+    frame_numbers = sample_indices(cache["num_frames"], frames_per_clip).tolist()
+    frames = [cached_frame(cache, frame_number) for frame_number in frame_numbers]
+    close_frame_cache(cache)
+
+    num_decoded = next((i for i, frame in enumerate(frames) if frame is None), len(frames))
+    if num_decoded == 0:
+        return None
+    if any(frame is not None for frame in frames[num_decoded:]):
+        # A gap would shift every later sample in time, so the clip is not used
+        print(f"[ERROR] Could not decode frame {frame_numbers[num_decoded]} of {video_path}")
+        return None
+    if num_decoded < len(frames):
+        print(f"[WARNING] {video_path} ends before frame {frame_numbers[num_decoded]}, "
+              f"repeating frame {frame_numbers[num_decoded - 1]}")
+        frames[num_decoded:] = [frames[num_decoded - 1]] * (len(frames) - num_decoded)
+    return np.stack(frames)
+
+
+def _empty_index(num_slots):
+    return {
+        "keys": [""] * num_slots,                           # Absolute clip path of every slot, "" if free
+        "mtimes": np.zeros(num_slots, dtype=np.float64),    # Clip modification time when it was cached
+        "last_used": np.full(num_slots, -1, dtype=np.int64),
+    }
+
+
+def _load_index(index_path, slot_shape, num_slots):
+    if not os.path.exists(index_path):
+        return None
+    with np.load(index_path) as index:
+        if tuple(index["slot_shape"]) != slot_shape or len(index["keys"]) != num_slots:
+            return None
+        return {"keys": index["keys"].tolist(), "mtimes": index["mtimes"], "last_used": index["last_used"]}
+
+
+def open_clip_cache(input_json=INPUT_JSON, cache_folder=CACHE_FOLDER, frames_per_clip=FRAMES_PER_CLIP,
+                    frame_size=FRAME_SIZE, cache_bytes=CACHE_BYTES, writable=True):
+    """
+    Opens the pre-decoded clip cache of a generated JSON. Every clip occupies
+    one fixed-size slot of a memory-mapped frame file; the index maps clip
+    paths to slots. Clips that are not cached yet (or changed since) are
+    decoded on first use and, if writable, stored in the least recently used
+    slot, so later epochs read frames straight from the page cache.
+
+    Open the cache read-only in data loader workers: several writers would
+    race on the slots. Misses are then decoded but not stored, so build the
+    cache first (build_clip_cache or one writable epoch).
+
+    The cache is a dictionary; use record_frames to read from it and
+    close_clip_cache to save its index. Returns None if a read-only cache
+    does not exist or was built with other settings.
+    """
+    with open(input_json, "r", encoding="utf-8") as f:
+        records = json.load(f)
+    width, height = frame_size
+    slot_shape = (frames_per_clip, height, width, 3)
+    num_slots = max(cache_bytes // int(np.prod(slot_shape)), 1)
+    data_path = os.path.join(cache_folder, DATA_FILE)
+    index_path = os.path.join(cache_folder, INDEX_FILE)
+
+    index = _load_index(index_path, slot_shape, num_slots)
+    if index is None or not os.path.exists(data_path):
+        if not writable:
+            print(f"[ERROR] No clip cache with {frames_per_clip} frames of {width}x{height} in {cache_folder}")
+            return None
+        if os.path.exists(index_path):
+            print(f"[WARNING] Clip cache settings changed, rebuilding {cache_folder}")
+        os.makedirs(cache_folder, exist_ok=True)
+        index = _empty_index(num_slots)
+        data = np.memmap(data_path, dtype=np.uint8, mode="w+", shape=(num_slots,) + slot_shape)
+    else:
+        data = np.memmap(data_path, dtype=np.uint8, mode="r+" if writable else "r", shape=(num_slots,) + slot_shape)
+
+    return {
+        "records": records,
+        "base_folder": os.path.dirname(input_json),
+        "cache_folder": cache_folder,
+        "frames_per_clip": frames_per_clip,
+        "frame_size": frame_size,
+        "writable": writable,
+        "data": data,
+        "slot_shape": slot_shape,
+        "keys": index["keys"],
+        "saved_keys": list(index["keys"]),      # Slot keys of the index on disk
+        "slots": {key: slot for slot, key in enumerate(index["keys"]) if key},   # clip path -> slot
+        "mtimes": index["mtimes"],
+        "last_used": index["last_used"],
+        "clock": int(index["last_used"].max()),
+        "hits": 0,
+        "misses": 0,
+    }
+
+
+def _touch(cache, slot):
+    cache["clock"] += 1
+    cache["last_used"][slot] = cache["clock"]
+
+
+def clip_frames(cache, video_path):
+    """
+    Returns the sampled frames of a clip from the cache, decoding and
+    caching it on a miss, or None if the clip cannot be read. Cached frames
+    are a read-only view into the memory map; copy them to keep them past
+    the next miss of a writable cache, which may reuse the slot.
+    """
+    key = os.path.abspath(video_path)
+    try:
+        mtime = os.path.getmtime(key)
+    except OSError:
+        print(f"[ERROR] Missing clip: {video_path}")
+        return None
+
+    slot = cache["slots"].get(key)
+    if slot is not None and cache["mtimes"][slot] == mtime:
+        cache["hits"] += 1
+        _touch(cache, slot)
+        frames = cache["data"][slot]
+        frames.flags.writeable = False
+        return frames
+
+    cache["misses"] += 1
+    frames = decode_clip(video_path, cache["frames_per_clip"], cache["frame_size"])
+    if frames is None or not cache["writable"]:
+        return frames
+
+    if slot is None:
+        # Free slots have last_used -1, so they are filled before anything is evicted
+        slot = int(np.argmin(cache["last_used"]))
+        cache["slots"].pop(cache["keys"][slot], None)
+        cache["keys"][slot] = ""
+        if cache["saved_keys"][slot]:
+            # The index on disk still maps the slot to the evicted clip: free it there before
+            # overwriting the frames, so an interrupted run cannot serve them as that clip
+            save_clip_cache(cache)
+        cache["keys"][slot] = key
+        cache["slots"][key] = slot
+    cache["data"][slot] = frames
+    cache["mtimes"][slot] = mtime
+    _touch(cache, slot)
+    return frames
+
+
+def record_frames(cache, record_id):
+    """
+    Returns the sampled frames of every clip in the "videos" field of a
+    record, one array per clip, with None for clips that cannot be read.
+    record_id is the record's position in the JSON array, the same id
+    dataset_reader and dedup_dataset use, not an "id" field of the record.
+    """
+    if not 0 <= record_id < len(cache["records"]):
+        raise IndexError(f"Record {record_id} is out of range, the JSON has {len(cache['records'])} records")
+    record = cache["records"][record_id]
+    return [clip_frames(cache, os.path.join(cache["base_folder"], path)) for path in record.get("videos", [])]
+
+
+def save_clip_cache(cache):
+    """
+    Flushes the frames and writes the index, replacing the previous one only
+    once the new one is complete.
+    """
+    if not cache["writable"]:
+        return
+    cache["data"].flush()
+    index_path = os.path.join(cache["cache_folder"], INDEX_FILE)
+    with open(index_path + ".tmp", "wb") as f:
+        np.savez(f, keys=np.array(cache["keys"], dtype=str), mtimes=cache["mtimes"], last_used=cache["last_used"],
+                 slot_shape=np.array(cache["slot_shape"]))
+    os.replace(index_path + ".tmp", index_path)
+    cache["saved_keys"] = list(cache["keys"])
+
+
+def close_clip_cache(cache):
+    """
+    Saves a writable cache and returns (cache hits, decoded clips).
+    """
+    save_clip_cache(cache)
+    del cache["data"]
+    return cache["hits"], cache["misses"]
+
+
+def build_clip_cache(input_json=INPUT_JSON, cache_folder=CACHE_FOLDER, frames_per_clip=FRAMES_PER_CLIP,
+                     frame_size=FRAME_SIZE, cache_bytes=CACHE_BYTES):
+    """
+    Decodes every clip of a generated JSON into the cache once, so training
+    epochs do not decode video. Clips already cached and unchanged are kept.
+    """
+    cache = open_clip_cache(input_json, cache_folder, frames_per_clip, frame_size, cache_bytes)
+    num_clips = len({path for record in cache["records"] for path in record.get("videos", [])})
+    if num_clips > len(cache["keys"]):
+        print(f"[WARNING] {num_clips} clips do not fit the {len(cache['keys'])} slots of the cache budget, "
+              f"the least recently used ones will be evicted")
+
+    start = time.perf_counter()
+    for record_id in range(len(cache["records"])):
+        record_frames(cache, record_id)
+        if (record_id + 1) % 1000 == 0:
+            print(f"  {record_id + 1}/{len(cache['records'])} records")
+            save_clip_cache(cache)
+    hits, misses = close_clip_cache(cache)
+    print(f"Cached {misses} clips ({hits} already cached) in {time.perf_counter() - start:.1f} s: {cache_folder}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Decode the clips of a generated JSON once into a frame cache.")
+    parser.add_argument("--input", default=INPUT_JSON)
+    parser.add_argument("--cache", default=CACHE_FOLDER)
+    parser.add_argument("--frames", type=int, default=FRAMES_PER_CLIP)
+    parser.add_argument("--size", type=int, nargs=2, default=FRAME_SIZE, metavar=("WIDTH", "HEIGHT"))
+    parser.add_argument("--cache-gb", type=float, default=CACHE_BYTES / (1 << 30))
+    args = parser.parse_args()
+
+    build_clip_cache(args.input, args.cache, args.frames, tuple(args.size), int(args.cache_gb * (1 << 30)))
+
+if __name__ == "__main__":
+    main()
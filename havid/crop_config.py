@@ -0,0 +1,55 @@
+import json
+import os
+
+import numpy as np
+
+# Crop region (x, y, width, height) for each camera view.
+# The View0 box was hand-tuned on the workbench; adjust the others per camera.
+CROP_REGIONS = {
+    "View0": (350, 120, 550, 550),
+    "View1": (350, 120, 550, 550),
+    "View2": (350, 120, 550, 550),
+}
+
+# Optional per-recording workspace ROIs, e.g. {"S01A04I01M0": [x, y, w, h]}.
+# When a recording is listed here its ROI replaces the view's default box.
+ROI_CACHE_FILE = "./roi_cache.json"
+
+# Per-process frame/crop buffers, reused across all videos a process handles
+_buffers = {}
+
+
+def load_roi_cache(file_path=ROI_CACHE_FILE):
+    """
+    Reads the per-recording ROI file and returns a dictionary mapping
+    recording name -> (x, y, width, height). Returns {} if the file is missing.
+    """
+    if not os.path.exists(file_path):
+        return {}
+    with open(file_path, "r", encoding="utf-8") as f:
+        return {name: tuple(region) for name, region in json.load(f).items()}
+
+
+def get_crop_region(view, video_name=None, roi_cache=None):
+    """
+    Returns the crop region (x, y, width, height) for a video of the given view.
+    If video_name (a recording or clip filename) has an entry in roi_cache,
+    the detected ROI is returned instead of the view's default box.
+    """
+    if video_name is not None and roi_cache:
+        recording = os.path.splitext(os.path.basename(video_name))[0].split("_")[0]
+        if recording in roi_cache:
+            return roi_cache[recording]
+    return CROP_REGIONS[view]
+
+
+def get_buffer(name, shape):
+    """
+    Returns a uint8 buffer of the given shape, allocating it only when the
+    requested shape differs from the previous one under the same name.
+    """
+    buffer = _buffers.get(name)
+    if buffer is None or buffer.shape != shape:
+        buffer = np.empty(shape, dtype=np.uint8)
+        _buffers[name] = buffer
+    return buffer
@@ -1,61 +1,112 @@
-import cv2
+import numpy as np
 import os
+from multiprocessing import Pool
+
+from crop_config import get_buffer, get_crop_region, load_roi_cache
+from dataset_layout import HANDS, VIEWS, view_hand_videos
+from output_profile import OUTPUT_PROFILES, keep_frame, output_fps, output_size, resize_frame
+from video_io import check_writer, close_video, close_writer, open_video, open_writer, read_frame, write_frame
 
 # Configuration (Modify these as needed)
-INPUT_DIR = './split_videos_no_w/lh_v0'          # Folder containing videos
-OUTPUT_DIR = './cropped_videos/lh_v0'      # Folder to save cropped videos
-CROP_X = 350                                # Starting x-coordinate
-CROP_Y = 120                                # Starting y-coordinate
-CROP_WIDTH = 550                            # Width of crop region
-CROP_HEIGHT = 550                           # Height of crop region
-
-def crop_videos():
-    # Create output directory if it doesn't exist
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
-    
-    # Supported video file extensions
-    VIDEO_EXTENSIONS = {'mp4', 'avi', 'mov', 'mkv', 'flv', 'wmv'}
-    
-    # Process each file in input directory
-    for filename in os.listdir(INPUT_DIR):
-        # Check if file is a video
-        ext = filename.split('.')[-1].lower()
-        if ext not in VIDEO_EXTENSIONS:
-            continue
-        
-        video_path = os.path.join(INPUT_DIR, filename)
-        cap = cv2.VideoCapture(video_path)
-        
-        if not cap.isOpened():
-            print(f"Error opening video: {filename}")
+INPUT_ROOT = './split_videos_no_w'          # Contains one folder per hand/view, e.g. lh_v0
+OUTPUT_ROOT = './cropped_videos'            # Cropped videos are saved to the same sub-folder names
+NUM_WORKERS = os.cpu_count()                # Worker processes for the batch
+OUTPUT_PROFILE = OUTPUT_PROFILES["source"]  # Resolution/fps profile for the cropped clips
+
+
+def crop_video(video_path, output_path, crop_region, profile=OUTPUT_PROFILE):
+    """
+    Crops every frame of video_path to crop_region (x, y, width, height)
+    and writes the result to output_path, resized and frame-sampled
+    according to the output profile.
+    Returns True on success.
+    """
+    crop_x, crop_y, crop_width, crop_height = crop_region
+    filename = os.path.basename(video_path)
+
+    video = open_video(video_path)
+    if video is None:
+        return False
+
+    # Get video properties
+    fps, width, height = video["fps"], video["width"], video["height"]
+
+    # Skip videos the crop region does not fit into
+    if crop_x + crop_width > width or crop_y + crop_height > height:
+        print(f"Skipping {filename} (crop region exceeds frame size {width}x{height})")
+        close_video(video)
+        return False
+
+    # read_frame() decodes into frame_buffer in place and the crop is copied into
+    # crop_buffer, so no new arrays are created inside the frame loop
+    frame_buffer = get_buffer("frame", (height, width, 3))
+    crop_buffer = get_buffer("crop", (crop_height, crop_width, 3))
+    out_size = output_size(crop_width, crop_height, profile)
+    resize_buffer = get_buffer("resize", (out_size[1], out_size[0], 3))
+
+    # Create the writer with the profile's encoder preset and backend
+    out = open_writer(output_path, output_fps(fps, profile), out_size, profile["backend"], profile["encoder"])
+
+    # Process each frame
+    frame_index = 0
+    while True:
+        frame = read_frame(video, frame_buffer)
+        if frame is None:
+            break
+        keep = keep_frame(frame_index, fps, profile)
+        frame_index += 1
+        if not keep:
             continue
-        
-        # Get video properties
-        fps = cap.get(cv2.CAP_PROP_FPS)
-        
-        # Define the codec and create VideoWriter object
-        fourcc = cv2.VideoWriter_fourcc(*'mp4v')  # Codec for MP4
-        output_filename = f"{os.path.splitext(filename)[0]}_cropped.mp4"
-        output_path = os.path.join(OUTPUT_DIR, output_filename)
-        out = cv2.VideoWriter(output_path, fourcc, fps, (CROP_WIDTH, CROP_HEIGHT))
-        
-        # Process each frame
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
-            
-            # Crop the frame
-            cropped_frame = frame[
-                CROP_Y:CROP_Y + CROP_HEIGHT,
-                CROP_X:CROP_X + CROP_WIDTH
-            ]
-            out.write(cropped_frame)
-        
-        # Release resources
-        cap.release()
-        out.release()
-        print(f"Processed {filename} - Cropped video saved as {output_filename}")
+
+        # Crop the frame into the preallocated contiguous buffer
+        np.copyto(crop_buffer, frame[
+            crop_y:crop_y + crop_height,
+            crop_x:crop_x + crop_width
+        ])
+        write_frame(out, resize_frame(crop_buffer, out_size, resize_buffer))
+
+    # Release resources
+    close_video(video)
+    close_writer(out)
+    return True
+
+
+def _crop_task(task):
+    video_path, output_path, crop_region, profile = task
+    if not crop_video(video_path, output_path, crop_region, profile):
+        return False
+    print(f"Processed {os.path.basename(video_path)} - Cropped video saved as {os.path.basename(output_path)}")
+    return True
+
+
+def collect_crop_tasks(input_root, output_root, views=VIEWS, hands=HANDS, roi_cache=None, profile=OUTPUT_PROFILE):
+    """
+    Builds the list of (video_path, output_path, crop_region, profile) tasks for every
+    view/hand folder under input_root, creating the output folders.
+    """
+    tasks = []
+    for view, video_path, output_dir in view_hand_videos(input_root, output_root, views, hands):
+        output_filename = f"{os.path.splitext(os.path.basename(video_path))[0]}_cropped.mp4"
+        tasks.append((
+            video_path,
+            os.path.join(output_dir, output_filename),
+            get_crop_region(view, video_path, roi_cache),
+            profile,
+        ))
+    return tasks
+
+
+def crop_videos(input_root=INPUT_ROOT, output_root=OUTPUT_ROOT, views=VIEWS, hands=HANDS, num_workers=NUM_WORKERS, profile=OUTPUT_PROFILE):
+    """
+    Crops all views x hands in one run. Every video is an independent task,
+    so the whole matrix is scheduled on a single worker pool. A profile whose
+    encoder cannot be written fails here, before any worker starts.
+    """
+    check_writer(profile["backend"], profile["encoder"])
+    tasks = collect_crop_tasks(input_root, output_root, views, hands, load_roi_cache(), profile)
+    with Pool(num_workers) as pool:
+        num_cropped = sum(pool.imap_unordered(_crop_task, tasks, chunksize=4))
+    print(f"Cropped {num_cropped}/{len(tasks)} videos from {input_root} into {output_root}")
 
 if __name__ == "__main__":
-    crop_videos()
\ No newline at end of file
+    crop_videos()
@@ -0,0 +1,94 @@
+import os
+
+# Camera views and hands as they appear in groundTruth/ and splits/
+VIEWS = ["View0", "View1", "View2"]
+HANDS = ["lh", "rh"]
+
+# Annotation granularities: primitive tasks and atomic actions
+GRANULARITIES = ["pt", "aa"]
+SPLITS = ["train", "test"]
+
+# Short view tag used in the output folder names (e.g. split_videos/lh_v0)
+VIEW_FOLDER_TAGS = {"View0": "v0", "View1": "v1", "View2": "v2"}
+
+# Suffix of the recording names for each view (e.g. S01A04I01M0, S01A04I01S1)
+VIEW_FILE_SUFFIXES = {"View0": "M0", "View1": "S1", "View2": "S2"}
+
+# Supported video file extensions
+VIDEO_EXTENSIONS = {'mp4', 'avi', 'mov', 'mkv', 'flv', 'wmv'}
+
+
+def view_hand_folder(view, hand):
+    """
+    Returns the folder name used for one view/hand combination by the
+    split/crop/extract outputs, e.g. ("View0", "lh") -> "lh_v0".
+    """
+    return f"{hand}_{VIEW_FOLDER_TAGS[view]}"
+
+
+def view_hand_videos(input_root, output_root, views=VIEWS, hands=HANDS):
+    """
+    Yields (view, video_path, output_dir) for every video in the view/hand
+    folders of input_root (e.g. split_videos/lh_v0), creating the folder of
+    the same name under output_root. Missing input folders are skipped with
+    a warning.
+    """
+    for view in views:
+        for hand in hands:
+            folder = view_hand_folder(view, hand)
+            input_dir = os.path.join(input_root, folder)
+            output_dir = os.path.join(output_root, folder)
+            if not os.path.isdir(input_dir):
+                print(f"[WARNING] Missing input folder: {input_dir}")
+                continue
+
+            # Create output directory if it doesn't exist
+            os.makedirs(output_dir, exist_ok=True)
+
+            for filename in sorted(os.listdir(input_dir)):
+                # Check if file is a video
+                ext = filename.split('.')[-1].lower()
+                if ext not in VIDEO_EXTENSIONS:
+                    continue
+                yield view, os.path.join(input_dir, filename), output_dir
+
+
+def parse_recording_name(name):
+    """
+    Given a recording name like 'S01A04I01M0' (optionally with an extension
+    or a clip suffix such as 'S01A04I01M0_ibacb_3.mp4'), extract:
+      - recording = 'S01A04I01'  (subject, assembly and instance, shared by all views)
+      - view      = 'View0'
+
+    Returns (recording, view), or None if the name has no known view suffix.
+    """
+    name = os.path.splitext(os.path.basename(name))[0].split("_")[0]
+    for view, suffix in VIEW_FILE_SUFFIXES.items():
+        if name.endswith(suffix):
+            return name[:-len(suffix)], view
+    return None
+
+
+def annotation_folder(ground_truth_root, view, hand, granularity):
+    """
+    Returns the folder holding the per-frame annotation files of one
+    view/hand/granularity, e.g. ./groundTruth/View0/lh_pt.
+    """
+    return os.path.join(ground_truth_root, view, f"{hand}_{granularity}")
+
+
+def bundle_path(splits_root, view, hand, granularity, split, split_index=1):
+    """
+    Returns the path of a split bundle, e.g.
+    ./splits/View0/lh_pt/test.split1.bundle.
+    """
+    return os.path.join(splits_root, view, f"{hand}_{granularity}", f"{split}.split{split_index}.bundle")
+
+
+def read_bundle(file_path):
+    """
+    Reads a split bundle (one annotation filename per line, e.g.
+    'S02A04I01M0.txt') and returns the recording names without extension.
+    """
+    with open(file_path, "r", encoding="utf-8") as f:
+        return [os.path.splitext(line.strip())[0] for line in f if line.strip()]
@@ -0,0 +1,321 @@
+import argparse
+import json
+import os
+import re
+import tarfile
+import time
+
+import numpy as np
+
+from dataset_layout import HANDS, SPLITS, bundle_path, parse_recording_name, read_bundle
+from export_tar_shards import read_tar_record
+from record_shards import SHARD_TABLE_FILE, load_shard_table, record_label, record_media, replace_record_media
+from semantic_mappings import answer_hand
+
+# Configuration (Modify these as needed)
+INPUT_PATH = "./json_split_videos/split_videos_annotations.json"   # JSON, JSONL, or a JSONL/tar shard folder
+SPLITS_ROOT = "./splits"
+INDEX_SUFFIX = ".index.npz"             # Index of a JSON/JSONL file, saved next to it
+FOLDER_INDEX_FILE = "reader_index.npz"  # Index of a shard folder, saved inside it
+COLUMNS = ["label", "recording", "view", "hand"]
+
+SEPARATOR = re.compile(r"[\s,]*")
+
+
+def record_columns(record):
+    """
+    Filter columns of a record, parsed from its first media path:
+    label, recording (e.g. S01A04I01) and view, plus the hand from a
+    view/hand folder in the path (e.g. split_videos/lh_v0) or else from the
+    hand named in the question. Unknown values are "".
+    """
+    media = record_media(record)
+    parsed = parse_recording_name(media[0]) if media else None
+    recording, view = parsed if parsed is not None else ("", "")
+    folders = os.path.dirname(media[0]).replace("\\", "/").split("/") if media else []
+    hands = [folder.split("_")[0] for folder in folders if folder.split("_")[0] in HANDS]
+    if hands:
+        hand = hands[-1]
+    else:
+        messages = record.get("messages") or record.get("conversations") or []
+        hand = answer_hand(messages[0].get("content", "")) if messages else "unknown"
+    return {"label": record_label(record) or "", "recording": recording, "view": view,
+            "hand": hand if hand in HANDS else ""}
+
+
+def scan_json_array(path):
+    """
+    Byte offset and length of every element of a JSON array file, with the
+    parsed elements. The whole file is parsed once here; readers then seek
+    to single records.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    text = data.decode("utf-8")
+    ascii_only = text.isascii()
+    decoder = json.JSONDecoder()
+
+    offsets, lengths, records = [], [], []
+    position = SEPARATOR.match(text, text.index("[") + 1).end()
+    byte_position = len(text[:position].encode("utf-8"))
+    while text[position] != "]":
+        record, end = decoder.raw_decode(text, position)
+        length = end - position if ascii_only else len(text[position:end].encode("utf-8"))
+        offsets.append(byte_position)
+        lengths.append(length)
+        records.append(record)
+        next_position = SEPARATOR.match(text, end).end()
+        gap = next_position - end if ascii_only else len(text[end:next_position].encode("utf-8"))
+        byte_position += length + gap
+        position = next_position
+    return offsets, lengths, records
+
+
+def scan_jsonl(path):
+    """
+    Byte offset and length of every non-empty line of a JSONL file, with the
+    parsed records.
+    """
+    offsets, lengths, records = [], [], []
+    position = 0
+    with open(path, "rb") as f:
+        for line in f:
+            stripped = line.rstrip(b"\r\n")
+            if stripped.strip():
+                offsets.append(position)
+                lengths.append(len(stripped))
+                records.append(json.loads(stripped))
+            position += len(line)
+    return offsets, lengths, records
+
+
+def _read_tar_json(f, offset):
+    # The record's JSON is the first member of its span (see export_tar_shards.add_record)
+    f.seek(offset)
+    info = tarfile.TarInfo.frombuf(f.read(tarfile.BLOCKSIZE), tarfile.ENCODING, "surrogateescape")
+    return f.read(info.size)
+
+
+def _source_files(path):
+    """
+    Returns (kind, data files, files the index depends on) of a reader source.
+    """
+    if not os.path.isdir(path):
+        kind = "jsonl" if path.lower().endswith(".jsonl") else "json"
+        return kind, [path], [path]
+    table = load_shard_table(path)
+    files = [os.path.join(path, str(name)) for name in table["shards"]]
+    kind = "tar" if files and files[0].endswith(".tar") else "jsonl_shards"
+    return kind, files, files + [os.path.join(path, SHARD_TABLE_FILE)]
+
+
+def build_index(path):
+    """
+    Builds the reader index of a source: per record, its data file
+    ("shard"), byte offset and length, the filter columns (see
+    record_columns) and its id in the JSON it was generated as ("source",
+    differs for tar shards that skipped records). Every record is parsed once.
+    """
+    kind, files, _ = _source_files(path)
+    index = {"shard": [], "offset": [], "length": []}
+    columns = {column: [] for column in COLUMNS}
+
+    if kind in ("json", "jsonl"):
+        offsets, lengths, records = scan_json_array(path) if kind == "json" else scan_jsonl(path)
+        index["shard"] = [0] * len(offsets)
+        index["offset"], index["length"] = offsets, lengths
+        index["source"] = list(range(len(offsets)))
+    else:
+        table = load_shard_table(path)
+        index["shard"], index["offset"], index["length"] = table["shard"], table["offset"], table["length"]
+        index["source"] = table.get("source", np.arange(len(table["shard"])))
+        reader = {"kind": kind, "files": files, "index": index, "handles": {}, "pid": os.getpid()}
+        records = [read_record(reader, record_id) for record_id in range(len(table["shard"]))]
+        close_dataset_reader(reader)
+
+    if kind == "tar" and "media" in table:
+        # Tar records name their media by member; the columns come from the original paths
+        records = [replace_record_media(record, [path]) for record, path in zip(records, table["media"].tolist())]
+    for record in records:
+        for column, value in record_columns(record).items():
+            columns[column].append(value)
+    return {
+        "shard": np.asarray(index["shard"], dtype=np.int32),
+        "offset": np.asarray(index["offset"], dtype=np.int64),
+        "length": np.asarray(index["length"], dtype=np.int64),
+        "source": np.asarray(index["source"], dtype=np.int64),
+        **{column: np.array(values, dtype=str) for column, values in columns.items()},
+    }
+
+
+def index_path(path):
+    if os.path.isdir(path):
+        return os.path.join(path, FOLDER_INDEX_FILE)
+    return path + INDEX_SUFFIX
+
+
+def load_index(path):
+    """
+    Loads the reader index of a source, rebuilding it when it is missing or
+    older than any of the source's files.
+    """
+    _, _, dependencies = _source_files(path)
+    cache_path = index_path(path)
+    if os.path.exists(cache_path) and os.path.getmtime(cache_path) >= max(os.path.getmtime(p) for p in dependencies):
+        with np.load(cache_path) as cache:
+            if all(column in cache.files for column in COLUMNS):
+                return {key: cache[key] for key in cache.files}
+
+    start = time.perf_counter()
+    index = build_index(path)
+    np.savez(cache_path, **index)
+    print(f"Indexed {len(index['offset'])} records of {path} in {time.perf_counter() - start:.1f} s")
+    return index
+
+
+def open_dataset_reader(path=INPUT_PATH):
+    """
+    Opens a generated dataset for random access without loading it: a JSON
+    array file, a JSONL file, a JSONL shard folder (record_shards) or a tar
+    shard folder (export_tar_shards). Only the index is held in memory
+    (a few numpy arrays); records are read with one seek and decoded on
+    access.
+
+    The reader is a dictionary and can be passed to data loader workers:
+    files are opened lazily in every process (close_dataset_reader first
+    when workers are spawned, open files cannot be pickled). A PyTorch
+    Dataset only needs to keep the reader and the selected record ids, and
+    call read_record in __getitem__.
+    """
+    kind, files, _ = _source_files(path)
+    return {
+        "path": path,
+        "kind": kind,
+        "files": files,
+        "index": load_index(path),
+        "handles": {},      # shard index -> open file of this process
+        "pid": os.getpid(),
+    }
+
+
+def num_records(reader):
+    return len(reader["index"]["offset"])
+
+
+def _handle(reader, shard_index):
+    if reader["pid"] != os.getpid():
+        # Forked worker: the parent's file positions are shared, open new files
+        reader["handles"] = {}
+        reader["pid"] = os.getpid()
+    if shard_index not in reader["handles"]:
+        reader["handles"][shard_index] = open(reader["files"][shard_index], "rb")
+    return reader["handles"][shard_index]
+
+
+def read_record_bytes(reader, record_id):
+    """
+    Returns the undecoded JSON bytes of a record.
+    """
+    index = reader["index"]
+    f = _handle(reader, int(index["shard"][record_id]))
+    if reader["kind"] == "tar":
+        return _read_tar_json(f, int(index["offset"][record_id]))
+    f.seek(int(index["offset"][record_id]))
+    return f.read(int(index["length"][record_id]))
+
+
+def read_record(reader, record_id):
+    """
+    Reads and decodes a single record. Records of tar shards have media
+    paths rewritten to member names; read their media with read_media.
+    """
+    return json.loads(read_record_bytes(reader, record_id))
+
+
+def read_media(reader, record_id):
+    """
+    Returns {member name: bytes} of a tar shard record's media.
+    """
+    if reader["kind"] != "tar":
+        raise ValueError(f"{reader['path']} is not a tar shard folder, open the media paths of the record instead")
+    table = {key: reader["index"][key] for key in ("shard", "offset", "length")}
+    table["shards"] = np.array([os.path.basename(name) for name in reader["files"]])
+    return read_tar_record(os.path.dirname(reader["files"][0]), table, record_id)[1]
+
+
+def column(reader, name):
+    """
+    A filter column (or "source") of every record, without reading records.
+    """
+    return reader["index"][name]
+
+
+def select_records(reader, view=None, hand=None, label=None, split=None, split_index=1, granularity="pt",
+                   splits_root=SPLITS_ROOT):
+    """
+    Record ids matching all given filters, from the index only. view, hand
+    and label take one value or a list; split keeps records whose recording
+    is in the split bundle of their view and hand.
+    """
+    index = reader["index"]
+    mask = np.ones(num_records(reader), dtype=bool)
+    for name, value in (("view", view), ("hand", hand), ("label", label)):
+        if value is not None:
+            mask &= np.isin(index[name], [value] if isinstance(value, str) else list(value))
+
+    if split is not None:
+        in_split = np.zeros_like(mask)
+        for record_view, record_hand in set(zip(index["view"][mask].tolist(), index["hand"][mask].tolist())):
+            if not record_view or not record_hand:
+                continue    # Records without a known recording are in no split
+            bundle = bundle_path(splits_root, record_view, record_hand, granularity, split, split_index)
+            if not os.path.exists(bundle):
+                print(f"[WARNING] No split bundle for view {record_view!r}, hand {record_hand!r}: {bundle}")
+                continue
+            recordings = [parse_recording_name(name)[0] for name in read_bundle(bundle) if parse_recording_name(name)]
+            in_split |= (index["view"] == record_view) & (index["hand"] == record_hand) & np.isin(index["recording"], recordings)
+        mask &= in_split
+    return np.flatnonzero(mask)
+
+
+def iter_records(reader, record_ids=None, **filters):
+    """
+    Yields (record id, record) for record_ids, or for the records matching
+    filters (see select_records), reading them in file order.
+    """
+    if record_ids is None:
+        record_ids = select_records(reader, **filters)
+    index = reader["index"]
+    order = np.lexsort((index["offset"][record_ids], index["shard"][record_ids]))
+    for record_id in np.asarray(record_ids)[order].tolist():
+        yield record_id, read_record(reader, record_id)
+
+
+def close_dataset_reader(reader):
+    for f in reader["handles"].values():
+        f.close()
+    reader["handles"] = {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index a generated dataset and read records by id or filter.")
+    parser.add_argument("--input", default=INPUT_PATH)
+    parser.add_argument("--view")
+    parser.add_argument("--hand", choices=HANDS)
+    parser.add_argument("--label")
+    parser.add_argument("--split", choices=SPLITS)
+    parser.add_argument("--split-index", type=int, default=1)
+    parser.add_argument("--granularity", default="pt", help="Granularity of the split bundles")
+    parser.add_argument("--show", type=int, default=1, help="Print this many matching records")
+    args = parser.parse_args()
+
+    reader = open_dataset_reader(args.input)
+    record_ids = select_records(reader, args.view, args.hand, args.label, args.split, args.split_index,
+                                args.granularity)
+    print(f"{len(record_ids)} of {num_records(reader)} records match")
+    for record_id in record_ids[:args.show].tolist():
+        print(f"{record_id}: {json.dumps(read_record(reader, record_id), ensure_ascii=False)[:300]}")
+    close_dataset_reader(reader)
+
+if __name__ == "__main__":
+    main()
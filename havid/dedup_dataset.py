@@ -0,0 +1,197 @@
+import argparse
+import json
+import os
+import time
+
+import cv2
+import numpy as np
+
+from clip_cache import decode_clip
+from record_shards import record_answer, record_label, record_media
+
+# Configuration (Modify these as needed)
+INPUT_JSON = "./json_split_videos/split_videos_annotations.json"
+HASH_CACHE = "./json_split_videos/perceptual_hashes.npz"   # dHashes of clips/frames, reused while their mtime matches
+HASH_FRAMES = 4         # Frames hashed per record, spread uniformly over its clip or frame list
+MAX_DISTANCE = 6        # Records are duplicates if their frames differ by at most this many of 64 bits on average
+MODES = ["drop", "weight"]
+
+
+def dhash_frames(gray_frames):
+    """
+    64-bit difference hashes of grayscale 8x9 frames: bit (y, x) is set
+    when pixel (y, x + 1) is brighter than pixel (y, x). Returns the hashes
+    packed into a uint8 array (frames * 8,).
+    """
+    gray_frames = np.asarray(gray_frames, dtype=np.int16)
+    return np.packbits(gray_frames[:, :, 1:] > gray_frames[:, :, :-1])
+
+
+def media_hash(paths, hash_frames=HASH_FRAMES):
+    """
+    Perceptual hash of a record's media: hash_frames sampled frames of its
+    clip, or hash_frames of its frame images (repeated if there are fewer).
+    Returns None if the media cannot be read.
+    """
+    if len(paths) == 1 and paths[0].lower().endswith(".mp4"):
+        frames = decode_clip(paths[0], hash_frames, (9, 8))
+        if frames is None:
+            return None
+        return dhash_frames([cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) for frame in frames])
+
+    gray_frames = []
+    for i in np.linspace(0, len(paths) - 1, hash_frames).round().astype(int).tolist():
+        image = cv2.imread(paths[i], cv2.IMREAD_REDUCED_GRAYSCALE_4)
+        if image is None:
+            print(f"[ERROR] Could not read image: {paths[i]}")
+            return None
+        gray_frames.append(cv2.resize(image, (9, 8), interpolation=cv2.INTER_AREA))
+    return dhash_frames(gray_frames)
+
+
+def load_hash_cache(cache_path, hash_frames):
+    """
+    Returns {media key: (mtime, hash)} of the hash cache, empty if it does not
+    exist or was computed for another number of frames.
+    """
+    if not os.path.exists(cache_path):
+        return {}
+    with np.load(cache_path) as cache:
+        if cache["hashes"].shape[1:] != (hash_frames * 8,):
+            return {}
+        return {key: (mtime, row) for key, mtime, row in zip(cache["keys"].tolist(), cache["mtimes"], cache["hashes"])}
+
+
+def save_hash_cache(cache_path, hashes):
+    keys = sorted(hashes)
+    np.savez(cache_path, keys=np.array(keys, dtype=str), mtimes=np.array([hashes[k][0] for k in keys]),
+             hashes=np.stack([hashes[k][1] for k in keys]))
+
+
+def record_hashes(records, base_folder, cache_path=HASH_CACHE, hash_frames=HASH_FRAMES):
+    """
+    Perceptual hashes of every record as a uint8 array (records,
+    hash_frames * 8), and a mask of the records whose media could be read.
+    Hashes are cached by media path and modification time, so only new or
+    changed clips are decoded again.
+    """
+    cache = load_hash_cache(cache_path, hash_frames) if cache_path else {}
+    hashes = np.zeros((len(records), hash_frames * 8), dtype=np.uint8)
+    valid = np.zeros(len(records), dtype=bool)
+    computed = 0
+    for record_id, record in enumerate(records):
+        paths = [os.path.abspath(os.path.join(base_folder, path)) for path in record_media(record)]
+        if not paths:
+            continue
+        key = "|".join(paths)
+        try:
+            mtime = max(os.path.getmtime(path) for path in paths)
+        except OSError:
+            print(f"[WARNING] Missing media of record {record_id}: {paths[0]}")
+            continue
+        if key not in cache or cache[key][0] != mtime:
+            row = media_hash(paths, hash_frames)
+            if row is None:
+                continue
+            cache[key] = (mtime, row)
+            computed += 1
+        hashes[record_id] = cache[key][1]
+        valid[record_id] = True
+
+    if cache_path and computed:
+        save_hash_cache(cache_path, cache)
+    print(f"Hashed {computed} records ({int(valid.sum()) - computed} from the cache)")
+    return hashes, valid
+
+
+def find_duplicates(hashes, groups, max_distance=MAX_DISTANCE):
+    """
+    Greedy clustering of records by perceptual hash: every record in order
+    either joins the closest earlier kept record of its group within
+    max_distance bits per frame on average, or is kept itself.
+
+    Candidates come from a band index over kept records only: the hash bits
+    are cut into (allowed distance + 1) bands, and two hashes within the
+    allowed distance must agree on at least one whole band, so looking up
+    each band finds every match without comparing all pairs.
+
+    Returns an int array with the kept record every record is a duplicate
+    of (itself for kept records).
+    """
+    bits = np.unpackbits(hashes, axis=1)
+    allowed = max_distance * hashes.shape[1] // 8
+    bands = np.array_split(np.arange(bits.shape[1]), min(allowed + 1, bits.shape[1]))
+    band_values = np.stack([bits[:, band].astype(np.int64) @ (1 << np.arange(len(band), dtype=np.int64))
+                            for band in bands], axis=1)
+
+    representative = np.arange(len(hashes))
+    index = {}      # (group, band, band value) -> kept record ids
+    for record_id, group in enumerate(groups):
+        if group is None:
+            continue
+        keys = [(group, b, value) for b, value in enumerate(band_values[record_id].tolist())]
+        candidates = sorted({kept for key in keys for kept in index.get(key, ())})
+        if candidates:
+            distances = np.count_nonzero(bits[candidates] != bits[record_id], axis=1)
+            best = int(np.argmin(distances))
+            if distances[best] <= allowed:
+                representative[record_id] = candidates[best]
+                continue
+        for key in keys:
+            index.setdefault(key, []).append(record_id)
+    return representative
+
+
+def dedup_dataset(input_json, output_json, mode="drop", cache_path=HASH_CACHE, hash_frames=HASH_FRAMES,
+                  max_distance=MAX_DISTANCE):
+    """
+    Finds near-identical records of a generated JSON (same label and answer,
+    perceptually similar media) and writes output_json either without the
+    duplicates ("drop") or with every record and a "weight" of one over its
+    cluster size ("weight"), so each cluster counts once. Only records with
+    the same label and answer are merged, so every label keeps its records'
+    answers. Returns the representative record id of every record.
+    """
+    with open(input_json, "r", encoding="utf-8") as f:
+        records = json.load(f)
+
+    start = time.perf_counter()
+    hashes, valid = record_hashes(records, os.path.dirname(input_json), cache_path, hash_frames)
+    groups = [(record_label(r), record_answer(r)) if ok else None for r, ok in zip(records, valid)]
+    representative = find_duplicates(hashes, groups, max_distance)
+    is_kept = representative == np.arange(len(records))
+    cluster_sizes = np.bincount(representative, minlength=len(records))
+
+    if mode == "drop":
+        output = [record for record, kept in zip(records, is_kept) if kept]
+    elif mode == "weight":
+        output = [dict(record, weight=round(1.0 / cluster_sizes[rep], 6)) for record, rep in zip(records, representative)]
+    else:
+        raise ValueError(f"Unknown dedup mode {mode!r}, expected one of {MODES}")
+    with open(output_json, "w", encoding="utf-8") as f:
+        json.dump(output, f, ensure_ascii=False, indent=4)
+
+    labels = np.array([record_label(r) or "unknown" for r in records], dtype=str)
+    for label in np.unique(labels):
+        in_label = labels == label
+        print(f"{label}: {int(in_label.sum())} -> {int((in_label & is_kept).sum())}")
+    print(f"{int((~is_kept).sum())} of {len(records)} records are duplicates "
+          f"({time.perf_counter() - start:.1f} s), wrote {len(output)} records to {output_json}")
+    return representative
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drop or down-weight near-identical records of a generated dataset.")
+    parser.add_argument("--input", default=INPUT_JSON)
+    parser.add_argument("--output", help="Output JSON (default: <input>_dedup.json)")
+    parser.add_argument("--mode", choices=MODES, default="drop")
+    parser.add_argument("--hash-frames", type=int, default=HASH_FRAMES)
+    parser.add_argument("--max-distance", type=int, default=MAX_DISTANCE)
+    parser.add_argument("--hash-cache", default=HASH_CACHE, help="Hash cache file, '' disables caching")
+    args = parser.parse_args()
+
+    output_json = args.output or os.path.splitext(args.input)[0] + "_dedup.json"
+    dedup_dataset(args.input, output_json, args.mode, args.hash_cache, args.hash_frames, args.max_distance)
+
+if __name__ == "__main__":
+    main()
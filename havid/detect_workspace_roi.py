@@ -0,0 +1,169 @@
+import json
+import os
+
+import cv2
+import numpy as np
+
+from crop_config import ROI_CACHE_FILE, load_roi_cache
+
+# Configuration (Modify these as needed)
+VIDEO_DIR = './trimmed_videos'      # Full recordings, one .mp4 per recording and view
+NUM_SAMPLES = 16                    # Sampled positions per recording
+FRAME_GAP = 5                       # Frames between the two frames differenced at each position
+ANALYSIS_WIDTH = 320                # Frames are downscaled to this width before differencing
+COVERAGE = 0.95                     # Fraction of the motion heat the ROI must contain
+MARGIN = 0.15                       # Extra border around the ROI, relative to its size
+MIN_SIZE = 224                      # Minimum ROI side in source pixels
+SQUARE = True                       # Grow the ROI to a square (the fine-tuning models use square inputs)
+FORCE = False                       # Recompute recordings that are already in the cache
+
+
+def sample_frame_pairs(video_path, num_samples=NUM_SAMPLES, frame_gap=FRAME_GAP, analysis_width=ANALYSIS_WIDTH):
+    """
+    Reads num_samples pairs of grayscale frames (frame t and t + frame_gap),
+    evenly spaced over the video and downscaled to analysis_width.
+
+    Returns (pairs, (width, height)) where pairs is a uint8 array of shape
+    (num_pairs, 2, h, w), or (None, None) if the video cannot be read.
+    """
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        print(f"[ERROR] Could not open video: {video_path}")
+        return None, None
+
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    if total_frames <= frame_gap:
+        cap.release()
+        return None, None
+
+    scale = analysis_width / width
+    size = (analysis_width, max(1, round(height * scale)))
+    starts = np.linspace(0, total_frames - frame_gap - 1, num_samples).astype(int)
+
+    pairs = []
+    for start in np.unique(starts):
+        pair = []
+        for frame_number in (start, start + frame_gap):
+            cap.set(cv2.CAP_PROP_POS_FRAMES, int(frame_number))
+            ret, frame = cap.read()
+            if not ret:
+                break
+            small = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+            pair.append(cv2.cvtColor(small, cv2.COLOR_BGR2GRAY))
+        if len(pair) == 2:
+            pairs.append(pair)
+    cap.release()
+
+    if not pairs:
+        return None, None
+    return np.asarray(pairs, dtype=np.uint8), (width, height)
+
+
+def motion_heatmap(pairs):
+    """
+    Builds a per-pixel activity map from the sampled frame pairs:
+      - motion: mean absolute difference between the two frames of each pair
+      - foreground: mean absolute deviation from the per-pixel median frame
+    Both are computed over the whole stack at once. The median level of the
+    map is subtracted so static, noisy background contributes nothing.
+    """
+    frames = pairs.astype(np.int16)
+    motion = np.abs(frames[:, 1] - frames[:, 0]).mean(axis=0)
+
+    stack = frames.reshape(-1, *frames.shape[2:])
+    background = np.median(stack, axis=0)
+    foreground = np.abs(stack - background).mean(axis=0)
+
+    heat = motion + foreground
+    return np.clip(heat - np.median(heat), 0, None)
+
+
+def _coverage_bounds(profile, coverage):
+    """Returns the [lo, hi) index range holding `coverage` of the profile's mass."""
+    cumulative = np.cumsum(profile)
+    total = cumulative[-1]
+    tail = (1.0 - coverage) / 2 * total
+    lo = int(np.searchsorted(cumulative, tail, side="left"))
+    hi = int(np.searchsorted(cumulative, total - tail, side="left")) + 1
+    return lo, hi
+
+
+def roi_from_heatmap(heat, frame_size, coverage=COVERAGE, margin=MARGIN, min_size=MIN_SIZE, square=SQUARE):
+    """
+    Converts the heatmap into a crop region (x, y, width, height) in source
+    pixels: the box holding `coverage` of the heat along each axis, padded by
+    `margin`, grown to min_size (and to a square if requested) and clamped to
+    the frame. Returns None if the heatmap is empty.
+    """
+    if heat.sum() <= 0:
+        return None
+
+    width, height = frame_size
+    scale_x = width / heat.shape[1]
+    scale_y = height / heat.shape[0]
+
+    x0, x1 = _coverage_bounds(heat.sum(axis=0), coverage)
+    y0, y1 = _coverage_bounds(heat.sum(axis=1), coverage)
+    x0, x1 = x0 * scale_x, x1 * scale_x
+    y0, y1 = y0 * scale_y, y1 * scale_y
+
+    roi_w = (x1 - x0) * (1 + 2 * margin)
+    roi_h = (y1 - y0) * (1 + 2 * margin)
+    roi_w = max(roi_w, min_size)
+    roi_h = max(roi_h, min_size)
+    if square:
+        roi_w = roi_h = max(roi_w, roi_h)
+    roi_w = int(min(round(roi_w), width))
+    roi_h = int(min(round(roi_h), height))
+
+    # Centre the box on the detected area and shift it back inside the frame
+    center_x = (x0 + x1) / 2
+    center_y = (y0 + y1) / 2
+    x = int(np.clip(round(center_x - roi_w / 2), 0, width - roi_w))
+    y = int(np.clip(round(center_y - roi_h / 2), 0, height - roi_h))
+    return (x, y, roi_w, roi_h)
+
+
+def detect_roi(video_path):
+    """
+    Estimates the workspace ROI (x, y, width, height) of one recording,
+    or returns None if it cannot be determined.
+    """
+    pairs, frame_size = sample_frame_pairs(video_path)
+    if pairs is None:
+        return None
+    return roi_from_heatmap(motion_heatmap(pairs), frame_size)
+
+
+def update_roi_cache(video_dir=VIDEO_DIR, cache_file=ROI_CACHE_FILE, force=FORCE):
+    """
+    Detects the ROI of every recording in video_dir and stores it in
+    cache_file as {"S01A04I01M0": [x, y, w, h], ...}, which crop_video and
+    extract_frames_cropped pick up through crop_config.
+    Recordings already in the cache are skipped unless force is set.
+    """
+    roi_cache = {} if force else load_roi_cache(cache_file)
+
+    for filename in sorted(os.listdir(video_dir)):
+        if not filename.lower().endswith(".mp4"):
+            continue
+        recording = os.path.splitext(filename)[0]
+        if recording in roi_cache:
+            continue
+
+        roi = detect_roi(os.path.join(video_dir, filename))
+        if roi is None:
+            print(f"[WARNING] Could not detect ROI for {filename}, the view's default box will be used")
+            continue
+        roi_cache[recording] = roi
+        print(f"ROI for {recording}: x={roi[0]}, y={roi[1]}, w={roi[2]}, h={roi[3]}")
+
+    with open(cache_file, "w", encoding="utf-8") as f:
+        json.dump({name: list(roi) for name, roi in sorted(roi_cache.items())}, f, indent=2)
+    print(f"Wrote {len(roi_cache)} ROIs to {cache_file}")
+
+
+if __name__ == "__main__":
+    update_roi_cache()
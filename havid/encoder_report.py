@@ -0,0 +1,125 @@
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from output_profile import OUTPUT_PROFILES, keep_frame, output_fps, output_size, resize_frame
+from video_io import (ENCODER_PRESETS, VIDEO_BACKEND, close_video, close_writer, open_video, open_writer, read_frame,
+                      seek_frame, write_frame)
+
+# Configuration (Modify these as needed)
+CLIP_FOLDER = "./split_videos/lh_v0"   # Clips to re-encode, e.g. the output of split_videos
+NUM_CLIPS = 20                         # Clips sampled from the folder (evenly over its sorted file list)
+PROFILE = "vlm_448_8fps"               # Resolution/fps of the re-encoded clips (its encoder is ignored)
+
+
+def load_clip(clip_path, profile):
+    """
+    Decodes a clip and applies the profile's resize and frame sampling.
+    Returns (frames, fps) or None if the clip cannot be read.
+    """
+    video = open_video(clip_path)
+    if video is None:
+        return None
+    size = output_size(video["width"], video["height"], profile)
+    frames = []
+    frame_index = 0
+    while True:
+        frame = read_frame(video)
+        if frame is None:
+            break
+        if keep_frame(frame_index, video["fps"], profile):
+            frames.append(resize_frame(frame, size))
+        frame_index += 1
+    close_video(video)
+    if not frames:
+        return None
+    return frames, output_fps(video["fps"], profile)
+
+
+def measure_encoder(clips, encoder, output_folder, backend=None):
+    """
+    Encodes every clip with an encoder preset, then decodes it back in full
+    and with one seek to its middle frame. Returns the totals of the preset.
+    """
+    totals = {"clips": 0, "frames": 0, "bytes": 0, "encode_seconds": 0.0, "decode_seconds": 0.0,
+              "seek_seconds": 0.0}
+    for idx, (frames, fps) in enumerate(clips):
+        path = os.path.join(output_folder, f"{encoder}_{idx}.mp4")
+        size = (frames[0].shape[1], frames[0].shape[0])
+        start = time.perf_counter()
+        writer = open_writer(path, fps, size, backend, encoder)
+        for frame in frames:
+            write_frame(writer, frame)
+        close_writer(writer)
+        totals["encode_seconds"] += time.perf_counter() - start
+        totals["bytes"] += os.path.getsize(path)
+
+        start = time.perf_counter()
+        video = open_video(path, backend)
+        while read_frame(video) is not None:
+            totals["frames"] += 1
+        close_video(video)
+        totals["decode_seconds"] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        video = open_video(path, backend)
+        seek_frame(video, len(frames) // 2)
+        read_frame(video)
+        close_video(video)
+        totals["seek_seconds"] += time.perf_counter() - start
+        totals["clips"] += 1
+    return totals
+
+
+def encoder_report(clip_folder=CLIP_FOLDER, num_clips=NUM_CLIPS, profile=OUTPUT_PROFILES[PROFILE], encoders=None,
+                   backend=None):
+    """
+    Re-encodes a sample of clips with every encoder preset and returns, per
+    preset: KiB per clip, encode and decode fps, and the time to open a clip
+    and read its middle frame (what a random-access loader pays).
+    """
+    filenames = sorted(f for f in os.listdir(clip_folder) if f.lower().endswith(".mp4"))
+    if len(filenames) > num_clips:
+        filenames = [filenames[i * len(filenames) // num_clips] for i in range(num_clips)]
+    clips = [clip for clip in (load_clip(os.path.join(clip_folder, f), profile) for f in filenames) if clip is not None]
+    print(f"Re-encoding {len(clips)} clips from {clip_folder}")
+
+    report = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for encoder in encoders or list(ENCODER_PRESETS):
+            try:
+                totals = measure_encoder(clips, encoder, tmp_dir, backend)
+            except (RuntimeError, ValueError, OSError) as e:
+                print(f"[WARNING] Encoder {encoder} is not available: {e}")
+                continue
+            report[encoder] = {
+                "kib_per_clip": totals["bytes"] / 1024 / max(totals["clips"], 1),
+                "encode_fps": totals["frames"] / totals["encode_seconds"] if totals["encode_seconds"] else 0.0,
+                "decode_fps": totals["frames"] / totals["decode_seconds"] if totals["decode_seconds"] else 0.0,
+                "seek_ms": 1000 * totals["seek_seconds"] / max(totals["clips"], 1),
+            }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the encoder presets on our clips.")
+    parser.add_argument("--clips", default=CLIP_FOLDER)
+    parser.add_argument("--num-clips", type=int, default=NUM_CLIPS)
+    parser.add_argument("--profile", choices=sorted(OUTPUT_PROFILES), default=PROFILE)
+    parser.add_argument("--backend", default=VIDEO_BACKEND)
+    parser.add_argument("--output", help="Also write the report to this JSON file")
+    args = parser.parse_args()
+
+    report = encoder_report(args.clips, args.num_clips, OUTPUT_PROFILES[args.profile], backend=args.backend)
+    print(f"{'encoder':>12} {'KiB/clip':>10} {'encode fps':>11} {'decode fps':>11} {'seek ms':>8}")
+    for encoder, row in report.items():
+        print(f"{encoder:>12} {row['kib_per_clip']:10.1f} {row['encode_fps']:11.1f} {row['decode_fps']:11.1f} "
+              f"{row['seek_ms']:8.1f}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+import argparse
+import json
+import os
+import re
+import time
+
+import numpy as np
+
+from dataset_layout import parse_recording_name
+from record_shards import record_answer, record_media
+from semantic_mappings import ELEMENT_KINDS, answer_hand, load_mappings
+
+# Configuration (Modify these as needed)
+PREDICTIONS_FILE = "./json_split_videos/generated_predictions.jsonl"   # One {"predict": ..., "label": ...} per line
+DATASET_JSON = None         # Generated JSON the predictions were made on, in the same order (gives the views)
+REPORT_FILE = "./json_split_videos/evaluation.json"
+PREDICTION_KEY = "predict"
+REFERENCE_KEY = "label"
+
+ELEMENT_NAMES = ("action_verb", "manipulated_object", "target_object", "tool")
+NONE = -1                   # Element absent from the task ("None"/"null" in the answers)
+UNPARSED = -2               # Element or task the answer does not state or the vocabulary does not know
+NONE_NAMES = ("none", "null", "wrong", "")   # The decomposition of a mistake has no elements either
+
+# Element fields of the structured answers, e.g. '- Action verb: "insert"',
+# 'the assembly action verb is "insert"' or, in the multi-QA answers,
+# 'the assembly action verb is {insert}'; the last occurrence in an answer wins
+ELEMENT_PATTERNS = [re.compile(rf'{field}(?::| is)\s*(?:"([^"]*)"|\{{([^}}]*)\}})', re.IGNORECASE)
+                    for field in ("action verb", "manipulated object", "target object", "tool")]
+QUOTED = re.compile(r'"([^"]*)"|\{([^}]*)\}')
+PLAIN_TASK = re.compile(r'hand of the worker (?:is performing the primitive task )?(.+?)\s*\.?\s*$', re.IGNORECASE)
+
+
+def build_answer_vocabulary(table):
+    """
+    Maps the names the generators write back to the indices of
+    map_label_with_semantics / the decomposition table:
+      - elements: per element, {lower-case name: line index in its mapping file}
+      - tasks:    {lower-case semantics: label id from task_mapping.txt}
+    """
+    elements = []
+    for kind in ELEMENT_KINDS:
+        names = {}
+        for idx, name in enumerate(table["mappings"][kind].values()):
+            names.setdefault(name.lower(), idx)
+        names.update({name: NONE for name in NONE_NAMES})
+        elements.append(names)
+
+    tasks = {}
+    for label, label_id in table["label_ids"].items():
+        tasks.setdefault(table["rows"][label]["semantics"].lower(), label_id)
+    return {"elements": elements, "tasks": tasks, "null": table["label_ids"].get("null", UNPARSED),
+            "wrong": table["label_ids"].get("w", table["label_ids"].get("wrong", UNPARSED)),
+            "indices": table["indices"]}
+
+
+def parse_task(text, vocabulary):
+    """
+    Returns the label id of the task an answer concludes with, or UNPARSED.
+    Looks at the part after the last "Conclusion:" when there is one.
+    """
+    conclusion = text.rsplit("Conclusion:", 1)[-1]
+    lowered = conclusion.lower()
+    if "did nothing related" in lowered:
+        return vocabulary["null"]
+    if "made a mistake" in lowered:
+        return vocabulary["wrong"]
+    for quoted in reversed(["".join(groups) for groups in QUOTED.findall(conclusion)]):
+        if quoted.lower() in vocabulary["tasks"]:
+            return vocabulary["tasks"][quoted.lower()]
+    for line in reversed(conclusion.strip().splitlines()):
+        match = PLAIN_TASK.search(line.strip())
+        if match is not None:
+            return vocabulary["tasks"].get(match.group(1).strip('" ').lower(), UNPARSED)
+    return UNPARSED
+
+
+def parse_answer(text, vocabulary):
+    """
+    Parses one answer into (element indices, task id). Elements the answer
+    does not list (plain-sentence answers) are taken from the decomposition
+    of its task.
+    """
+    elements = []
+    for pattern, names in zip(ELEMENT_PATTERNS, vocabulary["elements"]):
+        found = pattern.findall(text)
+        elements.append(names.get("".join(found[-1]).strip().lower(), UNPARSED) if found else None)
+    task = parse_task(text, vocabulary)
+    if any(e is None for e in elements):
+        derived = vocabulary["indices"][task] if 0 <= task < len(vocabulary["indices"]) else [UNPARSED] * 4
+        elements = [int(d) if e is None else e for e, d in zip(elements, derived)]
+    return elements, task
+
+
+def parse_answers(texts, vocabulary):
+    """
+    Parses a batch of answers into an int16 (n, 4) element array and an int16
+    (n,) task array. Every distinct answer is parsed once; models repeat the
+    same answers a lot, so most of the batch is a lookup.
+    """
+    first_seen = {}
+    inverse = np.fromiter((first_seen.setdefault(text, len(first_seen)) for text in texts), dtype=np.int64,
+                          count=len(texts))
+    unique = list(first_seen)
+    elements = np.empty((len(unique), 4), dtype=np.int16)
+    tasks = np.empty(len(unique), dtype=np.int16)
+    for i, text in enumerate(unique):
+        elements[i], tasks[i] = parse_answer(text, vocabulary)
+    return elements[inverse], tasks[inverse]
+
+
+def confusion_matrix(truth, predicted, num_classes):
+    """
+    Confusion matrix over num_classes indices plus UNPARSED and NONE, which
+    take rows/columns 0 and 1; class i is row/column i + 2.
+    """
+    size = num_classes + 2
+    flat = (truth.astype(np.int64) + 2) * size + (predicted.astype(np.int64) + 2)
+    return np.bincount(flat, minlength=size * size).reshape(size, size)
+
+
+def group_accuracy(keys, correct):
+    """
+    Accuracy of every group of keys: {key: {"count": n, columns...}} where
+    correct is a dict of boolean arrays.
+    """
+    groups, inverse = np.unique(np.asarray(keys, dtype=str), return_inverse=True)
+    counts = np.bincount(inverse, minlength=len(groups))
+    result = {str(g): {"count": int(c)} for g, c in zip(groups, counts)}
+    for name, values in correct.items():
+        hits = np.bincount(inverse, weights=values, minlength=len(groups))
+        for g, h, c in zip(groups, hits, counts):
+            result[str(g)][name] = float(h / c)
+    return result
+
+
+def evaluate(pred_elements, pred_tasks, true_elements, true_tasks, table, groups=None):
+    """
+    Scores parsed predictions against the parsed ground truth. Returns the
+    per-element, full-task and all-elements accuracy, the parse failure rate,
+    the confusion matrices and, for every entry of groups ({name: keys}), the
+    same accuracies per group.
+    """
+    # A reference that could not be parsed counts as a miss, never as a match
+    element_correct = (pred_elements == true_elements) & (true_elements != UNPARSED)
+    correct = {name: element_correct[:, i] for i, name in enumerate(ELEMENT_NAMES)}
+    correct["all_elements"] = element_correct.all(axis=1)
+    correct["task"] = (pred_tasks == true_tasks) & (true_tasks != UNPARSED)
+
+    report = {
+        "count": int(len(pred_tasks)),
+        "accuracy": {name: float(values.mean()) if len(values) else 0.0 for name, values in correct.items()},
+        "unparsed": float((pred_tasks == UNPARSED).mean()) if len(pred_tasks) else 0.0,
+        "groups": {name: group_accuracy(keys, correct) for name, keys in (groups or {}).items()},
+    }
+    confusion = {name: confusion_matrix(true_elements[:, i], pred_elements[:, i], len(table["mappings"][kind]))
+                 for i, (name, kind) in enumerate(zip(ELEMENT_NAMES, ELEMENT_KINDS))}
+    confusion["task"] = confusion_matrix(true_tasks, pred_tasks, len(table["labels"]))
+    return report, confusion
+
+
+def load_predictions(predictions_file, dataset_json=None):
+    """
+    Reads the predictions and their references, one JSON object per line.
+    References missing from a line are taken from the assistant answer of
+    the dataset record at the same position ("messages" or "conversations";
+    the final answer of chain-of-thought answers). Returns (predictions,
+    references, views); views come from the records' media names.
+    """
+    with open(predictions_file, "r", encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    records = []
+    if dataset_json is not None:
+        with open(dataset_json, "r", encoding="utf-8") as f:
+            records = json.load(f)
+        if len(records) != len(rows):
+            print(f"[WARNING] {len(rows)} predictions for {len(records)} records in {dataset_json}")
+
+    predictions, references, views = [], [], []
+    for i, row in enumerate(rows):
+        record = records[i] if i < len(records) else None
+        reference = row.get(REFERENCE_KEY)
+        if reference is None and record is not None:
+            reference = record_answer(record)
+        media = record_media(record) if record is not None else []
+        parsed = parse_recording_name(media[0]) if media else None
+        predictions.append(row.get(PREDICTION_KEY, ""))
+        references.append(reference or "")
+        views.append(parsed[1] if parsed is not None else "unknown")
+    return predictions, references, views
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score model answers against the compositional ground truth.")
+    parser.add_argument("--predictions", default=PREDICTIONS_FILE)
+    parser.add_argument("--dataset", default=DATASET_JSON, help="Generated JSON the predictions were made on")
+    parser.add_argument("--report", default=REPORT_FILE)
+    args = parser.parse_args()
+
+    table = load_mappings()["table"]
+    vocabulary = build_answer_vocabulary(table)
+    predictions, references, views = load_predictions(args.predictions, args.dataset)
+
+    start = time.perf_counter()
+    pred_elements, pred_tasks = parse_answers(predictions, vocabulary)
+    true_elements, true_tasks = parse_answers(references, vocabulary)
+    groups = {"view": views, "hand": [answer_hand(text) for text in references]}
+    report, confusion = evaluate(pred_elements, pred_tasks, true_elements, true_tasks, table, groups)
+    elapsed = time.perf_counter() - start
+
+    if (true_tasks == UNPARSED).any():
+        print(f"[WARNING] {int((true_tasks == UNPARSED).sum())} references could not be parsed")
+    for name, value in report["accuracy"].items():
+        print(f"  {name:<20} {value:.4f}")
+    print(f"Scored {report['count']} predictions in {elapsed:.3f}s ({report['unparsed']:.1%} unparsed).")
+
+    os.makedirs(os.path.dirname(args.report) or ".", exist_ok=True)
+    with open(args.report, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    np.savez(os.path.splitext(args.report)[0] + "_confusion.npz", **confusion)
+    print(f"Wrote {args.report}.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+import argparse
+import io
+import json
+import os
+import tarfile
+
+import numpy as np
+
+from record_shards import load_shard_table, record_media, replace_record_media, save_shard_table, shard_name
+
+# Configuration (Modify these as needed)
+INPUT_JSON = "./json_split_videos/split_videos_annotations.json"
+OUTPUT_FOLDER = "./json_split_videos/tar_shards"
+SHARD_BYTES = 1 << 30       # A new shard is started once a shard reaches this size
+SHARD_RECORDS = 10000       # ... or holds this many records
+
+
+def member_names(key, media):
+    """
+    In-tar names of a record's files, WebDataset style: everything before the
+    first dot is the sample key, e.g. 00000012.json with 00000012.mp4 for a
+    clip or 00000012.0000.jpg, 00000012.0001.jpg, ... for frames.
+    """
+    if len(media) == 1:
+        return [key + os.path.splitext(media[0])[1].lower()]
+    return [f"{key}.{i:04d}{os.path.splitext(path)[1].lower()}" for i, path in enumerate(media)]
+
+
+def add_record(tar, key, record, base_folder):
+    """
+    Appends one record to tar: its conversation JSON (media paths rewritten
+    to the member names) followed by its media files. Returns the
+    (offset, length) of the record's members inside the tar, or None if a
+    media file is missing.
+    """
+    media = record_media(record)
+    paths = [os.path.normpath(os.path.join(base_folder, path)) for path in media]
+    missing = [path for path in paths if not os.path.isfile(path)]
+    if missing:
+        print(f"[WARNING] Skipping record {key}, missing media: {missing[0]}")
+        return None
+
+    names = member_names(key, media)
+    data = json.dumps(replace_record_media(record, names), ensure_ascii=False).encode("utf-8")
+    info = tarfile.TarInfo(key + ".json")
+    info.size = len(data)
+
+    offset = tar.offset
+    tar.addfile(info, io.BytesIO(data))
+    for path, name in zip(paths, names):
+        info = tar.gettarinfo(path, arcname=name)
+        info.uid = info.gid = 0
+        info.uname = info.gname = ""
+        with open(path, "rb") as f:
+            tar.addfile(info, f)
+    return offset, tar.offset - offset
+
+
+def export_tar_shards(input_json, output_folder, shard_bytes=SHARD_BYTES, shard_records=SHARD_RECORDS):
+    """
+    Packs every record of a generated JSON with its clip or frames into
+    sequential tar shards shard-00000.tar, shard-00001.tar, ... so training
+    reads whole shards instead of opening one file per sample. Media paths
+    in the JSON are relative to the JSON's folder.
+
+    Writes the shard table (see record_shards) to <output_folder>/shards.npz,
+    with the byte range of every record inside its shard, its index in the
+    input JSON ("source") and its original first media path ("media").
+    Returns the table.
+    """
+    with open(input_json, "r", encoding="utf-8") as f:
+        records = json.load(f)
+    base_folder = os.path.dirname(input_json)
+    os.makedirs(output_folder, exist_ok=True)
+
+    shards, shard, offset, length, source, first_media = [], [], [], [], [], []
+    tar = None
+    num_in_shard = 0
+    for record_id, record in enumerate(records):
+        if tar is None or tar.offset >= shard_bytes or num_in_shard >= shard_records:
+            if tar is not None:
+                tar.close()
+            shards.append(shard_name(len(shards), "tar"))
+            tar = tarfile.open(os.path.join(output_folder, shards[-1]), "w", format=tarfile.GNU_FORMAT)
+            num_in_shard = 0
+
+        span = add_record(tar, f"{record_id:08d}", record, base_folder)
+        if span is None:
+            continue
+        shard.append(len(shards) - 1)
+        offset.append(span[0])
+        length.append(span[1])
+        source.append(record_id)
+        first_media.append((record_media(record) or [""])[0])
+        num_in_shard += 1
+    if tar is not None:
+        tar.close()
+
+    table = {
+        "shards": np.array(shards, dtype=str),
+        "shard": np.array(shard, dtype=np.int32),
+        "offset": np.array(offset, dtype=np.int64),
+        "length": np.array(length, dtype=np.int64),
+    }
+    save_shard_table(output_folder, table, source=np.array(source, dtype=np.int64),
+                     media=np.array(first_media, dtype=str))
+    total = sum(os.path.getsize(os.path.join(output_folder, name)) for name in shards)
+    print(f"Packed {len(source)} of {len(records)} records into {len(shards)} shards "
+          f"({total / (1 << 20):.1f} MiB) in {output_folder}.")
+    return table
+
+
+def read_tar_record(output_folder, table, record_id):
+    """
+    Reads a single record from its tar shard with one seek. Returns the
+    record (media paths are member names) and {member name: bytes}.
+    """
+    path = os.path.join(output_folder, str(table["shards"][table["shard"][record_id]]))
+    with open(path, "rb") as f:
+        f.seek(int(table["offset"][record_id]))
+        data = f.read(int(table["length"][record_id]))
+
+    files = {}
+    with tarfile.open(fileobj=io.BytesIO(data), mode="r:") as tar:
+        for member in tar:
+            files[member.name] = tar.extractfile(member).read()
+    record = json.loads(next(data for name, data in files.items() if name.endswith(".json")))
+    return record, {name: data for name, data in files.items() if not name.endswith(".json")}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack a generated fine-tuning dataset and its media into tar shards.")
+    parser.add_argument("--input", default=INPUT_JSON)
+    parser.add_argument("--output", default=OUTPUT_FOLDER)
+    parser.add_argument("--shard-mb", type=int, default=SHARD_BYTES >> 20, help="Target shard size in MiB")
+    parser.add_argument("--shard-records", type=int, default=SHARD_RECORDS)
+    parser.add_argument("--check", type=int, default=0, help="Read back this many records from the index")
+    args = parser.parse_args()
+
+    export_tar_shards(args.input, args.output, args.shard_mb << 20, args.shard_records)
+    table = load_shard_table(args.output)
+    for record_id in range(min(args.check, len(table["shard"]))):
+        record, files = read_tar_record(args.output, table, record_id)
+        print(f"{record_id}: {sorted(files)}")
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,23 @@
-import cv2
 import os
 
+from image_writer import close_image_writer, open_image_writer, write_image
+from keyframes import select_keyframes
+from video_io import close_video, open_video, read_frame, seek_frame
+
 # Configuration (Modify these as needed)
 INPUT_DIR = './split_videos/lh_v0'          # Folder containing videos
 OUTPUT_DIR = './split_frames/lh_v0' # Folder to save extracted frames
 NUM_FRAMES = 5                # Number of frames to extract per video
+SAMPLING_MODE = 'uniform'     # 'uniform': evenly spaced indices, 'content': sharp, non-duplicate keyframes
+NUM_WRITERS = 4               # Threads encoding/writing frames while the next ones decode; 0 writes synchronously
+IMAGE_FORMAT = 'jpg'          # 'jpg', 'png' or 'webp'; the JSON generators read .jpg frames
+IMAGE_QUALITY = None          # JPEG/WebP quality or PNG compression, None for the image_writer defaults
 
 
 def extract_frames():
     # Create output directory if it doesn't exist
     os.makedirs(OUTPUT_DIR, exist_ok=True)
+    writer = open_image_writer(NUM_WRITERS, image_format=IMAGE_FORMAT, quality=IMAGE_QUALITY)
     
     # Supported video file extensions
     VIDEO_EXTENSIONS = {'mp4', 'avi', 'mov', 'mkv', 'flv', 'wmv'}
@@ -22,17 +30,32 @@ def extract_frames():
             continue
         
         video_path = os.path.join(INPUT_DIR, filename)
-        cap = cv2.VideoCapture(video_path)
+        video = open_video(video_path)
         
-        if not cap.isOpened():
-            print(f"Error opening video: {filename}")
+        if video is None:
             continue
         
         # Get total frames in video
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        total_frames = video["num_frames"]
         if total_frames == 0:
             print(f"Skipping {filename} (0 frames detected)")
-            cap.release()
+            close_video(video)
+            continue
+        
+        video_name = os.path.splitext(filename)[0]
+        
+        if SAMPLING_MODE == 'content':
+            # Single decode pass; static clips may yield fewer than NUM_FRAMES frames
+            keyframes = select_keyframes(video, NUM_FRAMES)
+            for frame_idx, (frame_number, frame) in enumerate(keyframes):
+                output_path = os.path.join(
+                    OUTPUT_DIR,
+                    f"{video_name}_{frame_idx}.jpg"
+                )
+                # Keyframes are views into a buffer the next video reuses
+                write_image(writer, output_path, frame.copy())
+            close_video(video)
+            print(f"Processed {filename} - Extracted {len(keyframes)} frames")
             continue
         
         # Calculate number of frames to extract
@@ -46,23 +69,25 @@ def extract_frames():
                       for i in range(num_to_extract)]
         
         # Extract frames
-        video_name = os.path.splitext(filename)[0]
         for frame_idx, frame_number in enumerate(indices):
-            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
-            ret, frame = cap.read()
+            seek_frame(video, frame_number)
+            frame = read_frame(video)
             
-            if ret:
+            if frame is not None:
                 
                 output_path = os.path.join(
                     OUTPUT_DIR,
                     f"{video_name}_{frame_idx}.jpg"
                 )
-                cv2.imwrite(output_path, frame)
+                write_image(writer, output_path, frame)
             else:
                 print(f"Failed to read frame {frame_number} from {filename}")
         
-        cap.release()
+        close_video(video)
         print(f"Processed {filename} - Extracted {len(indices)} frames")
 
+    num_written = close_image_writer(writer)
+    print(f"Wrote {num_written} frames to {OUTPUT_DIR}")
+
 if __name__ == "__main__":
     extract_frames()
\ No newline at end of file
@@ -1,77 +1,120 @@
 import cv2
+import numpy as np
 import os
+from multiprocessing import Pool
+
+from crop_config import get_buffer, get_crop_region, load_roi_cache
+from dataset_layout import HANDS, VIEWS, view_hand_videos
+from keyframes import select_keyframes
+from video_io import close_video, open_video, read_frame, seek_frame
 
 # Configuration (Modify these as needed)
-INPUT_DIR = './split_videos/lh_v0'          # Folder containing videos
-OUTPUT_DIR = './frames_cropped/lh_v0' # Folder to save extracted frames
+INPUT_ROOT = './split_videos'                # Contains one folder per hand/view, e.g. lh_v0
+OUTPUT_ROOT = './frames_cropped'             # Frames are saved to the same sub-folder names
 NUM_FRAMES = 5                # Number of frames to extract per video
+NUM_WORKERS = os.cpu_count()  # Worker processes for the batch
+SAMPLING_MODE = 'uniform'     # 'uniform': evenly spaced indices, 'content': sharp, non-duplicate keyframes
+
+
+def extract_video_frames(video_path, output_dir, crop_region):
+    """
+    Extracts NUM_FRAMES frames from video_path (evenly spaced, or content-aware
+    keyframes when SAMPLING_MODE is 'content'), crops them to crop_region
+    (x, y, width, height) and saves them to output_dir as
+    <video_name>_<frame_idx>.jpg.
+    Returns the number of frames written.
+    """
+    crop_x, crop_y, crop_width, crop_height = crop_region
+    filename = os.path.basename(video_path)
+
+    video = open_video(video_path)
+    if video is None:
+        return 0
+
+    # Get total frames in video
+    total_frames = video["num_frames"]
+    if total_frames == 0:
+        print(f"Skipping {filename} (0 frames detected)")
+        close_video(video)
+        return 0
+
+    width, height = video["width"], video["height"]
+    if crop_x + crop_width > width or crop_y + crop_height > height:
+        print(f"Skipping {filename} (crop region exceeds frame size {width}x{height})")
+        close_video(video)
+        return 0
+
+    # Reusable buffers; only (re)allocated when the frame or crop size changes
+    frame_buffer = get_buffer("frame", (height, width, 3))
+    crop_buffer = get_buffer("crop", (crop_height, crop_width, 3))
+    video_name = os.path.splitext(filename)[0]
+
+    def write_crop(frame_idx, frame):
+        # Copy the crop into the contiguous output buffer instead of
+        # handing a strided view to imwrite
+        np.copyto(crop_buffer, frame[
+            crop_y:crop_y+crop_height,
+            crop_x:crop_x+crop_width
+        ])
+
+        output_path = os.path.join(
+            output_dir,
+            f"{video_name}_{frame_idx}.jpg"
+        )
+        cv2.imwrite(output_path, crop_buffer)
+
+    num_written = 0
+    if SAMPLING_MODE == 'content':
+        # Single decode pass; static clips may yield fewer than NUM_FRAMES frames
+        for frame_idx, (frame_number, frame) in enumerate(select_keyframes(video, NUM_FRAMES)):
+            write_crop(frame_idx, frame)
+            num_written += 1
+        close_video(video)
+        print(f"Processed {filename} - Extracted {num_written} frames")
+        return num_written
 
-# Crop configuration (coordinates of top-left corner and dimensions)
-CROP_X = 350                                # Starting x-coordinate
-CROP_Y = 120                                 # Starting y-coordinate
-CROP_WIDTH = 550                            # Width of crop region
-CROP_HEIGHT = 550                           # Height of crop region
-
-def extract_frames():
-    # Create output directory if it doesn't exist
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
-    
-    # Supported video file extensions
-    VIDEO_EXTENSIONS = {'mp4', 'avi', 'mov', 'mkv', 'flv', 'wmv'}
-    
-    # Process each file in input directory
-    for filename in os.listdir(INPUT_DIR):
-        # Check if file is a video
-        ext = filename.split('.')[-1].lower()
-        if ext not in VIDEO_EXTENSIONS:
-            continue
-        
-        video_path = os.path.join(INPUT_DIR, filename)
-        cap = cv2.VideoCapture(video_path)
-        
-        if not cap.isOpened():
-            print(f"Error opening video: {filename}")
-            continue
-        
-        # Get total frames in video
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        if total_frames == 0:
-            print(f"Skipping {filename} (0 frames detected)")
-            cap.release()
-            continue
-        
-        # Calculate number of frames to extract
-        num_to_extract = min(NUM_FRAMES, total_frames)
-        
-        # Generate frame indices to extract
-        if num_to_extract == 1:
-            indices = [0]
+    # Calculate number of frames to extract
+    num_to_extract = min(NUM_FRAMES, total_frames)
+
+    # Generate frame indices to extract
+    if num_to_extract == 1:
+        indices = [0]
+    else:
+        indices = [(i * (total_frames - 1)) // (num_to_extract - 1)
+                  for i in range(num_to_extract)]
+
+    # Extract frames
+    for frame_idx, frame_number in enumerate(indices):
+        seek_frame(video, frame_number)
+        frame = read_frame(video, frame_buffer)
+
+        if frame is not None:
+            write_crop(frame_idx, frame)
+            num_written += 1
         else:
-            indices = [(i * (total_frames - 1)) // (num_to_extract - 1) 
-                      for i in range(num_to_extract)]
-        
-        # Extract frames
-        video_name = os.path.splitext(filename)[0]
-        for frame_idx, frame_number in enumerate(indices):
-            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
-            ret, frame = cap.read()
-            
-            if ret:
-                cropped_frame = frame[
-                    CROP_Y:CROP_Y+CROP_HEIGHT,
-                    CROP_X:CROP_X+CROP_WIDTH
-                ]
-                
-                output_path = os.path.join(
-                    OUTPUT_DIR,
-                    f"{video_name}_{frame_idx}.jpg"
-                )
-                cv2.imwrite(output_path, cropped_frame)
-            else:
-                print(f"Failed to read frame {frame_number} from {filename}")
-        
-        cap.release()
-        print(f"Processed {filename} - Extracted {len(indices)} frames")
+            print(f"Failed to read frame {frame_number} from {filename}")
+
+    close_video(video)
+    print(f"Processed {filename} - Extracted {num_written} frames")
+    return num_written
+
+
+def _extract_task(task):
+    return extract_video_frames(*task)
+
+
+def extract_frames(input_root=INPUT_ROOT, output_root=OUTPUT_ROOT, views=VIEWS, hands=HANDS, num_workers=NUM_WORKERS):
+    """
+    Extracts cropped frames for all views x hands in one run, using the crop
+    region configured for each view (or the recording's detected ROI).
+    """
+    roi_cache = load_roi_cache()
+    tasks = [(video_path, output_dir, get_crop_region(view, video_path, roi_cache))
+             for view, video_path, output_dir in view_hand_videos(input_root, output_root, views, hands)]
+
+    with Pool(num_workers) as pool:
+        num_frames = sum(pool.imap_unordered(_extract_task, tasks, chunksize=4))
+    print(f"Extracted {num_frames} frames from {len(tasks)} videos into {output_root}")
 
 if __name__ == "__main__":
-    extract_frames()
\ No newline at end of file
+    extract_frames()
@@ -0,0 +1,94 @@
+from collections import OrderedDict
+
+from video_io import close_video, grab_frame, open_video, read_frame, seek_frame
+
+# Configuration (Modify these as needed)
+CACHE_CAPACITY = 256    # Decoded frames kept per video
+SEEK_DISTANCE = 120     # Forward gaps longer than this seek instead of decoding through
+
+
+def open_frame_cache(video_path, capacity=CACHE_CAPACITY, transform=None, backend=None):
+    """
+    Opens a video for random frame access through a bounded LRU cache of
+    decoded frames. transform (e.g. a resize or crop) is applied once per
+    frame before it is cached. The video is opened with video_io (backend
+    defaults to video_io.VIDEO_BACKEND). Returns None if it cannot be opened.
+
+    The cache is a dictionary; use cached_frame / cached_frames to read from
+    it and close_frame_cache to release the video.
+    """
+    video = open_video(video_path, backend)
+    if video is None:
+        return None
+    return {
+        "video_path": video_path,
+        "video": video,
+        "capacity": capacity,
+        "transform": transform,
+        "frames": OrderedDict(),    # frame_number -> frame, least recently used first
+        "next_frame": 0,            # frame number the next read_frame() returns
+        "num_frames": video["num_frames"],
+        "fps": video["fps"],
+        "hits": 0,
+        "decoded": 0,
+    }
+
+
+def cached_frame(cache, frame_number):
+    """
+    Returns frame frame_number of the cached video, or None past its end.
+
+    Cached frames are returned without decoding. Otherwise the decoder moves
+    forward to the frame (frames in between are grabbed, not converted or
+    cached) or seeks when the frame lies behind it or far ahead. Only the
+    requested frames are cached, so overlapping requests share one decode.
+    """
+    frames = cache["frames"]
+    if frame_number in frames:
+        frames.move_to_end(frame_number)
+        cache["hits"] += 1
+        return frames[frame_number]
+
+    video = cache["video"]
+    if frame_number < cache["next_frame"] or frame_number - cache["next_frame"] > SEEK_DISTANCE:
+        seek_frame(video, frame_number)
+        cache["next_frame"] = frame_number
+    while cache["next_frame"] < frame_number:
+        if not grab_frame(video):
+            return None
+        cache["next_frame"] += 1
+
+    frame = read_frame(video)
+    if frame is None:
+        return None
+    cache["next_frame"] += 1
+    cache["decoded"] += 1
+    if cache["transform"] is not None:
+        frame = cache["transform"](frame)
+
+    frames[frame_number] = frame
+    if len(frames) > cache["capacity"]:
+        frames.popitem(last=False)
+    return frame
+
+
+def cached_frames(cache, frame_numbers):
+    """
+    Returns the frames of frame_numbers in order, skipping frames past the
+    end of the video. Sorted requests decode sequentially.
+    """
+    frames = []
+    for frame_number in frame_numbers:
+        frame = cached_frame(cache, frame_number)
+        if frame is not None:
+            frames.append(frame)
+    return frames
+
+
+def close_frame_cache(cache):
+    """
+    Releases the video and returns (cache hits, decoded frames).
+    """
+    close_video(cache["video"])
+    cache["frames"].clear()
+    return cache["hits"], cache["decoded"]
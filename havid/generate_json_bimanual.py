@@ -0,0 +1,88 @@
+import os
+import json
+
+from generate_json_split_videos import parse_splitted_filename
+from semantic_mappings import HAND_NAMES, describe_label, load_mappings
+
+# Samples written per bimanual clip: "both" asks about both hands, "lh"/"rh" about one hand
+SAMPLE_TYPES = ["both", "lh", "rh"]
+
+
+def parse_joint_label(label):
+    """
+    Splits the label of a bimanual clip, e.g. 'ibacb-null' -> ('ibacb', 'null').
+    Returns None for labels without a left/right pair.
+    """
+    parts = label.split("-")
+    if len(parts) != 2:
+        return None
+    return parts[0], parts[1]
+
+
+def build_record(video_path, hand_labels, table, granularity="pt"):
+    """
+    Creates the conversation of one clip. hand_labels is {"lh": label} or
+    {"rh": label} for a per-hand sample and holds both hands for a bimanual one.
+    """
+    task_term = "primitive task" if granularity == "pt" else "atomic action"
+    if len(hand_labels) == 1:
+        (hand, label), = hand_labels.items()
+        user_text = f"<video>What assembly {task_term} did the worker's {HAND_NAMES[hand]} hand perform in the video?"
+        assistant_text = describe_label(label, table, hand, granularity)
+    else:
+        user_text = (f"<video>What assembly {task_term}s did the worker's left hand and right hand perform in the video? "
+                     "Describe each hand separately.")
+        assistant_text = " ".join(describe_label(label, table, hand, granularity) for hand, label in hand_labels.items())
+    return {
+        "messages": [
+            {"content": user_text, "role": "user"},
+            {"content": assistant_text, "role": "assistant"},
+        ],
+        "videos": [video_path],
+    }
+
+
+def gather_bimanual_annotations(bimanual_clip_folder, output_json, table, granularity="pt", sample_types=SAMPLE_TYPES):
+    """
+    Goes through the clips written by split_videos.split_videos_bimanual and
+    creates, from every clip, one sample per entry of sample_types: the
+    bimanual sample and the per-hand samples all point to the same clip.
+    Returns a list of annotation dictionaries.
+    """
+    json_data = []
+    for filename in sorted(os.listdir(bimanual_clip_folder)):
+        parsed = parse_splitted_filename(filename)
+        if parsed is None:
+            continue
+        labels = parse_joint_label(parsed[1])
+        if labels is None:
+            print(f"[WARNING] Not a bimanual clip: {filename}")
+            continue
+
+        video_path = os.path.relpath(os.path.join(bimanual_clip_folder, filename), os.path.dirname(output_json))
+        hand_labels = dict(zip(("lh", "rh"), labels))
+        for sample_type in sample_types:
+            if sample_type == "both":
+                json_data.append(build_record(video_path, hand_labels, table, granularity))
+            else:
+                json_data.append(build_record(video_path, {sample_type: hand_labels[sample_type]}, table, granularity))
+    return json_data
+
+
+def main():
+    # 1. Folder written by split_videos.split_videos_bimanual
+    bimanual_clip_folder = "./split_videos/bimanual_v0"
+    output_json = "./json_split_videos/bimanual_v0.json"
+
+    # 2. Gather annotations
+    table = load_mappings("./groundTruth")["table"]
+    json_data = gather_bimanual_annotations(bimanual_clip_folder, output_json, table)
+
+    # 3. Write them to a JSON file
+    with open(output_json, "w", encoding="utf-8") as f:
+        json.dump(json_data, f, indent=2)
+
+    print(f"Wrote {len(json_data)} annotations to {output_json}.")
+
+if __name__ == "__main__":
+    main()
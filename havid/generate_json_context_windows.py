@@ -0,0 +1,171 @@
+import os
+import json
+
+import cv2
+import numpy as np
+
+from frame_cache import cached_frame, close_frame_cache, open_frame_cache
+from output_profile import OUTPUT_PROFILES, output_size, resize_frame
+from semantic_mappings import HAND_NAMES, describe_label, load_mappings
+from split_videos import parse_annotation_file
+
+# Context around every segment (Modify these as needed)
+#   segments_before/after: labels of the preceding/following segments given in the question
+#   frames_before/after:   frames sampled before/after the segment, context_stride frames apart
+#                          (a long strided window: frames_before * context_stride frames)
+#   segment_frames:        frames sampled uniformly inside the segment
+CONTEXT = {
+    "segments_before": 2,
+    "segments_after": 0,
+    "frames_before": 4,
+    "frames_after": 0,
+    "context_stride": 15,
+    "segment_frames": 8,
+}
+
+def context_frame_numbers(start, end, num_frames, context=CONTEXT):
+    """
+    Returns the (before, inside, after) frame numbers of a segment [start, end].
+    Context frames lie on a global grid of multiples of context_stride, so the
+    context of neighbouring segments shares the same frames.
+    """
+    stride = context["context_stride"]
+    last_before = (start - 1) // stride * stride
+    before = [n for n in range(last_before - (context["frames_before"] - 1) * stride, last_before + 1, stride)
+              if 0 <= n < start]
+    first_after = (end // stride + 1) * stride
+    after = [n for n in range(first_after, first_after + context["frames_after"] * stride, stride)
+             if n < num_frames]
+    inside = np.unique(np.linspace(start, end, context["segment_frames"]).round().astype(int)).tolist()
+    return before, inside, after
+
+
+def context_windows(segments, num_frames, context=CONTEXT):
+    """
+    Builds one context window per run-length segment (start, end, label) of
+    a recording, with the labels of the surrounding segments and the frame
+    numbers to sample.
+    """
+    windows = []
+    for idx, (start, end, label) in enumerate(segments):
+        before, inside, after = context_frame_numbers(start, end, num_frames, context)
+        windows.append({
+            "index": idx,
+            "start": start,
+            "end": end,
+            "label": label,
+            "labels_before": [s[2] for s in segments[max(0, idx - context["segments_before"]):idx]],
+            "labels_after": [s[2] for s in segments[idx + 1:idx + 1 + context["segments_after"]]],
+            "frames_before": before,
+            "frames": inside,
+            "frames_after": after,
+        })
+    return windows
+
+
+def build_record(window, image_paths, table, hand="lh", granularity="pt"):
+    """
+    Creates the conversation of one context window: the question lists the
+    context frames, the segment frames and the surrounding segments' tasks;
+    the answer describes the segment's task.
+    """
+    task_term = "primitive task" if granularity == "pt" else "atomic action"
+    num_before, num_inside = len(window["frames_before"]), len(window["frames"])
+    user_text = ""
+    if num_before:
+        user_text += "Frames before the current step:\n" + "<image>" * num_before + "\n"
+    user_text += "Frames of the current step:\n" + "<image>" * num_inside + "\n"
+    if window["frames_after"]:
+        user_text += "Frames after the current step:\n" + "<image>" * len(window["frames_after"]) + "\n"
+    if window["labels_before"]:
+        user_text += "Previously: " + " ".join(describe_label(l, table, hand, granularity) for l in window["labels_before"]) + "\n"
+    if window["labels_after"]:
+        user_text += "Afterwards: " + " ".join(describe_label(l, table, hand, granularity) for l in window["labels_after"]) + "\n"
+    user_text += f"What assembly {task_term} did the worker's {HAND_NAMES[hand]} hand perform in the current step?"
+
+    return {
+        "messages": [
+            {"content": user_text, "role": "user"},
+            {"content": describe_label(window["label"], table, hand, granularity), "role": "assistant"},
+        ],
+        "images": image_paths,
+        "label": window["label"],   # The frame names carry no label (see record_shards.record_label)
+    }
+
+
+def generate_context_windows(annotation_folder, video_folder, frames_folder, output_json, context=CONTEXT,
+                             hand="lh", granularity="pt", profile=OUTPUT_PROFILES["source"], recordings=None):
+    """
+    Writes one sample per annotated segment, with the context given by
+    context, to output_json. Each video is decoded once through a frame
+    cache: the union of the frames of all its windows is read in order and
+    every frame is written to frames_folder a single time, so overlapping
+    windows share their frames instead of decoding and storing them again.
+    """
+    os.makedirs(frames_folder, exist_ok=True)
+    table = load_mappings()["table"]
+    if recordings is None:
+        recordings = sorted(os.path.splitext(f)[0] for f in os.listdir(annotation_folder) if f.endswith(".txt"))
+
+    json_data = []
+    for base_name in recordings:
+        video_path = os.path.join(video_folder, base_name + ".mp4")
+        if not os.path.exists(video_path):
+            print(f"[WARNING] No matching .mp4 for annotation: {base_name}.txt")
+            continue
+        segments = parse_annotation_file(os.path.join(annotation_folder, base_name + ".txt"))
+        if not segments:
+            print(f"[WARNING] No frames in annotation: {base_name}.txt")
+            continue
+
+        cache = open_frame_cache(video_path)
+        if cache is None:
+            continue
+        out_size = output_size(cache["video"]["width"], cache["video"]["height"], profile)
+        cache["transform"] = lambda frame: resize_frame(frame, out_size)
+
+        windows = context_windows(segments, min(cache["num_frames"], segments[-1][1] + 1), context)
+        needed = sorted({n for w in windows for n in w["frames_before"] + w["frames"] + w["frames_after"]})
+        frame_paths = {}
+        for frame_number in needed:
+            frame = cached_frame(cache, frame_number)
+            if frame is None:
+                continue
+            frame_path = os.path.join(frames_folder, f"{base_name}_{frame_number:06d}.jpg")
+            cv2.imwrite(frame_path, frame)
+            frame_paths[frame_number] = os.path.relpath(frame_path, os.path.dirname(output_json))
+        _, decoded = close_frame_cache(cache)
+
+        num_window_frames = 0
+        num_dropped = 0
+        for window in windows:
+            numbers = window["frames_before"] + window["frames"] + window["frames_after"]
+            # A window with a frame that could not be decoded is dropped
+            if any(n not in frame_paths for n in numbers):
+                num_dropped += 1
+                continue
+            num_window_frames += len(numbers)
+            json_data.append(build_record(window, [frame_paths[n] for n in numbers], table, hand, granularity))
+        if num_dropped:
+            print(f"[WARNING] {base_name}: dropped {num_dropped} windows with frames that could not be decoded")
+        print(f"{base_name}: {len(windows) - num_dropped} windows, {decoded} frames decoded for {num_window_frames} window frames")
+
+    os.makedirs(os.path.dirname(output_json), exist_ok=True)
+    with open(output_json, "w", encoding="utf-8") as f:
+        json.dump(json_data, f, indent=2)
+    print(f"Wrote {len(json_data)} annotations to {output_json}.")
+    return json_data
+
+
+def main():
+    # Change these paths to match your setup
+    annotation_folder = "./groundTruth/View0/lh_pt"
+    video_folder = "./trimmed_videos"
+    frames_folder = "./context_frames/lh_v0"
+    output_json = "./json_split_videos/context_windows_lh_v0.json"
+
+    generate_context_windows(annotation_folder, video_folder, frames_folder, output_json, CONTEXT,
+                             hand="lh", granularity="pt", profile=OUTPUT_PROFILES["vlm_448_8fps"])
+
+if __name__ == "__main__":
+    main()
@@ -3,69 +3,9 @@ import json
 import re
 from collections import defaultdict
 
-def load_object_mapping(file_path):
-    """
-    Reads a file where each line has the format:
-        XX "semantic name"
-    For example:
-        ba "ball"
-        bs "ball seat"
-
-    Returns a dictionary mapping:
-        {"ba": "ball", "bs": "ball seat", ...}
-    """
-    mapping = {}
-    with open(file_path, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            # Split into code and name (strip quotes from name)
-            code, name = line.split(" ", 1)
-            name = name.strip().strip('"')
-            mapping[code] = name
-    return mapping
-
-def map_label_with_semantics(label_element, mapping_file):
-    # Handle special cases
-    if label_element == "null":
-        return "null"
-    elif label_element == "wrong":
-        return "wrong"
-
-    # Map codes to semantic names (if a code isn't found, fallback to the raw code)
-    semantics = mapping_file.get(label_element, label_element)
-
-    return semantics
-
-def parse_label(label):
-    """
-    Splits a label into four elements according to these rules:
-      - If the label == "null": all four elements are None.
-      - If the label == "wrong": all four elements are "wrong".
-      - Otherwise:
-          * action_verb         = label[0]
-          * manipulated_object  = label[1:3]
-          * target_object       = label[3:5]
-          * tool               = label[5:7]
-
-    Returns a tuple: (action_verb, manipulated_object, target_object, tool).
-    """
-    # Special cases
-    if label == "null":
-        return ("None", "None", "None", "None")
-    elif label == "wrong":
-        return ("wrong", "None", "None", "None")
-
-    # General parsing
-    action_verb         = label[0]     if len(label) >= 1 else "None"
-    manipulated_object  = label[1:3]   if len(label) >= 3 else "None"
-    target_object       = label[3:5]   if len(label) >= 5 else "None"
-    tool                = label[5:7]   if len(label) >= 7 else "None"
-
-    return (action_verb, manipulated_object, target_object, tool)
+from semantic_mappings import build_decomposition_table, load_mappings, lookup_decomposition
 
-def read_annotation_file(label, action_verb_mapping, object_mapping, tool_mapping, label_mapping):
+def read_annotation_file(label, decomposition):
     """
     Placeholder function to read a single annotation file and extract the relevant data.
     In your final version, this will parse the file content and return what you need 
@@ -90,12 +30,8 @@ def read_annotation_file(label, action_verb_mapping, object_mapping, tool_mappin
     
     assistant_text_general = ("Below is the primitive task performed by the worker's left hand: \n")
     
-    action_elements = parse_label(label)
-    action_verb = map_label_with_semantics(action_elements[0], action_verb_mapping)
-    manipulated_object = map_label_with_semantics(action_elements[1], object_mapping)
-    target_object = map_label_with_semantics(action_elements[2], object_mapping)
-    tool = map_label_with_semantics(action_elements[3], tool_mapping)
-    semantics = map_label_with_semantics(label, label_mapping)
+    action_verb, manipulated_object, target_object, tool = decomposition["names"]
+    semantics = decomposition["semantics"]
     
     CoT_head = "Let's analyze this step-by-step: \n" 
     if label == "null":
@@ -200,6 +136,7 @@ def gather_split_frames_annotations(split_frames_folder, action_verb_mapping, ob
     For each .mp4, parse its name to extract baseName, label, and index.
     Returns a list of annotation dictionaries.
     """
+    table = build_decomposition_table(action_verb_mapping, object_mapping, tool_mapping, label_mapping, "None")
     grouped_images = defaultdict(list)
     json_data = []
     entry_id = 0  # Initialize ID counter
@@ -229,7 +166,7 @@ def gather_split_frames_annotations(split_frames_folder, action_verb_mapping, ob
                 # Create the JSON structure for this file
                 
                 # Read or parse your annotation file
-        user_text, assistant_text, CoT_template = read_annotation_file(label, action_verb_mapping, object_mapping, tool_mapping, label_mapping)
+        user_text, assistant_text, CoT_template = read_annotation_file(label, lookup_decomposition(table, label))
                 
         image_tags = "\n".join(image_paths)
         user_text = user_text.replace("<image>", f"<image>\n{image_tags}")
@@ -264,14 +201,11 @@ def main():
     split_frames_folder = "./frames_cropped_no_w/lh_v0"
     
     # Load the mapping files for action verb, manipulated object, target object and tool
-    action_verb_mapping_file = "./groundTruth/action_verb_mapping.txt"  # <-- Update this path
-    action_verb_mapping = load_object_mapping(action_verb_mapping_file)
-    object_mapping_file = "./groundTruth/object_mapping.txt"  # <-- Update this path
-    object_mapping = load_object_mapping(object_mapping_file)   
-    tool_mapping_file = "./groundTruth/tool_mapping.txt"  # <-- Update this path
-    tool_mapping = load_object_mapping(tool_mapping_file)
-    label_mapping_file = "./groundTruth/label_mapping.txt"  # <-- Update this path
-    label_mapping = load_object_mapping(label_mapping_file)
+    mappings = load_mappings("./groundTruth")  # <-- Update this path
+    action_verb_mapping = mappings["action_verb"]
+    object_mapping = mappings["object"]
+    tool_mapping = mappings["tool"]
+    label_mapping = mappings["label"]
 
     # 2. Gather annotations
     json_data = gather_split_frames_annotations(split_frames_folder, action_verb_mapping, object_mapping, tool_mapping, label_mapping)
@@ -0,0 +1,152 @@
+import os
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from dataset_layout import VIEW_FILE_SUFFIXES, VIEWS, annotation_folder, parse_recording_name
+from frame_cache import cached_frame, close_frame_cache, open_frame_cache
+from output_profile import OUTPUT_PROFILES, output_size, resize_frame
+from semantic_mappings import HAND_NAMES, describe_label, load_mappings
+from split_videos import parse_annotation_file
+
+# Configuration (Modify these as needed)
+FRAMES_PER_SEGMENT = 8      # Frames sampled per segment, the same frame numbers in every view
+
+
+def multi_view_recordings(video_folder, views=VIEWS):
+    """
+    Groups the videos of video_folder by recording across views, e.g.
+    S01A04I01M0.mp4, S01A04I01S1.mp4 and S01A04I01S2.mp4 -> "S01A04I01".
+    Returns {recording: {view: video_path}} for the recordings that exist in
+    every requested view.
+    """
+    grouped = {}
+    for filename in sorted(os.listdir(video_folder)):
+        parsed = parse_recording_name(filename) if filename.lower().endswith(".mp4") else None
+        if parsed is not None and parsed[1] in views:
+            grouped.setdefault(parsed[0], {})[parsed[1]] = os.path.join(video_folder, filename)
+    return {recording: paths for recording, paths in grouped.items() if len(paths) == len(views)}
+
+
+def segment_frame_numbers(segments, frames_per_segment=FRAMES_PER_SEGMENT):
+    """
+    Samples frames_per_segment frame numbers uniformly inside every segment
+    (start, end, label). Computed once per recording and shared by all views.
+    """
+    return [np.unique(np.linspace(start, end, frames_per_segment).round().astype(int)).tolist()
+            for start, end, _ in segments]
+
+
+def decode_view(video_path, frame_numbers, frames_folder, profile=OUTPUT_PROFILES["source"]):
+    """
+    Decodes the sorted frame_numbers of one view in a single forward pass and
+    writes them as JPEGs. Returns {frame_number: frame_path}, without the
+    frames that could not be decoded.
+    """
+    cache = open_frame_cache(video_path)
+    if cache is None:
+        return {}
+    out_size = output_size(cache["video"]["width"], cache["video"]["height"], profile)
+    cache["transform"] = lambda frame: resize_frame(frame, out_size)
+
+    base_name = os.path.splitext(os.path.basename(video_path))[0]
+    frame_paths = {}
+    for frame_number in frame_numbers:
+        frame = cached_frame(cache, frame_number)
+        if frame is None:
+            continue
+        frame_path = os.path.join(frames_folder, f"{base_name}_{frame_number:06d}.jpg")
+        cv2.imwrite(frame_path, frame)
+        frame_paths[frame_number] = frame_path
+    close_frame_cache(cache)
+    return frame_paths
+
+
+def build_record(label, view_paths, table, hand="lh", granularity="pt"):
+    """
+    Creates the conversation of one synchronized sample; view_paths is a list
+    of (view, image paths) with the same frame numbers in every view.
+    """
+    task_term = "primitive task" if granularity == "pt" else "atomic action"
+    user_text = ""
+    images = []
+    for view, paths in view_paths:
+        user_text += f"Camera {VIEW_FILE_SUFFIXES[view]}:\n" + "<image>" * len(paths) + "\n"
+        images.extend(paths)
+    user_text += ("The cameras recorded the same frames of the step in sync. "
+                  f"What assembly {task_term} did the worker's {HAND_NAMES[hand]} hand perform?")
+    return {
+        "messages": [
+            {"content": user_text, "role": "user"},
+            {"content": describe_label(label, table, hand, granularity), "role": "assistant"},
+        ],
+        "images": images,
+        "label": label,     # The frame names carry no label (see record_shards.record_label)
+    }
+
+
+def generate_multi_view_samples(ground_truth_root, video_folder, frames_folder, output_json, hand="lh", granularity="pt",
+                                views=VIEWS, frames_per_segment=FRAMES_PER_SEGMENT, profile=OUTPUT_PROFILES["source"],
+                                recordings=None):
+    """
+    Writes one sample per segment with synchronized frames from every view.
+    The segments come from the annotation of the first view (the views are
+    recorded in sync); the frame numbers are sampled once and the views are
+    decoded concurrently, one thread per view.
+    """
+    os.makedirs(frames_folder, exist_ok=True)
+    table = load_mappings()["table"]
+    grouped = multi_view_recordings(video_folder, views)
+    if recordings is not None:
+        grouped = {r: paths for r, paths in grouped.items() if r in recordings}
+
+    json_data = []
+    with ThreadPoolExecutor(max_workers=len(views)) as pool:
+        for recording, video_paths in sorted(grouped.items()):
+            reference_name = recording + VIEW_FILE_SUFFIXES[views[0]] + ".txt"
+            annotation_path = os.path.join(annotation_folder(ground_truth_root, views[0], hand, granularity), reference_name)
+            if not os.path.exists(annotation_path):
+                print(f"[WARNING] Missing annotation: {annotation_path}")
+                continue
+            segments = parse_annotation_file(annotation_path)
+            sampled = segment_frame_numbers(segments, frames_per_segment)
+            needed = sorted({n for numbers in sampled for n in numbers})
+
+            decoded = pool.map(decode_view, [video_paths[view] for view in views], [needed] * len(views),
+                               [frames_folder] * len(views), [profile] * len(views))
+            view_frames = dict(zip(views, decoded))
+
+            num_dropped = 0
+            for (_, _, label), numbers in zip(segments, sampled):
+                # A sample with a frame missing in any view is dropped, so the views stay aligned
+                if not numbers or any(n not in view_frames[view] for view in views for n in numbers):
+                    num_dropped += 1
+                    continue
+                view_paths = [(view, [os.path.relpath(view_frames[view][n], os.path.dirname(output_json)) for n in numbers])
+                              for view in views]
+                json_data.append(build_record(label, view_paths, table, hand, granularity))
+            if num_dropped:
+                print(f"[WARNING] {recording}: dropped {num_dropped} samples with frames that could not be decoded")
+            print(f"{recording}: {len(segments)} segments, {len(needed)} frames per view from {len(views)} views")
+
+    os.makedirs(os.path.dirname(output_json), exist_ok=True)
+    with open(output_json, "w", encoding="utf-8") as f:
+        json.dump(json_data, f, indent=2)
+    print(f"Wrote {len(json_data)} annotations to {output_json}.")
+    return json_data
+
+
+def main():
+    # Change these paths to match your setup
+    ground_truth_root = "./groundTruth"
+    video_folder = "./trimmed_videos"
+    frames_folder = "./multi_view_frames/lh"
+    output_json = "./json_split_videos/multi_view_lh.json"
+
+    generate_multi_view_samples(ground_truth_root, video_folder, frames_folder, output_json, hand="lh",
+                                granularity="pt", profile=OUTPUT_PROFILES["vlm_448_8fps"])
+
+if __name__ == "__main__":
+    main()
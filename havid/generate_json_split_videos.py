@@ -2,88 +2,30 @@ import os
 import json
 import re
 
-def load_object_mapping(file_path):
-    """
-    Reads a file where each line has the format:
-        XX "semantic name"
-    For example:
-        ba "ball"
-        bs "ball seat"
-
-    Returns a dictionary mapping:
-        {"ba": "ball", "bs": "ball seat", ...}
-    """
-    mapping = {}
-    with open(file_path, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            # Split into code and name (strip quotes from name)
-            code, name = line.split(" ", 1)
-            name = name.strip().strip('"')
-            mapping[code] = name
-    return mapping
-
-def map_label_with_semantics(label_element, mapping_file):
-    # Handle special cases
-    if label_element == "null":
-        return "null"
-    elif label_element == "wrong":
-        return "wrong"
-
-    # Map codes to semantic names (if a code isn't found, fallback to the raw code)
-    semantics = mapping_file.get(label_element, label_element)
-
-    return semantics
-
-def parse_label(label):
-    """
-    Splits a label into four elements according to these rules:
-      - If the label == "null": all four elements are None.
-      - If the label == "wrong": all four elements are "wrong".
-      - Otherwise:
-          * action_verb         = label[0]
-          * manipulated_object  = label[1:3]
-          * target_object       = label[3:5]
-          * tool               = label[5:7]
-
-    Returns a tuple: (action_verb, manipulated_object, target_object, tool).
-    """
-    # Special cases
-    if label == "null":
-        return ("null", "null", "null", "null")
-    elif label == "wrong":
-        return ("wrong", "wrong", "wrong", "wrong")
-
-    # General parsing
-    action_verb         = label[0]     if len(label) >= 1 else "null"
-    manipulated_object  = label[1:3]   if len(label) >= 3 else "null"
-    target_object       = label[3:5]   if len(label) >= 5 else "null"
-    tool                = label[5:7]   if len(label) >= 7 else "null"
+from semantic_mappings import build_decomposition_table, compose_semantics, load_mappings, lookup_decomposition
 
-    return (action_verb, manipulated_object, target_object, tool)
-
-def read_annotation_file(label, action_verb_mapping, object_mapping, tool_mapping, label_mapping):
+def read_annotation_file(label, decomposition, granularity="pt"):
     """
     Placeholder function to read a single annotation file and extract the relevant data.
     In your final version, this will parse the file content and return what you need 
     for the JSON structure (e.g., user question, assistant answer, etc.).
+    granularity is "pt" for primitive-task clips or "aa" for atomic-action clips.
     """
     # TODO: Implement your logic to read the annotation file
     # Example (placeholder):
-    user_text = "<video>What assembly primitive task did the worker's left hand perform in the video?"
+    task_term = "primitive task" if granularity == "pt" else "atomic action"
+    assembly_term = "primitive assembly task" if granularity == "pt" else "assembly atomic action"
+    user_text = f"<video>What assembly {task_term} did the worker's left hand perform in the video?"
     
     assistant_text_general = ("This video demonstrates a worker performing a critical assembly step. Although the assembly task is bimanual, the user asked me to focus on the worker's left hand."
-                              "Therefore, I will describe the primitive assembly task performed by the worker's left hand." 
-                              "I will describe the primitive task in a structured way, using four elements: an action verb, a manipulated object, a target object, and a tool. However, the primitive task is not necessary to include all four elements. \n")
+                              f"Therefore, I will describe the {assembly_term} performed by the worker's left hand." 
+                              f"I will describe the {task_term} in a structured way, using four elements: an action verb, a manipulated object, a target object, and a tool. However, the {task_term} is not necessary to include all four elements. \n")
     
-    action_elements = parse_label(label)
-    action_verb = map_label_with_semantics(action_elements[0], action_verb_mapping)
-    manipulated_object = map_label_with_semantics(action_elements[1], object_mapping)
-    target_object = map_label_with_semantics(action_elements[2], object_mapping)
-    tool = map_label_with_semantics(action_elements[3], tool_mapping)
-    semantics = map_label_with_semantics(label, label_mapping)
+    action_verb, manipulated_object, target_object, tool = decomposition["names"]
+    if decomposition["semantics_index"] >= 0 or granularity == "pt":
+        semantics = decomposition["semantics"]
+    else:
+        semantics = compose_semantics(action_verb, manipulated_object, target_object, tool)
     
     assistant_text_lh_compositional = "Below is the action elements performed by the left hand of the worker: \n"
     if label == "null":
@@ -94,7 +36,7 @@ def read_annotation_file(label, action_verb_mapping, object_mapping, tool_mappin
         description =  f"The left hand of the worker performed the action verb is {action_verb}; manipulated object is {manipulated_object}; target object is {target_object}; using the tool {tool}. \n"
     assistant_text_lh_compositional = assistant_text_lh_compositional + description
     
-    assistant_text_lh_full = "Below is the primitive task performed by the left hand of the worker: \n"    
+    assistant_text_lh_full = f"Below is the {task_term} performed by the left hand of the worker: \n"    
     if label == "null":
         description_full = f"The left hand of the worker did nothing related to the assembly task. \n "
     elif label == "wrong":
@@ -146,12 +88,14 @@ def parse_splitted_filename(filename):
 
     return (base_name, label, clip_index)
 
-def gather_split_video_annotations(split_videos_folder, action_verb_mapping, object_mapping, tool_mapping, label_mapping):
+def gather_split_video_annotations(split_videos_folder, action_verb_mapping, object_mapping, tool_mapping, label_mapping, granularity="pt"):
     """
     Goes through the folder containing your split .mp4 files.
     For each .mp4, parse its name to extract baseName, label, and index.
+    granularity ("pt" or "aa") selects primitive-task or atomic-action wording.
     Returns a list of annotation dictionaries.
     """
+    table = build_decomposition_table(action_verb_mapping, object_mapping, tool_mapping, label_mapping, "null")
     json_data = []
 
     for filename in os.listdir(split_videos_folder):
@@ -162,7 +106,7 @@ def gather_split_video_annotations(split_videos_folder, action_verb_mapping, obj
                 # Create the JSON structure for this file
                 
                 # Read or parse your annotation file
-                user_text, assistant_text = read_annotation_file(label, action_verb_mapping, object_mapping, tool_mapping, label_mapping)
+                user_text, assistant_text = read_annotation_file(label, lookup_decomposition(table, label), granularity)
                 
             # The "videos" field can be derived from the annotation filename
             # or however your naming convention is set
@@ -193,14 +137,11 @@ def main():
     split_videos_folder = "./split_videos/lh_v0"
     
     # Load the mapping files for action verb, manipulated object, target object and tool
-    action_verb_mapping_file = "./groundTruth/action_verb_mapping.txt"  # <-- Update this path
-    action_verb_mapping = load_object_mapping(action_verb_mapping_file)
-    object_mapping_file = "./groundTruth/object_mapping.txt"  # <-- Update this path
-    object_mapping = load_object_mapping(object_mapping_file)   
-    tool_mapping_file = "./groundTruth/tool_mapping.txt"  # <-- Update this path
-    tool_mapping = load_object_mapping(tool_mapping_file)
-    label_mapping_file = "./groundTruth/label_mapping.txt"  # <-- Update this path
-    label_mapping = load_object_mapping(label_mapping_file)
+    mappings = load_mappings("./groundTruth")  # <-- Update this path
+    action_verb_mapping = mappings["action_verb"]
+    object_mapping = mappings["object"]
+    tool_mapping = mappings["tool"]
+    label_mapping = mappings["label"]
 
     # 2. Gather annotations
     json_data = gather_split_video_annotations(split_videos_folder, action_verb_mapping, object_mapping, tool_mapping, label_mapping)
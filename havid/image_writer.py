@@ -0,0 +1,91 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+
+# Configuration (Modify these as needed)
+NUM_WRITERS = 4         # Encoding/writing threads; 0 writes synchronously in the caller
+MAX_PENDING = 32        # Frames queued for writing before write_image blocks the decoder
+IMAGE_FORMAT = "jpg"    # "jpg", "png" or "webp" (the JSON generators read .jpg frames)
+JPEG_QUALITY = 95       # 0-100, OpenCV's default is 95
+PNG_COMPRESSION = 3     # 0-9, lossless; higher is smaller and slower
+WEBP_QUALITY = 90       # 1-100; above 100 writes lossless WebP
+
+IMAGE_FORMATS = ["jpg", "png", "webp"]
+
+
+def imwrite_params(image_format=IMAGE_FORMAT, quality=None):
+    """
+    Returns the cv2.imwrite parameters of an image format. quality overrides
+    JPEG_QUALITY / PNG_COMPRESSION / WEBP_QUALITY.
+    """
+    if image_format == "jpg":
+        return [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY if quality is None else quality]
+    if image_format == "png":
+        return [cv2.IMWRITE_PNG_COMPRESSION, PNG_COMPRESSION if quality is None else quality]
+    if image_format == "webp":
+        return [cv2.IMWRITE_WEBP_QUALITY, WEBP_QUALITY if quality is None else quality]
+    raise ValueError(f"Unknown image format {image_format!r}, expected one of {IMAGE_FORMATS}")
+
+
+def open_image_writer(num_workers=NUM_WRITERS, max_pending=MAX_PENDING, image_format=IMAGE_FORMAT, quality=None):
+    """
+    Opens a writer that encodes and writes frames on a bounded thread pool,
+    so the decode loop does not wait for encoding and the filesystem. At most
+    max_pending frames are queued; write_image blocks once the queue is full,
+    which keeps memory bounded when the disk is slower than the decoder.
+
+    The writer is a dictionary; use write_image to queue frames and
+    close_image_writer to wait for them.
+    """
+    return {
+        "pool": ThreadPoolExecutor(max_workers=num_workers) if num_workers > 0 else None,
+        "slots": threading.BoundedSemaphore(max(max_pending, 1)),
+        "extension": "." + image_format,
+        "params": imwrite_params(image_format, quality),
+        "lock": threading.Lock(),
+        "written": 0,
+        "failed": [],
+    }
+
+
+def _write(writer, path, frame):
+    try:
+        ok = cv2.imwrite(path, frame, writer["params"])
+    except cv2.error:
+        ok = False
+    with writer["lock"]:
+        if ok:
+            writer["written"] += 1
+        else:
+            writer["failed"].append(path)
+
+
+def write_image(writer, path, frame):
+    """
+    Queues frame to be written to path, with its extension replaced by the
+    writer's format. Returns the final path. The frame must not be modified
+    afterwards (cap.read() returns a new array per frame; copy reused buffers).
+    """
+    path = os.path.splitext(path)[0] + writer["extension"]
+    if writer["pool"] is None:
+        _write(writer, path, frame)
+        return path
+
+    writer["slots"].acquire()
+    future = writer["pool"].submit(_write, writer, path, frame)
+    future.add_done_callback(lambda _: writer["slots"].release())
+    return path
+
+
+def close_image_writer(writer):
+    """
+    Waits for all queued frames and stops the threads. Returns the number of
+    images written; failed writes are reported.
+    """
+    if writer["pool"] is not None:
+        writer["pool"].shutdown(wait=True)
+    for path in writer["failed"]:
+        print(f"[ERROR] Could not write image: {path}")
+    return writer["written"]
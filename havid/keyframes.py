@@ -0,0 +1,86 @@
+import cv2
+import numpy as np
+
+from crop_config import get_buffer
+from video_io import read_frame
+
+# Configuration (Modify these as needed)
+THUMB_SIZE = (64, 64)         # Grayscale thumbnail used for the difference signal
+SHARPNESS_WIDTH = 320         # Frames are downscaled to this width before measuring sharpness
+DUPLICATE_THRESHOLD = 3.0     # Mean absolute thumbnail difference (0-255) below which frames are duplicates
+
+
+def frame_signals(frame, sharpness_size):
+    """
+    Computes the cheap per-frame signals used for keyframe scoring:
+      - a THUMB_SIZE grayscale thumbnail (float32) for frame differences
+      - sharpness: variance of the Laplacian of the downscaled grayscale frame
+    Returns (thumbnail, sharpness).
+    """
+    gray = cv2.cvtColor(cv2.resize(frame, sharpness_size, interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY)
+    g = gray.astype(np.float32)
+    # 4-neighbour Laplacian on the interior pixels, computed with array slicing
+    laplacian = 4 * g[1:-1, 1:-1] - g[:-2, 1:-1] - g[2:, 1:-1] - g[1:-1, :-2] - g[1:-1, 2:]
+    thumbnail = cv2.resize(g, THUMB_SIZE, interpolation=cv2.INTER_AREA)
+    return thumbnail, float(laplacian.var())
+
+
+def suppress_duplicates(thumbnails, threshold=DUPLICATE_THRESHOLD):
+    """
+    Given the thumbnails of the selected frames in temporal order, returns the
+    positions to keep: a frame is dropped when its mean absolute difference
+    to the last kept frame is below threshold. The first frame is always kept.
+    """
+    keep = [0]
+    for i in range(1, len(thumbnails)):
+        if np.abs(thumbnails[i] - thumbnails[keep[-1]]).mean() >= threshold:
+            keep.append(i)
+    return keep
+
+
+def select_keyframes(video, num_frames, duplicate_threshold=DUPLICATE_THRESHOLD):
+    """
+    Selects up to num_frames diverse, sharp frames from a video opened with
+    video_io.open_video in a single sequential decode pass (no seeking).
+
+    The clip is divided into num_frames equal temporal bins; within each bin
+    the sharpest frame is kept (copied into a preallocated buffer, so only
+    num_frames full frames are ever held). Near-duplicate picks are then
+    removed with suppress_duplicates, so static clips yield fewer frames.
+
+    Returns a list of (frame_number, frame) in temporal order; the frames are
+    views into a buffer that is reused by the next call.
+    """
+    total_frames, width, height = video["num_frames"], video["width"], video["height"]
+    if total_frames <= 0 or width <= 0 or height <= 0:
+        return []
+
+    num_bins = min(num_frames, total_frames)
+    sharpness_size = (min(SHARPNESS_WIDTH, width), max(3, round(height * min(SHARPNESS_WIDTH, width) / width)))
+
+    best_frames = get_buffer("keyframes", (num_bins, height, width, 3))
+    best_numbers = np.full(num_bins, -1, dtype=np.int64)
+    best_sharpness = np.full(num_bins, -1.0)
+    best_thumbnails = np.zeros((num_bins, THUMB_SIZE[1], THUMB_SIZE[0]), dtype=np.float32)
+
+    frame_buffer = get_buffer("frame", (height, width, 3))
+    frame_number = 0
+    while True:
+        frame = read_frame(video, frame_buffer)
+        if frame is None:
+            break
+        # Frames past the reported count fall into the last bin
+        bin_index = min(frame_number * num_bins // total_frames, num_bins - 1)
+        thumbnail, sharpness = frame_signals(frame, sharpness_size)
+        if sharpness > best_sharpness[bin_index] and frame.shape == best_frames.shape[1:]:
+            best_sharpness[bin_index] = sharpness
+            best_numbers[bin_index] = frame_number
+            best_thumbnails[bin_index] = thumbnail
+            np.copyto(best_frames[bin_index], frame)
+        frame_number += 1
+
+    filled = np.flatnonzero(best_numbers >= 0)
+    if len(filled) == 0:
+        return []
+    keep = filled[suppress_duplicates(best_thumbnails[filled], duplicate_threshold)]
+    return [(int(best_numbers[i]), best_frames[i]) for i in keep]
@@ -0,0 +1,229 @@
+import json
+import os
+from multiprocessing import Pool
+
+import numpy as np
+
+from dataset_layout import GRANULARITIES, HANDS, VIEW_FOLDER_TAGS, VIEWS, annotation_folder
+from label_vocabulary import MAPPING_FOLDER, build_vocabulary, folder_mtime, load_encoded_folder, read_mapping_codes
+from segmentation import LABEL_ID_FILES
+
+# Configuration (Modify these as needed)
+GROUND_TRUTH_ROOT = "./groundTruth"
+STATISTICS_FILE = "./groundTruth/cache/label_statistics.json"   # Cached results
+UNIQUE_LABELS_FOLDER = "./groundTruth/cache/unique_labels"      # Per-folder and per-granularity unique label lists
+LABEL_MAPPING_FILE = "./groundTruth/label_mapping.txt"
+NUM_WORKERS = os.cpu_count()
+
+
+def segment_table(labels, offsets):
+    """
+    Run-length segments of the concatenated label array of a folder, never
+    crossing a recording boundary. Returns (values, lengths) arrays.
+    """
+    if len(labels) == 0:
+        return labels[:0], np.empty(0, dtype=np.int64)
+    changes = np.flatnonzero(labels[1:] != labels[:-1]) + 1
+    starts = np.union1d(np.concatenate(([0], changes)), offsets[1:-1])
+    lengths = np.diff(np.append(starts, len(labels)))
+    return labels[starts], lengths
+
+
+def _length_summary(lengths):
+    return {
+        "min": int(lengths.min()),
+        "mean": round(float(lengths.mean()), 2),
+        "median": float(np.median(lengths)),
+        "p90": float(np.percentile(lengths, 90)),
+        "max": int(lengths.max()),
+    }
+
+
+def folder_statistics(view, hand, granularity, ground_truth_root=GROUND_TRUTH_ROOT):
+    """
+    Computes the label statistics of one view/hand/granularity folder from its
+    encoded label arrays:
+      - frames and segments per label, and segment-length summaries
+      - labels not in task_mapping.txt / action_mapping.txt ("unknown_labels")
+      - labels without a description in label_mapping.txt ("missing_semantics")
+      - element codes without an entry in the verb/object/tool mapping files
+    Returns None if the folder does not exist.
+    """
+    folder = annotation_folder(ground_truth_root, view, hand, granularity)
+    if not os.path.isdir(folder):
+        return None
+
+    vocabulary = build_vocabulary(granularity)
+    encoded = load_encoded_folder(folder, vocabulary)
+    labels, offsets = encoded["labels"], encoded["offsets"]
+    num_labels = vocabulary["unknown_id"] + 1
+
+    frame_counts = np.bincount(labels, minlength=num_labels)
+    values, lengths = segment_table(labels, offsets)
+    segment_counts = np.bincount(values, minlength=num_labels)
+
+    # Group segment lengths by label with one sort instead of one mask per label
+    order = np.argsort(values, kind="stable")
+    grouped = np.split(lengths[order], np.cumsum(segment_counts)[:-1])
+
+    present = np.flatnonzero(frame_counts[:len(vocabulary["labels"])])
+    label_stats = {}
+    for label_id in present:
+        label_stats[vocabulary["labels"][label_id]] = {
+            "frames": int(frame_counts[label_id]),
+            "segments": int(segment_counts[label_id]),
+            "segment_length": _length_summary(grouped[label_id]),
+        }
+
+    semantic_labels = set(read_mapping_codes(LABEL_MAPPING_FILE))
+    elements = vocabulary["elements"][present]
+    missing_elements = {}
+    for column, kind in ((0, "verbs"), (1, "objects"), (2, "objects"), (3, "tools")):
+        ids = elements[:, column]
+        missing = ids[ids >= vocabulary["num_mapped"][kind]]
+        missing_elements.setdefault(kind, set()).update(vocabulary[kind][i] for i in missing.tolist())
+
+    return {
+        "view": view,
+        "hand": hand,
+        "granularity": granularity,
+        "num_recordings": len(encoded["recordings"]),
+        "num_frames": int(len(labels)),
+        "labels": label_stats,
+        "unknown_labels": encoded["unknown"].tolist(),
+        "unknown_frames": int(frame_counts[vocabulary["unknown_id"]]),
+        "missing_semantics": sorted(label for label in label_stats if label not in semantic_labels),
+        "missing_elements": {kind: sorted(codes) for kind, codes in missing_elements.items()},
+    }
+
+
+def view_differences(folder_stats):
+    """
+    For every hand/granularity, compares the label sets of the views:
+      - only_in_view:      labels that no other view contains
+      - missing_from_view: labels some other view contains but this one does not
+    """
+    differences = {}
+    for hand in HANDS:
+        for granularity in GRANULARITIES:
+            label_sets = {stats["view"]: set(stats["labels"]) for stats in folder_stats
+                          if stats["hand"] == hand and stats["granularity"] == granularity}
+            if len(label_sets) < 2:
+                continue
+            key = f"{hand}_{granularity}"
+            differences[key] = {}
+            for view, labels in label_sets.items():
+                others = set().union(*(s for v, s in label_sets.items() if v != view))
+                differences[key][view] = {
+                    "only_in_view": sorted(labels - others),
+                    "missing_from_view": sorted(others - labels),
+                }
+    return differences
+
+
+def _source_mtimes(ground_truth_root):
+    """
+    Modification time of every annotation folder, id file and mapping file
+    the statistics are computed from; the cached results are reused only
+    while these are unchanged.
+    """
+    mtimes = {}
+    for view in VIEWS:
+        for hand in HANDS:
+            for granularity in GRANULARITIES:
+                folder = annotation_folder(ground_truth_root, view, hand, granularity)
+                if os.path.isdir(folder):
+                    mtimes[folder] = folder_mtime(folder)
+    element_files = [os.path.join(MAPPING_FOLDER, name)
+                     for name in ("action_verb_mapping.txt", "object_mapping.txt", "tool_mapping.txt")]
+    for path in list(LABEL_ID_FILES.values()) + [LABEL_MAPPING_FILE] + element_files:
+        if os.path.exists(path):
+            mtimes[path] = os.path.getmtime(path)
+    return mtimes
+
+
+def _folder_task(task):
+    return folder_statistics(*task)
+
+
+def compute_statistics(ground_truth_root=GROUND_TRUTH_ROOT, statistics_file=STATISTICS_FILE, num_workers=NUM_WORKERS):
+    """
+    Computes the statistics of every view/hand/granularity folder in one
+    parallel pass and returns {"folders": [...], "view_differences": {...}}.
+    Results are cached in statistics_file and reused until an annotation
+    folder, annotation file or mapping file changes.
+    """
+    mtimes = _source_mtimes(ground_truth_root)
+    if os.path.exists(statistics_file):
+        with open(statistics_file, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached.get("source_mtimes") == mtimes:
+            return cached["statistics"]
+
+    tasks = [(view, hand, granularity, ground_truth_root)
+             for view in VIEWS for hand in HANDS for granularity in GRANULARITIES]
+    with Pool(num_workers) as pool:
+        folder_stats = [stats for stats in pool.map(_folder_task, tasks) if stats is not None]
+
+    statistics = {"folders": folder_stats, "view_differences": view_differences(folder_stats)}
+    os.makedirs(os.path.dirname(statistics_file), exist_ok=True)
+    with open(statistics_file, "w", encoding="utf-8") as f:
+        json.dump({"source_mtimes": mtimes, "statistics": statistics}, f, indent=2)
+    return statistics
+
+
+def write_unique_label_files(statistics, output_folder=UNIQUE_LABELS_FOLDER):
+    """
+    Writes the sorted unique labels of every folder to
+    <output_folder>/v0_lh_pt_unique_labels.txt etc., and their union per
+    granularity to <output_folder>/pt_unique_labels.txt etc. The lists
+    checked in under groundTruth (read by semantic_mappings) are inputs and
+    are not overwritten.
+    """
+    os.makedirs(output_folder, exist_ok=True)
+    union = {}
+    for stats in statistics["folders"]:
+        labels = sorted(stats["labels"])
+        union.setdefault(stats["granularity"], set()).update(labels)
+        output_file = os.path.join(output_folder, f"{VIEW_FOLDER_TAGS[stats['view']]}_{stats['hand']}_{stats['granularity']}_unique_labels.txt")
+        with open(output_file, "w", encoding="utf-8") as out:
+            for label in labels:
+                out.write(label + "\n")
+
+    for granularity, labels in union.items():
+        output_file = os.path.join(output_folder, f"{granularity}_unique_labels.txt")
+        with open(output_file, "w", encoding="utf-8") as out:
+            for label in sorted(labels):
+                out.write(label + "\n")
+
+
+def print_report(statistics):
+    """
+    Prints a short per-folder summary plus every label that is missing from
+    a mapping file or differs between views.
+    """
+    for stats in statistics["folders"]:
+        print(f"{stats['view']}/{stats['hand']}_{stats['granularity']}: {stats['num_recordings']} recordings, "
+              f"{stats['num_frames']} frames, {len(stats['labels'])} unique labels")
+        if stats["unknown_labels"]:
+            print(f"  Not in the id mapping ({stats['unknown_frames']} frames): {', '.join(stats['unknown_labels'])}")
+        if stats["missing_semantics"] and stats["granularity"] == "pt":
+            print(f"  Not in label_mapping.txt: {', '.join(stats['missing_semantics'])}")
+        for kind, codes in stats["missing_elements"].items():
+            if codes:
+                print(f"  {kind} without a mapping entry: {', '.join(codes)}")
+
+    for key, views in statistics["view_differences"].items():
+        for view, diff in views.items():
+            if diff["only_in_view"] or diff["missing_from_view"]:
+                print(f"{key} {view}: only here {diff['only_in_view']}, missing here {diff['missing_from_view']}")
+
+
+def main():
+    statistics = compute_statistics()
+    write_unique_label_files(statistics)
+    print_report(statistics)
+    print(f"Label statistics cached in {STATISTICS_FILE}, unique labels written to {UNIQUE_LABELS_FOLDER}.")
+
+if __name__ == "__main__":
+    main()
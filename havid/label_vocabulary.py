@@ -0,0 +1,222 @@
+import os
+
+import numpy as np
+
+from dataset_layout import GRANULARITIES, HANDS, VIEWS, annotation_folder
+from segmentation import LABEL_ID_FILES, load_label_ids, parse_label, read_frame_labels
+from semantic_mappings import load_object_mapping
+
+# Configuration (Modify these as needed)
+MAPPING_FOLDER = "./groundTruth"            # action_verb/object/tool mapping files
+CACHE_FOLDER = "./groundTruth/cache"        # Encoded annotation folders (.npz)
+
+# Element id of a missing element ("null" verb/object/tool, or any element of "wrong")
+NULL_ELEMENT_ID = -1
+
+
+def read_mapping_codes(file_path):
+    """
+    Returns the codes of a 'XX "semantic name"' mapping file, in file order.
+    """
+    return list(load_object_mapping(file_path))
+
+
+def _element_codes(mapped_codes, label_codes):
+    """
+    Element vocabulary: the codes of the mapping file first, so their ids equal
+    the line index used by map_label_with_semantics, followed by any code that
+    only appears in the labels (e.g. atomic-action verbs such as 'g').
+    """
+    extra = sorted(set(label_codes) - set(mapped_codes) - {"null", "wrong"})
+    return list(mapped_codes) + extra
+
+
+def label_dtype(num_labels):
+    """
+    Smallest unsigned dtype that holds every label id plus the unknown id.
+    """
+    return np.uint8 if num_labels < np.iinfo(np.uint8).max else np.uint16
+
+
+def build_vocabulary(granularity, mapping_folder=MAPPING_FOLDER):
+    """
+    Builds the integer vocabulary of one granularity ("pt" or "aa"):
+      - labels:      label strings indexed by their id from task_mapping.txt / action_mapping.txt
+      - label_ids:   {label: id}
+      - verbs, objects, tools: element codes indexed by element id
+      - elements:    int16 array (num_labels, 4) with the (verb, manipulated
+                     object, target object, tool) ids of every label
+      - num_mapped:  number of verbs/objects/tools that come from the mapping
+                     files; element ids at or above it have no semantic name
+      - dtype:       dtype of the encoded per-frame label arrays
+      - unknown_id:  id used for labels that are not in the vocabulary
+      - source_file: the id file the label ids were read from
+    """
+    label_ids = load_label_ids(LABEL_ID_FILES[granularity])
+    labels = [None] * (max(label_ids.values()) + 1)
+    for label, idx in label_ids.items():
+        labels[idx] = label
+
+    parsed = [parse_label(label) for label in labels]
+    mapped_verbs = read_mapping_codes(os.path.join(mapping_folder, "action_verb_mapping.txt"))
+    mapped_objects = read_mapping_codes(os.path.join(mapping_folder, "object_mapping.txt"))
+    mapped_tools = read_mapping_codes(os.path.join(mapping_folder, "tool_mapping.txt"))
+    verbs = _element_codes(mapped_verbs, [p[0] for p in parsed])
+    objects = _element_codes(mapped_objects, [p[1] for p in parsed] + [p[2] for p in parsed])
+    tools = _element_codes(mapped_tools, [p[3] for p in parsed])
+
+    verb_ids = {code: i for i, code in enumerate(verbs)}
+    object_ids = {code: i for i, code in enumerate(objects)}
+    tool_ids = {code: i for i, code in enumerate(tools)}
+    elements = np.array([
+        (verb_ids.get(verb, NULL_ELEMENT_ID), object_ids.get(manipulated, NULL_ELEMENT_ID),
+         object_ids.get(target, NULL_ELEMENT_ID), tool_ids.get(tool, NULL_ELEMENT_ID))
+        for verb, manipulated, target, tool in parsed
+    ], dtype=np.int16)
+
+    dtype = label_dtype(len(labels))
+    return {
+        "granularity": granularity,
+        "labels": labels,
+        "label_ids": label_ids,
+        "verbs": verbs,
+        "objects": objects,
+        "tools": tools,
+        "elements": elements,
+        "num_mapped": {"verbs": len(mapped_verbs), "objects": len(mapped_objects), "tools": len(mapped_tools)},
+        "dtype": dtype,
+        "unknown_id": int(np.iinfo(dtype).max),
+        "source_file": LABEL_ID_FILES[granularity],
+    }
+
+
+def encode_labels(labels, vocabulary, unknown=None):
+    """
+    Encodes a list of label strings into an integer array of the vocabulary's
+    dtype. Each distinct label is looked up once; labels missing from the
+    vocabulary get vocabulary["unknown_id"] and, if a set is passed as
+    unknown, are added to it.
+    """
+    if not labels:
+        return np.empty(0, dtype=vocabulary["dtype"])
+    unique, inverse = np.unique(np.asarray(labels), return_inverse=True)
+    label_ids = vocabulary["label_ids"]
+    unknown_id = vocabulary["unknown_id"]
+    codes = np.array([label_ids.get(label, unknown_id) for label in unique], dtype=vocabulary["dtype"])
+    if unknown is not None:
+        unknown.update(label for label in unique.tolist() if label not in label_ids)
+    return codes[inverse]
+
+
+def decode_labels(label_array, vocabulary):
+    """
+    Converts an encoded label array back into label strings.
+    """
+    labels = vocabulary["labels"]
+    return [labels[i] if i < len(labels) else None for i in label_array.tolist()]
+
+
+def decompose(label_array, vocabulary):
+    """
+    Returns the per-frame element ids of an encoded label array as an int16
+    array of shape (n, 4): (verb, manipulated object, target object, tool).
+    Unknown labels decompose to NULL_ELEMENT_ID.
+    """
+    elements = vocabulary["elements"]
+    padded = np.vstack([elements, np.full((1, 4), NULL_ELEMENT_ID, dtype=elements.dtype)])
+    return padded[np.minimum(label_array, len(elements))]
+
+
+def encode_annotation_file(annotation_path, vocabulary, unknown=None):
+    """
+    Reads a per-frame annotation file and returns its encoded label array.
+    """
+    return encode_labels(read_frame_labels(annotation_path), vocabulary, unknown)
+
+
+def encode_annotation_folder(annotation_folder, vocabulary):
+    """
+    Encodes every .txt annotation file in annotation_folder.
+
+    Returns a dictionary with:
+      - recordings: array of recording names, sorted
+      - offsets:    int64 array (num_recordings + 1); recording i covers
+                    labels[offsets[i]:offsets[i + 1]]
+      - labels:     all per-frame label ids, concatenated
+      - unknown:    sorted label strings that are not in the vocabulary
+    """
+    recordings = sorted(os.path.splitext(f)[0] for f in os.listdir(annotation_folder) if f.endswith(".txt"))
+    unknown = set()
+    arrays = [encode_annotation_file(os.path.join(annotation_folder, r + ".txt"), vocabulary, unknown)
+              for r in recordings]
+
+    offsets = np.zeros(len(arrays) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(a) for a in arrays])
+    labels = np.concatenate(arrays) if arrays else np.empty(0, dtype=vocabulary["dtype"])
+    return {"recordings": np.array(recordings, dtype=str), "offsets": offsets, "labels": labels,
+            "unknown": np.array(sorted(unknown), dtype=str)}
+
+
+def _cache_path(annotation_folder, cache_folder):
+    # e.g. ./groundTruth/View0/lh_pt -> <cache_folder>/View0_lh_pt.npz
+    parent, name = os.path.split(os.path.normpath(annotation_folder))
+    return os.path.join(cache_folder, f"{os.path.basename(parent)}_{name}.npz")
+
+
+def folder_mtime(annotation_folder):
+    """
+    Latest modification time of an annotation folder and its .txt files.
+    """
+    mtimes = [os.path.getmtime(os.path.join(annotation_folder, f))
+              for f in os.listdir(annotation_folder) if f.endswith(".txt")]
+    return max(mtimes + [os.path.getmtime(annotation_folder)])
+
+
+def load_encoded_folder(annotation_folder, vocabulary, cache_folder=CACHE_FOLDER):
+    """
+    Returns encode_annotation_folder(annotation_folder, vocabulary), reading it
+    from a .npz cache when the cache is newer than every annotation file, the
+    folder itself (so added/removed files are noticed) and the vocabulary's
+    id file (so renumbered labels are re-encoded). Otherwise the folder is
+    re-encoded and the cache rewritten.
+    """
+    cache_path = _cache_path(annotation_folder, cache_folder)
+    source_mtime = max(folder_mtime(annotation_folder), os.path.getmtime(vocabulary["source_file"]))
+    if os.path.exists(cache_path) and os.path.getmtime(cache_path) >= source_mtime:
+        with np.load(cache_path) as cached:
+            if cached["labels"].dtype == vocabulary["dtype"] and "unknown" in cached:
+                return {key: cached[key] for key in ("recordings", "offsets", "labels", "unknown")}
+
+    encoded = encode_annotation_folder(annotation_folder, vocabulary)
+    os.makedirs(cache_folder, exist_ok=True)
+    np.savez(cache_path, **encoded)
+    return encoded
+
+
+def recording_labels(encoded, recording):
+    """
+    Returns the label array of one recording as a view into encoded["labels"].
+    """
+    i = int(np.searchsorted(encoded["recordings"], recording))
+    if i >= len(encoded["recordings"]) or encoded["recordings"][i] != recording:
+        raise KeyError(recording)
+    return encoded["labels"][encoded["offsets"][i]:encoded["offsets"][i + 1]]
+
+
+def main():
+    # Encode every view/hand/granularity folder of groundTruth and refresh the caches
+    vocabularies = {granularity: build_vocabulary(granularity) for granularity in GRANULARITIES}
+    for view in VIEWS:
+        for hand in HANDS:
+            for granularity, vocabulary in vocabularies.items():
+                folder = annotation_folder("./groundTruth", view, hand, granularity)
+                if not os.path.isdir(folder):
+                    print(f"[WARNING] Missing annotation folder: {folder}")
+                    continue
+                encoded = load_encoded_folder(folder, vocabulary)
+                num_unknown = int(np.count_nonzero(encoded["labels"] == vocabulary["unknown_id"]))
+                print(f"{folder}: {len(encoded['recordings'])} recordings, {len(encoded['labels'])} frames, "
+                      f"{num_unknown} frames with unknown labels")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import cv2
+
+# Output profiles for the clips written by split_videos and crop_video.
+#   short_side: target length of the shorter frame side in pixels (None keeps the source size)
+#   fps:        target frame rate (None keeps the source fps)
+#   sampling:   how source frames are dropped to reach the target fps
+#               "uniform" - keep the first source frame of every output time slot
+#               "stride"  - keep every n-th source frame, n = round(source_fps / fps)
+#   encoder:    encoder preset of the written clips, a key of video_io.ENCODER_PRESETS
+#               (compare them on our clips with encoder_report.py)
+#   backend:    video_io backend that writes the clips (None: video_io.VIDEO_BACKEND); the
+#               H.264 presets need pyav or ffmpeg, OpenCV cannot set their options
+OUTPUT_PROFILES = {
+    "source": {"short_side": None, "fps": None, "sampling": "uniform", "encoder": "mp4v", "backend": None},
+    "vlm_448_8fps": {"short_side": 448, "fps": 8, "sampling": "uniform", "encoder": "mp4v", "backend": None},
+    "vlm_336_4fps": {"short_side": 336, "fps": 4, "sampling": "uniform", "encoder": "mp4v", "backend": None},
+    "vlm_224_2fps": {"short_side": 224, "fps": 2, "sampling": "stride", "encoder": "mp4v", "backend": None},
+    "vlm_448_8fps_h264": {"short_side": 448, "fps": 8, "sampling": "uniform", "encoder": "h264_fast",
+                          "backend": "ffmpeg"},
+    "vlm_448_8fps_intra": {"short_side": 448, "fps": 8, "sampling": "uniform", "encoder": "h264_intra",
+                           "backend": "ffmpeg"},
+}
+
+
+def output_size(width, height, profile):
+    """
+    Returns the (width, height) a frame of the given size is resized to under
+    the profile, preserving the aspect ratio. Sizes are rounded to even
+    numbers, which most encoders require. Frames are never upscaled.
+    """
+    short_side = profile["short_side"]
+    if short_side is None or min(width, height) <= short_side:
+        return width, height
+    scale = short_side / min(width, height)
+    return max(2, round(width * scale / 2) * 2), max(2, round(height * scale / 2) * 2)
+
+
+def output_fps(source_fps, profile):
+    """
+    Returns the frame rate the output clip is written with under the profile.
+    """
+    target_fps = profile["fps"]
+    if target_fps is None or source_fps <= 0 or target_fps >= source_fps:
+        return source_fps
+    if profile["sampling"] == "stride":
+        return source_fps / max(1, round(source_fps / target_fps))
+    return target_fps
+
+
+def keep_frame(frame_index, source_fps, profile):
+    """
+    Returns True if the frame at frame_index (counted from the start of the
+    output clip) is written under the profile's fps and sampling policy.
+    """
+    target_fps = profile["fps"]
+    if target_fps is None or source_fps <= 0 or target_fps >= source_fps:
+        return True
+
+    if profile["sampling"] == "stride":
+        return frame_index % max(1, round(source_fps / target_fps)) == 0
+    if profile["sampling"] == "uniform":
+        if frame_index == 0:
+            return True
+        ratio = target_fps / source_fps
+        return int(frame_index * ratio) != int((frame_index - 1) * ratio)
+    raise ValueError(f"Unknown sampling policy: {profile['sampling']}")
+
+
+def resize_frame(frame, size, buffer=None):
+    """
+    Resizes frame to size (width, height), writing into buffer when given so
+    the frame loop does not allocate. Returns frame unchanged if it already
+    has the requested size.
+    """
+    if (frame.shape[1], frame.shape[0]) == size:
+        return frame
+    return cv2.resize(frame, size, dst=buffer, interpolation=cv2.INTER_AREA)
@@ -0,0 +1,143 @@
+import json
+import os
+
+import numpy as np
+
+# Configuration (Modify these as needed)
+SHARD_SIZE = 1000           # Records per JSONL shard
+SHARD_TABLE_FILE = "shards.npz"
+
+CROPPED_TAG = "cropped"     # crop_video: <clip>_cropped.mp4
+WINDOW_TAG = "window"       # split_videos.extract_window_clips: <recording>_window_<index>.mp4
+
+
+def shard_name(shard_index, extension="jsonl"):
+    return f"shard-{shard_index:05d}.{extension}"
+
+
+def record_media(record):
+    """
+    Returns the media paths of a generated record: its "videos" list, or the
+    frame paths of its "images" list / "image" list or placeholder dict.
+    """
+    if "videos" in record:
+        return list(record["videos"])
+    if isinstance(record.get("image"), dict):
+        return list(record["image"].values())
+    if isinstance(record.get("image"), list):
+        return list(record["image"])
+    return list(record.get("images", []))
+
+
+def replace_record_media(record, paths):
+    """
+    Returns a copy of record whose media paths (see record_media) are
+    replaced by paths, in the same order.
+    """
+    record = dict(record)
+    for key in ("videos", "image", "images"):
+        if key not in record:
+            continue
+        if isinstance(record[key], dict):
+            record[key] = dict(zip(record[key], paths))
+        else:
+            record[key] = list(paths)
+        break
+    return record
+
+
+def record_answer(record):
+    """
+    Returns the final assistant answer of a generated record ("messages" or
+    "conversations") as text: the "final_answer" of chain-of-thought answers,
+    which are dictionaries, or "" if the record has no conversation.
+    """
+    messages = record.get("messages") or record.get("conversations") or []
+    content = messages[-1].get("content", "") if messages else ""
+    if isinstance(content, dict):
+        content = content.get("final_answer", json.dumps(content, sort_keys=True, ensure_ascii=False))
+    return content
+
+
+def record_label(record):
+    """
+    Returns the label of a generated record: its "label" field if it has one
+    (records whose media names carry no label), else parsed from its first
+    media path in the naming schemes of split_videos and crop_video:
+      - clips:          S01A04I01M0_ibacb_6.mp4              -> ibacb
+      - cropped clips:  S01A04I01M0_ibacb_6_cropped.mp4      -> ibacb
+      - frames:         S01A04I01M0_ibacb_6_3.jpg            -> ibacb
+      - cropped frames: S01A04I01M0_ibacb_6_cropped_3.jpg    -> ibacb
+    Returns None for window clips (S01A04I01M0_window_2.mp4, one label per
+    frame), frame-number images (S01A04I01M0_000123.jpg) and other names.
+    """
+    if isinstance(record.get("label"), str):
+        return record["label"]
+    media = record_media(record)
+    if not media:
+        return None
+    name, ext = os.path.splitext(os.path.basename(media[0]))
+    parts = name.split("_")
+    if ext.lower() != ".mp4":
+        parts = parts[:-1]      # Frame index of the extracted frame
+    if parts and parts[-1] == CROPPED_TAG:
+        parts = parts[:-1]
+    if len(parts) < 3 or not parts[-1].isdigit() or parts[-2] == WINDOW_TAG:
+        return None
+    return parts[-2]
+
+
+def write_jsonl_shards(records, output_folder, shard_size=SHARD_SIZE):
+    """
+    Writes each record once, as one JSON line, into shard-00000.jsonl,
+    shard-00001.jsonl, ... of output_folder.
+
+    Returns the shard table:
+      - shards: shard file names
+      - shard:  int32 shard index of every record
+      - offset: int64 byte offset of every record inside its shard
+      - length: int64 byte length of every record (without the newline)
+    """
+    os.makedirs(output_folder, exist_ok=True)
+    num_records = len(records)
+    shard = np.arange(num_records, dtype=np.int32) // shard_size
+    offset = np.zeros(num_records, dtype=np.int64)
+    length = np.zeros(num_records, dtype=np.int64)
+    shards = []
+
+    for shard_index in range(0, (num_records + shard_size - 1) // shard_size):
+        shards.append(shard_name(shard_index))
+        position = 0
+        with open(os.path.join(output_folder, shards[-1]), "wb") as out:
+            for i in range(shard_index * shard_size, min((shard_index + 1) * shard_size, num_records)):
+                line = json.dumps(records[i], ensure_ascii=False).encode("utf-8")
+                out.write(line + b"\n")
+                offset[i] = position
+                length[i] = len(line)
+                position += len(line) + 1
+
+    return {"shards": np.array(shards, dtype=str), "shard": shard, "offset": offset, "length": length}
+
+
+def save_shard_table(output_folder, table, **columns):
+    """
+    Saves the shard table, plus any extra per-record columns (e.g. labels),
+    to <output_folder>/shards.npz.
+    """
+    np.savez(os.path.join(output_folder, SHARD_TABLE_FILE), **table, **columns)
+
+
+def load_shard_table(output_folder):
+    with np.load(os.path.join(output_folder, SHARD_TABLE_FILE)) as table:
+        return {key: table[key] for key in table.files}
+
+
+def read_record(output_folder, table, record_id):
+    """
+    Reads a single record from its shard with one seek, without parsing the
+    rest of the shard.
+    """
+    path = os.path.join(output_folder, str(table["shards"][table["shard"][record_id]]))
+    with open(path, "rb") as f:
+        f.seek(int(table["offset"][record_id]))
+        return json.loads(f.read(int(table["length"][record_id])))
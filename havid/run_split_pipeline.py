@@ -0,0 +1,138 @@
+import argparse
+import importlib
+import inspect
+import json
+import os
+from multiprocessing import Pool
+
+from crop_config import get_crop_region, load_roi_cache
+from dataset_layout import (GRANULARITIES, HANDS, SPLITS, VIEWS, annotation_folder, bundle_path,
+                            read_bundle, view_hand_folder)
+from extract_frames_cropped import extract_video_frames
+from output_profile import OUTPUT_PROFILES
+from semantic_mappings import load_mappings
+from split_videos import split_videos_by_annotations, split_videos_hierarchical
+from video_io import check_writer
+
+# Configuration (Modify these as needed)
+GROUND_TRUTH_ROOT = "./groundTruth"
+SPLITS_ROOT = "./splits"
+VIDEO_FOLDER = "./trimmed_videos"
+SPLIT_VIDEOS_ROOT = "./split_videos"
+FRAMES_ROOT = "./frames_cropped"
+JSON_FOLDER = "./json_split_videos"
+MAPPING_FOLDER = "./groundTruth"
+
+STAGES = ["split", "frames", "json"]
+
+
+def select_recordings(view, hand, granularity, split, split_index=1, subjects=None):
+    """
+    Resolves the recordings of one split from its bundle, optionally keeping
+    only the given subjects (e.g. ["S01", "S03"]).
+    """
+    recordings = read_bundle(bundle_path(SPLITS_ROOT, view, hand, granularity, split, split_index))
+    if subjects:
+        recordings = [r for r in recordings if r[:3] in subjects]
+    return recordings
+
+
+def run_folder_name(view, hand, granularity, split):
+    """
+    Output sub-folder for one pipeline run, e.g. lh_v0_pt_test.
+    """
+    return f"{view_hand_folder(view, hand)}_{granularity}_{split}"
+
+
+def extract_split_frames(clip_folder, frames_folder, view, num_workers=None):
+    """
+    Extracts cropped frames for every clip in clip_folder into frames_folder,
+    using the crop region of the view (or each recording's detected ROI).
+    """
+    os.makedirs(frames_folder, exist_ok=True)
+    roi_cache = load_roi_cache()
+    tasks = [(os.path.join(clip_folder, filename), frames_folder, get_crop_region(view, filename, roi_cache))
+             for filename in sorted(os.listdir(clip_folder)) if filename.lower().endswith(".mp4")]
+    with Pool(num_workers) as pool:
+        num_frames = sum(pool.starmap(extract_video_frames, tasks, chunksize=4))
+    print(f"Extracted {num_frames} frames from {len(tasks)} clips into {frames_folder}")
+
+
+def generate_split_json(generator_name, input_folder, output_json, granularity="pt"):
+    """
+    Runs one of the generate_json_* modules over input_folder (split clips for
+    the *_split_videos_* generators, frames for the *_frames_* ones) and
+    writes its records to output_json. Generators that accept a granularity
+    argument get it passed through; the others only support "pt".
+    """
+    generator = importlib.import_module(generator_name)
+    loaded = load_mappings(MAPPING_FOLDER)
+    mappings = [loaded[kind] for kind in ("action_verb", "object", "tool", "label")]
+    gather = getattr(generator, "gather_split_video_annotations", None) or generator.gather_split_frames_annotations
+    if "granularity" in inspect.signature(gather).parameters:
+        json_data = gather(input_folder, *mappings, granularity=granularity)
+    else:
+        if granularity != "pt":
+            print(f"[WARNING] {generator_name} only supports primitive-task wording")
+        json_data = gather(input_folder, *mappings)
+
+    os.makedirs(os.path.dirname(output_json), exist_ok=True)
+    with open(output_json, "w", encoding="utf-8") as f:
+        json.dump(json_data, f, indent=2)
+    print(f"Wrote {len(json_data)} annotations to {output_json}.")
+
+
+def run_pipeline(view, hand, granularity, split, split_index=1, subjects=None, stages=STAGES,
+                 generator_name="generate_json_split_videos", profile_name="source", hierarchical=False):
+    """
+    Runs split -> frames -> json for only the recordings of one split bundle.
+    With hierarchical=True the split stage cuts the pt and the aa clips of
+    each video in one decode pass (both granularities share the bundles);
+    the later stages then run on the requested granularity.
+    """
+    if "split" in stages:
+        check_writer(OUTPUT_PROFILES[profile_name]["backend"], OUTPUT_PROFILES[profile_name]["encoder"])
+    recordings = select_recordings(view, hand, granularity, split, split_index, subjects)
+    print(f"{view}/{hand}_{granularity} {split}.split{split_index}: {len(recordings)} recordings")
+
+    run_folder = run_folder_name(view, hand, granularity, split)
+    clip_folder = os.path.join(SPLIT_VIDEOS_ROOT, run_folder)
+    frames_folder = os.path.join(FRAMES_ROOT, run_folder)
+
+    if "split" in stages and hierarchical:
+        split_videos_hierarchical(annotation_folder(GROUND_TRUTH_ROOT, view, hand, "pt"),
+                                  annotation_folder(GROUND_TRUTH_ROOT, view, hand, "aa"),
+                                  VIDEO_FOLDER,
+                                  os.path.join(SPLIT_VIDEOS_ROOT, run_folder_name(view, hand, "pt", split)),
+                                  os.path.join(SPLIT_VIDEOS_ROOT, run_folder_name(view, hand, "aa", split)),
+                                  OUTPUT_PROFILES[profile_name], recordings)
+    elif "split" in stages:
+        split_videos_by_annotations(annotation_folder(GROUND_TRUTH_ROOT, view, hand, granularity),
+                                    VIDEO_FOLDER, clip_folder, OUTPUT_PROFILES[profile_name], recordings)
+    if "frames" in stages:
+        extract_split_frames(clip_folder, frames_folder, view)
+    if "json" in stages:
+        input_folder = frames_folder if "frames" in generator_name else clip_folder
+        generate_split_json(generator_name, input_folder, os.path.join(JSON_FOLDER, f"{run_folder}_{generator_name}.json"),
+                            granularity)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the HA-ViD pipeline on the recordings of one split bundle.")
+    parser.add_argument("--view", choices=VIEWS, default="View0")
+    parser.add_argument("--hand", choices=HANDS, default="lh")
+    parser.add_argument("--granularity", choices=GRANULARITIES, default="pt")
+    parser.add_argument("--split", choices=SPLITS, default="test")
+    parser.add_argument("--split-index", type=int, default=1)
+    parser.add_argument("--subjects", nargs="*", help="Only process these subjects, e.g. S01 S03")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES)
+    parser.add_argument("--generator", default="generate_json_split_videos", help="generate_json_* module used by the json stage")
+    parser.add_argument("--profile", choices=sorted(OUTPUT_PROFILES), default="source", help="Output profile for the split clips")
+    parser.add_argument("--hierarchical", action="store_true", help="Cut pt and aa clips in one decode pass")
+    args = parser.parse_args()
+
+    run_pipeline(args.view, args.hand, args.granularity, args.split, args.split_index, args.subjects,
+                 args.stages, args.generator, args.profile, args.hierarchical)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+import os
+
+import numpy as np
+
+# Integer id files for each annotation granularity ("<id> <label>" per line)
+LABEL_ID_FILES = {
+    "pt": "./task_mapping.txt",     # primitive tasks, e.g. "0 ibacb"
+    "aa": "./action_mapping.txt",   # atomic actions, e.g. "93 ibacb", "0 aba"
+}
+
+
+def load_label_ids(file_path):
+    """
+    Reads a file where each line has the format:
+        <id> <label>
+    For example:
+        0 ibacb
+        1 ibscb
+
+    Returns a dictionary mapping:
+        {"ibacb": 0, "ibscb": 1, ...}
+    """
+    label_ids = {}
+    with open(file_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            idx, label = line.split(" ", 1)
+            label_ids[label.strip()] = int(idx)
+    return label_ids
+
+
+def read_frame_labels(annotation_path):
+    """
+    Reads an annotation file where lines[i] is the label of frame i.
+    """
+    with open(annotation_path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f]
+
+
+def run_length_segments(labels):
+    """
+    Groups consecutive identical labels into segments:
+        (start_frame, end_frame, label)
+    with end_frame inclusive. Returns a list of these segments.
+    """
+    if not labels:
+        return []
+
+    segments = []
+    current_label = labels[0]
+    start_frame = 0
+    for frame_idx in range(1, len(labels)):
+        if labels[frame_idx] != current_label:
+            segments.append((start_frame, frame_idx - 1, current_label))
+            current_label = labels[frame_idx]
+            start_frame = frame_idx
+    segments.append((start_frame, len(labels) - 1, current_label))
+    return segments
+
+
+def run_length_encode(label_array):
+    """
+    Array version of run_length_segments for integer label arrays.
+    Returns (starts, ends, values) as arrays, with ends inclusive.
+    """
+    label_array = np.asarray(label_array)
+    if len(label_array) == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, label_array[:0]
+    starts = np.concatenate(([0], np.flatnonzero(label_array[1:] != label_array[:-1]) + 1))
+    ends = np.concatenate((starts[1:] - 1, [len(label_array) - 1]))
+    return starts, ends, label_array[starts]
+
+
+def joint_segments(lh_labels, rh_labels):
+    """
+    Merges the per-frame labels of both hands into joint segments that end
+    wherever either hand's label changes:
+        (start_frame, end_frame, lh_label, rh_label)
+    with end_frame inclusive. Only the frames both annotations cover are used.
+    """
+    num_frames = min(len(lh_labels), len(rh_labels))
+    if len(lh_labels) != len(rh_labels):
+        print(f"[WARNING] lh/rh annotation lengths differ ({len(lh_labels)} vs {len(rh_labels)}), using {num_frames} frames")
+    pairs = list(zip(lh_labels[:num_frames], rh_labels[:num_frames]))
+    return [(start, end, lh, rh) for start, end, (lh, rh) in run_length_segments(pairs)]
+
+
+def parse_label(label):
+    """
+    Splits a primitive-task or atomic-action label into its four elements.
+    Both granularities share the same layout; atomic actions such as 'gba'
+    (verb + manipulated object) simply stop after the first object:
+      - action_verb         = label[0]
+      - manipulated_object  = label[1:3]
+      - target_object       = label[3:5]
+      - tool                = label[5:7]
+    Missing elements, and all elements of "null", are "null"; all elements
+    of "wrong" / "w" are "wrong".
+
+    Returns a tuple: (action_verb, manipulated_object, target_object, tool).
+    """
+    if label == "null":
+        return ("null", "null", "null", "null")
+    if label in ("wrong", "w"):
+        return ("wrong", "wrong", "wrong", "wrong")
+
+    action_verb         = label[0]     if len(label) >= 1 else "null"
+    manipulated_object  = label[1:3]   if len(label) >= 3 else "null"
+    target_object       = label[3:5]   if len(label) >= 5 else "null"
+    tool                = label[5:7]   if len(label) >= 7 else "null"
+    return (action_verb, manipulated_object, target_object, tool)
+
+
+def build_segment_tree(pt_labels, aa_labels, pt_ids=None, aa_ids=None):
+    """
+    Builds the hierarchical primitive-task -> atomic-action segmentation of
+    one recording from its per-frame pt and aa labels.
+
+    Returns a list of pt nodes:
+        {"start": s, "end": e, "label": "ibacb", "id": 0,
+         "children": [{"start": s, "end": e, "label": "gba", "id": 41}, ...]}
+    Atomic-action segments are clipped to the frame range of their parent
+    primitive task, so every child lies inside exactly one parent. Ids are
+    looked up in pt_ids / aa_ids when given (-1 if the label is unknown).
+    """
+    num_frames = min(len(pt_labels), len(aa_labels))
+    if len(pt_labels) != len(aa_labels):
+        print(f"[WARNING] pt/aa annotation lengths differ ({len(pt_labels)} vs {len(aa_labels)}), using {num_frames} frames")
+
+    tree = []
+    for start, end, label in run_length_segments(pt_labels[:num_frames]):
+        children = [
+            {"start": start + s, "end": start + e, "label": child,
+             "id": aa_ids.get(child, -1) if aa_ids else -1}
+            for s, e, child in run_length_segments(aa_labels[start:end + 1])
+        ]
+        tree.append({"start": start, "end": end, "label": label,
+                     "id": pt_ids.get(label, -1) if pt_ids else -1,
+                     "children": children})
+    return tree
+
+
+def load_segment_tree(pt_annotation_path, aa_annotation_path, pt_ids=None, aa_ids=None):
+    """
+    Reads the pt and aa annotation files of one recording and returns its
+    segment tree (see build_segment_tree), or [] if either file is missing.
+    """
+    if not os.path.exists(pt_annotation_path) or not os.path.exists(aa_annotation_path):
+        return []
+    return build_segment_tree(read_frame_labels(pt_annotation_path), read_frame_labels(aa_annotation_path),
+                              pt_ids, aa_ids)
@@ -0,0 +1,197 @@
+import argparse
+import json
+import os
+from multiprocessing import Pool
+
+import numpy as np
+
+from dataset_layout import GRANULARITIES, HANDS, VIEWS, annotation_folder, bundle_path, read_bundle
+from label_vocabulary import build_vocabulary, encode_annotation_file, load_encoded_folder, recording_labels
+from segmentation import run_length_encode
+
+# Configuration (Modify these as needed)
+GROUND_TRUTH_ROOT = "./groundTruth"
+PREDICTIONS_ROOT = "./predictions"      # Same layout as groundTruth: <view>/<hand>_<granularity>/<recording>.txt
+SPLITS_ROOT = "./splits"
+OVERLAPS = (0.10, 0.25, 0.50)           # IoU thresholds of the segmental F1 scores
+IGNORED_LABELS = ["null"]               # Background labels left out of the edit and F1 scores
+NUM_WORKERS = os.cpu_count()
+
+
+def segment_arrays(label_array, ignored_ids=()):
+    """
+    Run-length segments of an encoded label array as (starts, ends, values),
+    without the segments of ignored_ids.
+    """
+    starts, ends, values = run_length_encode(label_array)
+    keep = ~np.isin(values, list(ignored_ids))
+    return starts[keep], ends[keep], values[keep]
+
+
+def edit_distance(a, b):
+    """
+    Levenshtein distance between two label sequences. Each row of the
+    dynamic program is computed with array operations: substitutions and
+    deletions elementwise, insertion chains with a running minimum.
+    """
+    if len(a) == 0 or len(b) == 0:
+        return max(len(a), len(b))
+    columns = np.arange(len(b) + 1)
+    row = columns.copy()
+    for i, value in enumerate(a, 1):
+        best = np.empty_like(row)
+        best[0] = i
+        best[1:] = np.minimum(row[1:] + 1, row[:-1] + (b != value))
+        row = np.minimum.accumulate(best - columns) + columns
+    return int(row[-1])
+
+
+def edit_score(pred_values, true_values):
+    """
+    Segmental edit score in [0, 100]: 100 * (1 - normalized Levenshtein
+    distance) between the predicted and ground-truth segment label sequences.
+    """
+    longest = max(len(pred_values), len(true_values))
+    if longest == 0:
+        return 100.0
+    return (1.0 - edit_distance(pred_values, true_values) / longest) * 100.0
+
+
+def overlap_counts(pred_segments, true_segments, overlaps=OVERLAPS):
+    """
+    True positives, false positives and false negatives of the predicted
+    segments at every IoU threshold. The IoU of all predicted/ground-truth
+    segment pairs is one broadcast; each predicted segment is then matched,
+    in order, to its best-overlapping ground-truth segment of the same label,
+    which counts as a hit once. Returns an int64 array (len(overlaps), 3).
+    """
+    pred_starts, pred_ends, pred_values = pred_segments
+    true_starts, true_ends, true_values = true_segments
+    counts = np.zeros((len(overlaps), 3), dtype=np.int64)
+    if len(true_values) == 0:
+        counts[:, 1] = len(pred_values)
+        return counts
+
+    intersection = np.minimum(pred_ends[:, None], true_ends[None, :]) - np.maximum(pred_starts[:, None], true_starts[None, :]) + 1
+    union = np.maximum(pred_ends[:, None], true_ends[None, :]) - np.minimum(pred_starts[:, None], true_starts[None, :]) + 1
+    iou = np.clip(intersection, 0, None) / union * (pred_values[:, None] == true_values[None, :])
+    best = iou.argmax(axis=1) if len(pred_values) else np.empty(0, dtype=np.int64)
+    best_iou = iou[np.arange(len(pred_values)), best]
+
+    for k, overlap in enumerate(overlaps):
+        hits = np.zeros(len(true_values), dtype=bool)
+        for i in np.flatnonzero(best_iou >= overlap):
+            if not hits[best[i]]:
+                hits[best[i]] = True
+                counts[k, 0] += 1
+        counts[k, 1] = len(pred_values) - counts[k, 0]
+        counts[k, 2] = len(true_values) - counts[k, 0]
+    return counts
+
+
+def recording_metrics(pred_array, true_array, ignored_ids=(), overlaps=OVERLAPS):
+    """
+    Frame counts, edit score and F1 counts of one recording, over the whole
+    ground truth: frames the prediction is missing count as wrong and the
+    segments it does not reach as false negatives. Predicted frames past the
+    end of the ground truth are not scored.
+    """
+    pred_array = pred_array[:len(true_array)]
+    pred_segments = segment_arrays(pred_array, ignored_ids)
+    true_segments = segment_arrays(true_array, ignored_ids)
+    return {
+        "frames": len(true_array),
+        "correct": int(np.count_nonzero(pred_array == true_array[:len(pred_array)])),
+        "edit": edit_score(pred_segments[2], true_segments[2]),
+        "overlap_counts": overlap_counts(pred_segments, true_segments, overlaps),
+    }
+
+
+def summarize(results, overlaps=OVERLAPS):
+    """
+    Combines per-recording results: frame accuracy over all frames, mean
+    edit score, and F1@overlap from the summed TP/FP/FN counts.
+    """
+    if not results:
+        return {"recordings": 0}
+    counts = np.sum([r["overlap_counts"] for r in results], axis=0)
+    precision = counts[:, 0] / np.maximum(counts[:, 0] + counts[:, 1], 1)
+    recall = counts[:, 0] / np.maximum(counts[:, 0] + counts[:, 2], 1)
+    f1 = 2 * precision * recall / np.maximum(precision + recall, 1e-12) * 100
+    summary = {
+        "recordings": len(results),
+        "frames": int(sum(r["frames"] for r in results)),
+        "accuracy": 100.0 * sum(r["correct"] for r in results) / max(sum(r["frames"] for r in results), 1),
+        "edit": float(np.mean([r["edit"] for r in results])),
+    }
+    summary.update({f"F1@{round(overlap * 100)}": float(score) for overlap, score in zip(overlaps, f1)})
+    return summary
+
+
+def _recording_task(task):
+    recording, true_array, prediction_path, vocabulary, ignored_ids, overlaps = task
+    pred_array = encode_annotation_file(prediction_path, vocabulary)
+    if len(pred_array) != len(true_array):
+        print(f"[WARNING] {recording}: {len(pred_array)} predicted frames for {len(true_array)} annotated frames")
+    result = recording_metrics(pred_array, true_array, ignored_ids, overlaps)
+    result["recording"] = recording
+    return result
+
+
+def evaluate_split(view, hand, granularity, split="test", split_index=1, predictions_root=PREDICTIONS_ROOT,
+                   ground_truth_root=GROUND_TRUTH_ROOT, splits_root=SPLITS_ROOT, ignored_labels=IGNORED_LABELS,
+                   overlaps=OVERLAPS, num_workers=NUM_WORKERS):
+    """
+    Evaluates the predictions of every recording of a split bundle. The
+    ground truth comes from the encoded (cached) annotation folder; the
+    recordings are scored in a process pool. Returns (summary, per-recording
+    results).
+    """
+    vocabulary = build_vocabulary(granularity)
+    encoded = load_encoded_folder(annotation_folder(ground_truth_root, view, hand, granularity), vocabulary)
+    ignored_ids = [vocabulary["label_ids"][label] for label in ignored_labels if label in vocabulary["label_ids"]]
+    prediction_folder = annotation_folder(predictions_root, view, hand, granularity)
+
+    tasks = []
+    for recording in read_bundle(bundle_path(splits_root, view, hand, granularity, split, split_index)):
+        prediction_path = os.path.join(prediction_folder, recording + ".txt")
+        if not os.path.exists(prediction_path):
+            print(f"[WARNING] Missing prediction: {prediction_path}")
+            continue
+        try:
+            true_array = recording_labels(encoded, recording)
+        except KeyError:
+            print(f"[WARNING] Missing annotation for recording: {recording}")
+            continue
+        tasks.append((recording, true_array, prediction_path, vocabulary, ignored_ids, overlaps))
+
+    with Pool(min(num_workers, max(len(tasks), 1))) as pool:
+        results = pool.map(_recording_task, tasks, chunksize=max(1, len(tasks) // (4 * num_workers)))
+    return summarize(results, overlaps), results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Frame accuracy, edit score and F1@k of per-frame predictions.")
+    parser.add_argument("--predictions", default=PREDICTIONS_ROOT)
+    parser.add_argument("--view", choices=VIEWS, default="View0")
+    parser.add_argument("--hand", choices=HANDS, default="lh")
+    parser.add_argument("--granularity", choices=GRANULARITIES, default="pt")
+    parser.add_argument("--split", default="test")
+    parser.add_argument("--split-index", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=NUM_WORKERS)
+    parser.add_argument("--output", help="Write the summary and per-recording results to this JSON file")
+    args = parser.parse_args()
+
+    summary, results = evaluate_split(args.view, args.hand, args.granularity, args.split, args.split_index,
+                                      args.predictions, num_workers=args.workers)
+    for key, value in summary.items():
+        print(f"  {key:<10} {value:.2f}" if isinstance(value, float) else f"  {key:<10} {value}")
+
+    if args.output:
+        for result in results:
+            result["overlap_counts"] = result["overlap_counts"].tolist()
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"summary": summary, "recordings": results}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
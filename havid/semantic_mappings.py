@@ -0,0 +1,269 @@
+import os
+import pickle
+import re
+
+import numpy as np
+
+from segmentation import LABEL_ID_FILES, load_label_ids, parse_label
+
+# Configuration (Modify these as needed)
+MAPPING_FOLDER = "./groundTruth"
+CACHE_FILE = "./groundTruth/cache/mappings.pkl"     # Validated mappings and decompositions
+UNIQUE_LABELS_FILE = "pt_unique_labels.txt"         # Labels every mapping has to cover
+
+# Mapping files and the code length of their entries (None: checked separately)
+MAPPING_FILES = {
+    "action_verb": ("action_verb_mapping.txt", 1),  # i "insert"
+    "object": ("object_mapping.txt", 2),            # ba "ball"
+    "tool": ("tool_mapping.txt", 2),                # dh "hex screwdriver"
+    "label": ("label_mapping.txt", None),           # ibacb "insert the ball into the cylinder base"
+}
+
+# One mapping entry: a code without spaces, one space, and a quoted name
+MAPPING_LINE = re.compile(r'^(\S+) "([^"]+)"$')
+SPECIAL_LABELS = ("null", "wrong", "w")
+ELEMENT_KINDS = ("action_verb", "object", "object", "tool")
+HAND_NAMES = {"lh": "left", "rh": "right"}
+
+
+def load_object_mapping(file_path, code_length=None):
+    """
+    Reads a file where each line has the format:
+        XX "semantic name"
+    For example:
+        ba "ball"
+        bs "ball seat"
+
+    Returns a dictionary mapping, in file order:
+        {"ba": "ball", "bs": "ball seat", ...}
+
+    Blank lines are skipped. Raises ValueError on a malformed line, a
+    duplicated code, or a code whose length differs from code_length.
+    """
+    mapping = {}
+    with open(file_path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            match = MAPPING_LINE.match(line)
+            if match is None:
+                raise ValueError(f"{file_path}:{line_number}: expected 'code \"name\"', got {line!r}")
+            code, name = match.groups()
+            if code in mapping:
+                raise ValueError(f"{file_path}:{line_number}: duplicate code {code!r}")
+            if code_length is not None and len(code) != code_length:
+                raise ValueError(f"{file_path}:{line_number}: code {code!r} is not {code_length} characters long")
+            mapping[code] = name
+    return mapping
+
+
+def _ends_with_newline(file_path):
+    with open(file_path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell() == 0:
+            return True
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+def decompose_label(label, mappings, placeholder="null"):
+    """
+    Decomposes a label the way the generators describe it:
+      - codes:   (verb, manipulated, target, tool) codes from label[0], [1:3],
+                 [3:5], [5:7]; missing elements and every element of "null"
+                 are placeholder, "wrong" is ("wrong", placeholder, ...)
+      - names:   semantic name of every code (codes without an entry keep the code)
+      - indices: line index of every code in its mapping file, -1 if it has none
+      - semantics, semantics_index: description and line index in label_mapping.txt
+    """
+    if label == "null":
+        codes = (placeholder,) * 4
+    elif label == "wrong":
+        codes = ("wrong", placeholder, placeholder, placeholder)
+    else:
+        codes = tuple(label[start:end] if len(label) >= end else placeholder
+                      for start, end in ((0, 1), (1, 3), (3, 5), (5, 7)))
+
+    element_mappings = [mappings[kind] for kind in ELEMENT_KINDS]
+    label_codes = list(mappings["label"])
+    return {
+        "codes": codes,
+        "names": tuple(mapping.get(code, code) for code, mapping in zip(codes, element_mappings)),
+        "indices": tuple(list(mapping).index(code) if code in mapping else -1
+                         for code, mapping in zip(codes, element_mappings)),
+        "semantics": label if label in ("null", "wrong") else mappings["label"].get(label, label),
+        "semantics_index": label_codes.index(label) if label in mappings["label"] else -1,
+    }
+
+
+def build_decomposition_table(action_verb_mapping, object_mapping, tool_mapping, label_mapping,
+                              placeholder="null", label_ids_file=LABEL_ID_FILES["pt"]):
+    """
+    Decomposes every primitive-task label once. Returns:
+      - labels:            label strings indexed by their id from task_mapping.txt
+      - label_ids:         {label: id}
+      - rows:              {label: decompose_label(label)} for every label of
+                           label_mapping.txt and task_mapping.txt
+      - indices:           int16 array (num_labels, 4) of the element indices of every label id
+      - semantics_indices: int16 array (num_labels,) of the label_mapping.txt line of every label id
+    placeholder names the missing elements ("null", or "None" for the
+    generators whose answers say "None").
+    """
+    mappings = {"action_verb": action_verb_mapping, "object": object_mapping, "tool": tool_mapping,
+                "label": label_mapping}
+    label_ids = load_label_ids(label_ids_file)
+    labels = [None] * (max(label_ids.values()) + 1)
+    for label, idx in label_ids.items():
+        labels[idx] = label
+
+    rows = {label: decompose_label(label, mappings, placeholder)
+            for label in list(label_mapping) + [label for label in labels if label is not None]}
+    indices = np.full((len(labels), 4), -1, dtype=np.int16)
+    semantics_indices = np.full(len(labels), -1, dtype=np.int16)
+    for idx, label in enumerate(labels):
+        if label is not None:
+            indices[idx] = rows[label]["indices"]
+            semantics_indices[idx] = rows[label]["semantics_index"]
+
+    return {"placeholder": placeholder, "mappings": mappings, "labels": labels, "label_ids": label_ids,
+            "rows": rows, "indices": indices, "semantics_indices": semantics_indices}
+
+
+def lookup_decomposition(table, label):
+    """
+    Returns the precomputed decomposition of label; labels outside the table
+    (atomic actions, labels missing from the mappings) are decomposed on the fly.
+    """
+    row = table["rows"].get(label)
+    if row is None:
+        row = decompose_label(label, table["mappings"], table["placeholder"])
+    return row
+
+
+def element_arrays(label_id_array, table):
+    """
+    Returns the per-element indices of an array of label ids as an int16
+    array of shape (n, 4); ids outside the table map to -1.
+    """
+    padded = np.vstack([table["indices"], np.full((1, 4), -1, dtype=np.int16)])
+    return padded[np.minimum(np.asarray(label_id_array), len(table["indices"]))]
+
+
+def compose_semantics(action_verb, manipulated_object, target_object, tool):
+    """
+    Builds a description such as "place the ball" or "screw the hex screw to
+    the screw hole C1 using the hex screwdriver" from mapped action elements.
+    Used for atomic-action labels, which have no entry in label_mapping.txt.
+    """
+    semantics = f"{action_verb} the {manipulated_object}"
+    if target_object != "null":
+        semantics += f" to the {target_object}"
+    if tool != "null":
+        semantics += f" using the {tool}"
+    return semantics
+
+
+def describe_label(label, table, hand, granularity="pt"):
+    # e.g. "The left hand of the worker insert the ball into the cylinder base."
+    # Atomic actions have no label_mapping.txt entry and are composed from their elements
+    if label == "null":
+        return f"The {HAND_NAMES[hand]} hand of the worker did nothing related to the assembly task."
+    if label in ("wrong", "w"):
+        return f"The {HAND_NAMES[hand]} hand of the worker made a mistake."
+    decomposition = lookup_decomposition(table, label)
+    if decomposition["semantics_index"] >= 0 or granularity == "pt":
+        semantics = decomposition["semantics"]
+    else:
+        semantics = compose_semantics(*decomposition["names"])
+    return f"The {HAND_NAMES[hand]} hand of the worker {semantics}."
+
+
+def answer_hand(text):
+    """
+    The hand ("lh"/"rh") a question or answer names, "both" if it names
+    both hands and "unknown" if it names none.
+    """
+    hands = [hand for hand, name in HAND_NAMES.items() if f"{name} hand" in text.lower()]
+    return hands[0] if len(hands) == 1 else "both" if hands else "unknown"
+
+
+def validate_mappings(mappings, unique_labels):
+    """
+    Checks that every label of unique_labels has a description in the label
+    mapping and that every element code of every described label has an
+    entry in the verb/object/tool mappings. Raises ValueError listing all
+    problems found.
+    """
+    problems = []
+    for label in unique_labels:
+        if label not in mappings["label"]:
+            problems.append(f"label {label!r} is missing from {MAPPING_FILES['label'][0]}")
+    for label in mappings["label"]:
+        if label in SPECIAL_LABELS:
+            continue
+        if len(label) not in (3, 5, 7):
+            problems.append(f"label {label!r} does not split into verb/object/object/tool codes")
+            continue
+        for code, kind in zip(parse_label(label), ELEMENT_KINDS):
+            if code != "null" and code not in mappings[kind]:
+                problems.append(f"label {label!r}: {kind} code {code!r} is missing from {MAPPING_FILES[kind][0]}")
+    if problems:
+        raise ValueError("Invalid mapping files:\n  " + "\n  ".join(problems))
+
+
+def _source_files(mapping_folder):
+    return [os.path.join(mapping_folder, name) for name, _ in MAPPING_FILES.values()] + \
+           [os.path.join(mapping_folder, UNIQUE_LABELS_FILE), LABEL_ID_FILES["pt"]]
+
+
+def build_mappings(mapping_folder=MAPPING_FOLDER):
+    """
+    Loads and validates all mapping files of mapping_folder. Returns
+        {"action_verb": {...}, "object": {...}, "tool": {...}, "label": {...},
+         "table": build_decomposition_table(...) with "null" placeholders}
+    """
+    mappings = {}
+    for kind, (name, code_length) in MAPPING_FILES.items():
+        file_path = os.path.join(mapping_folder, name)
+        if not _ends_with_newline(file_path):
+            print(f"[WARNING] {file_path} has no trailing newline")
+        mappings[kind] = load_object_mapping(file_path, code_length)
+
+    unique_labels_file = os.path.join(mapping_folder, UNIQUE_LABELS_FILE)
+    unique_labels = []
+    if os.path.exists(unique_labels_file):
+        with open(unique_labels_file, "r", encoding="utf-8") as f:
+            unique_labels = [line.strip() for line in f if line.strip()]
+    validate_mappings(mappings, unique_labels)
+
+    mappings["table"] = build_decomposition_table(mappings["action_verb"], mappings["object"], mappings["tool"],
+                                                  mappings["label"])
+    return mappings
+
+
+def load_mappings(mapping_folder=MAPPING_FOLDER, cache_file=CACHE_FILE):
+    """
+    Returns build_mappings(mapping_folder), read from a pickle cache while the
+    mapping files are unchanged, so generators skip parsing and validation.
+    """
+    mtimes = {path: os.path.getmtime(path) for path in _source_files(mapping_folder) if os.path.exists(path)}
+    if os.path.exists(cache_file):
+        with open(cache_file, "rb") as f:
+            cached = pickle.load(f)
+        if cached.get("source_mtimes") == mtimes and "table" in cached["mappings"]:
+            return cached["mappings"]
+
+    mappings = build_mappings(mapping_folder)
+    os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+    with open(cache_file, "wb") as f:
+        pickle.dump({"source_mtimes": mtimes, "mappings": mappings}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return mappings
+
+
+def main():
+    mappings = build_mappings()
+    print(", ".join(f"{len(mappings[kind])} {kind} codes" for kind in MAPPING_FILES) + " - all valid.")
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,17 @@
 import os
-import cv2
+import json
+import numpy as np
+
+from frame_cache import cached_frame, close_frame_cache, open_frame_cache
+from label_vocabulary import build_vocabulary, load_encoded_folder, recording_labels
+from output_profile import OUTPUT_PROFILES, keep_frame, output_fps, output_size, resize_frame
+from segmentation import (LABEL_ID_FILES, joint_segments, load_label_ids, load_segment_tree, read_frame_labels,
+                          run_length_segments)
+from video_io import close_video, close_writer, open_video, open_writer, read_frame, seek_frame, write_frame
+
+# Sliding-window mode: window length and stride in source frames
+WINDOW_LENGTH = 64
+WINDOW_STRIDE = 32
 
 def parse_annotation_file(annotation_path):
     """
@@ -9,72 +21,227 @@ def parse_annotation_file(annotation_path):
         (start_frame, end_frame, label)
     Returns a list of these segments.
     """
-    with open(annotation_path, "r", encoding="utf-8") as f:
-        labels = [line.strip() for line in f]
-
-    if not labels:
-        return []
-
-    segments = []
-    current_label = labels[0]
-    start_frame = 0
-
-    for frame_idx in range(1, len(labels)):
-        if labels[frame_idx] != current_label:
-            # Close off the previous segment
-            segments.append((start_frame, frame_idx - 1, current_label))
-            # Start a new segment
-            current_label = labels[frame_idx]
-            start_frame = frame_idx
-
-    # Add the final segment
-    segments.append((start_frame, len(labels) - 1, current_label))
-
-    return segments
+    return run_length_segments(read_frame_labels(annotation_path))
 
-def extract_clips_from_video(video_path, segments, output_folder, base_name):
+def extract_clips_from_video(video_path, segments, output_folder, base_name, profile=OUTPUT_PROFILES["source"]):
     """
     Given a video and a list of segments (start_frame, end_frame, label),
     create separate small videos for each segment in the output_folder.
     Naming convention: baseName_label_index.mp4
+    Clips are resized and frame-sampled according to the output profile
+    (see output_profile.py), so they are stored at training resolution.
+    Decoding and encoding go through video_io's configured backend/encoder.
     """
-    cap = cv2.VideoCapture(video_path)
-    if not cap.isOpened():
-        print(f"[ERROR] Could not open video: {video_path}")
+    video = open_video(video_path)
+    if video is None:
         return
 
-    fps = cap.get(cv2.CAP_PROP_FPS)
-    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    fps, width, height = video["fps"], video["width"], video["height"]
+
+    # Output size and frame rate under the profile, plus a reusable resize buffer
+    out_size = output_size(width, height, profile)
+    out_fps = output_fps(fps, profile)
+    resize_buffer = np.empty((out_size[1], out_size[0], 3), dtype=np.uint8)
 
     for idx, (start_frame, end_frame, label) in enumerate(segments):
         # Construct output filename
         clip_filename = f"{base_name}_{label}_{idx}.mp4"
         clip_path = os.path.join(output_folder, clip_filename)
 
-        fourcc = cv2.VideoWriter_fourcc(*'mp4v')  # Adjust if needed
-        out = cv2.VideoWriter(clip_path, fourcc, fps, (width, height))
+        out = open_writer(clip_path, out_fps, out_size, profile["backend"], profile["encoder"])
 
         # Move video capture position to start_frame
-        cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+        seek_frame(video, start_frame)
 
         # Write frames from start_frame to end_frame (inclusive)
         current_frame = start_frame
         while current_frame <= end_frame:
-            ret, frame = cap.read()
-            if not ret:
+            frame = read_frame(video)
+            if frame is None:
                 break
-            out.write(frame)
+            if keep_frame(current_frame - start_frame, fps, profile):
+                write_frame(out, resize_frame(frame, out_size, resize_buffer))
             current_frame += 1
 
-        out.release()
+        close_writer(out)
         print(f"Saved clip: {clip_filename}, frames [{start_frame}..{end_frame}], label={label}")
 
-    cap.release()
+    close_video(video)
+
+def extract_hierarchical_clips(video_path, tree, pt_output_folder, aa_output_folder, base_name, profile=OUTPUT_PROFILES["source"]):
+    """
+    Given a video and its pt -> aa segment tree (see segmentation.build_segment_tree),
+    writes one clip per primitive task to pt_output_folder and one clip per
+    atomic action to aa_output_folder in a single sequential decode pass:
+    every decoded frame goes to both the open pt clip and the open aa clip.
+    Naming convention: baseName_label_index.mp4, with the aa index counted
+    over all atomic actions of the recording.
+    """
+    video = open_video(video_path)
+    if video is None:
+        return
+
+    fps, width, height = video["fps"], video["width"], video["height"]
+
+    out_size = output_size(width, height, profile)
+    out_fps = output_fps(fps, profile)
+    frame_buffer = np.empty((height, width, 3), dtype=np.uint8)
+    resize_buffer = np.empty((out_size[1], out_size[0], 3), dtype=np.uint8)
+
+    # The tree starts at frame 0 and is contiguous, so frames are read in order
+    aa_index = 0
+    ended = False
+    for pt_index, node in enumerate(tree):
+        pt_filename = f"{base_name}_{node['label']}_{pt_index}.mp4"
+        pt_out = open_writer(os.path.join(pt_output_folder, pt_filename), out_fps, out_size,
+                             profile["backend"], profile["encoder"])
 
-def split_videos_by_annotations(annotation_folder, video_folder, output_folder):
+        for child in node["children"]:
+            aa_filename = f"{base_name}_{child['label']}_{aa_index}.mp4"
+            aa_out = open_writer(os.path.join(aa_output_folder, aa_filename), out_fps, out_size,
+                                 profile["backend"], profile["encoder"])
+
+            for frame_number in range(child["start"], child["end"] + 1):
+                frame = read_frame(video, frame_buffer)
+                if frame is None:
+                    ended = True
+                    break
+                frame = resize_frame(frame, out_size, resize_buffer)
+                if keep_frame(frame_number - node["start"], fps, profile):
+                    write_frame(pt_out, frame)
+                if keep_frame(frame_number - child["start"], fps, profile):
+                    write_frame(aa_out, frame)
+
+            close_writer(aa_out)
+            aa_index += 1
+            if ended:
+                break
+
+        close_writer(pt_out)
+        print(f"Saved clip: {pt_filename}, frames [{node['start']}..{node['end']}], label={node['label']}, "
+              f"{len(node['children'])} atomic actions")
+        if ended:
+            print(f"[WARNING] Video ended before the annotation: {video_path}")
+            break
+
+    close_video(video)
+
+def window_starts(num_frames, length=WINDOW_LENGTH, stride=WINDOW_STRIDE):
+    """
+    Start frames of the fixed-length windows over num_frames frames. A last
+    window aligned to the end is added when the stride does not reach it.
+    """
+    if num_frames <= length:
+        return np.zeros(1 if num_frames > 0 else 0, dtype=np.int64)
+    starts = np.arange(0, num_frames - length + 1, stride)
+    if starts[-1] != num_frames - length:
+        starts = np.append(starts, num_frames - length)
+    return starts
+
+def extract_window_clips(video_path, label_array, output_folder, base_name, length=WINDOW_LENGTH, stride=WINDOW_STRIDE,
+                         profile=OUTPUT_PROFILES["source"], write_clips=True):
+    """
+    Cuts overlapping fixed-length windows from a video, stride frames apart.
+    Frames are decoded once into an LRU frame cache holding one window, so
+    the overlap of consecutive windows is taken from the cache instead of
+    being decoded again. Naming convention: baseName_window_index.mp4
+
+    label_array holds the per-frame label ids of the recording; every window
+    gets label_array[start:start + length] (an array view) as supervision,
+    cut to the frames written when a clip ends early; windows whose first
+    frame cannot be decoded are skipped. With write_clips=False only the
+    window records are produced.
+
+    Returns one record per window: clip, video, start, length, per-frame
+    label ids and the label id counts.
     """
-    1. For each .txt annotation file in annotation_folder:
+    cache = open_frame_cache(video_path, capacity=length)
+    if cache is None:
+        return []
+    fps = cache["fps"]
+    out_size = output_size(cache["video"]["width"], cache["video"]["height"], profile)
+    out_fps = output_fps(fps, profile)
+    cache["transform"] = lambda frame: resize_frame(frame, out_size)
+
+    records = []
+    num_frames = min(len(label_array), cache["num_frames"])
+    for idx, start in enumerate(window_starts(num_frames, length, stride).tolist()):
+        window_labels = label_array[start:start + length]
+        clip_filename = f"{base_name}_window_{idx}.mp4"
+        if write_clips:
+            clip_path = os.path.join(output_folder, clip_filename)
+            out = open_writer(clip_path, out_fps, out_size, profile["backend"], profile["encoder"])
+            num_decoded = 0
+            for frame_number in range(start, start + len(window_labels)):
+                frame = cached_frame(cache, frame_number)
+                if frame is None:
+                    break
+                if keep_frame(frame_number - start, fps, profile):
+                    write_frame(out, frame)
+                num_decoded += 1
+            close_writer(out)
+            if num_decoded == 0:
+                print(f"[WARNING] Could not decode frame {start} of {base_name}, skipping window {idx}")
+                if os.path.exists(clip_path):
+                    os.remove(clip_path)
+                continue
+            if num_decoded < len(window_labels):
+                # The clip ends early; keep the supervision aligned with the frames it holds
+                print(f"[WARNING] {clip_filename} ends after {num_decoded} of {len(window_labels)} frames")
+                window_labels = window_labels[:num_decoded]
+
+        values, counts = np.unique(window_labels, return_counts=True)
+        records.append({
+            "clip": clip_filename if write_clips else None,
+            "video": os.path.basename(video_path),
+            "start": start,
+            "length": len(window_labels),
+            "labels": window_labels.tolist(),
+            "label_counts": dict(zip(map(str, values.tolist()), counts.tolist())),
+        })
+
+    hits, decoded = close_frame_cache(cache)
+    print(f"Saved {len(records)} windows of {base_name}: {decoded} frames decoded, {hits} taken from the cache")
+    return records
+
+def split_videos_sliding_windows(annotation_folder, video_folder, output_folder, granularity="pt", length=WINDOW_LENGTH,
+                                 stride=WINDOW_STRIDE, profile=OUTPUT_PROFILES["source"], recordings=None, write_clips=True):
+    """
+    Dense counterpart of split_videos_by_annotations: writes overlapping
+    fixed-length window clips of every recording to output_folder, plus
+    output_folder/windows.jsonl with one record per window (see
+    extract_window_clips). Label ids follow task_mapping.txt /
+    action_mapping.txt; labels missing there get the vocabulary's unknown id.
+    """
+    os.makedirs(output_folder, exist_ok=True)
+    vocabulary = build_vocabulary(granularity)
+    encoded = load_encoded_folder(annotation_folder, vocabulary)
+    if recordings is None:
+        recordings = encoded["recordings"].tolist()
+
+    num_windows = 0
+    with open(os.path.join(output_folder, "windows.jsonl"), "w", encoding="utf-8") as index:
+        for base_name in recordings:
+            video_path = os.path.join(video_folder, base_name + ".mp4")
+            if not os.path.exists(video_path):
+                print(f"[WARNING] No matching .mp4 for annotation: {base_name}.txt")
+                continue
+            try:
+                label_array = recording_labels(encoded, base_name)
+            except KeyError:
+                print(f"[WARNING] Missing annotation: {base_name}.txt")
+                continue
+
+            for record in extract_window_clips(video_path, label_array, output_folder, base_name, length, stride,
+                                               profile, write_clips):
+                index.write(json.dumps(record) + "\n")
+                num_windows += 1
+    print(f"Wrote {num_windows} windows to {output_folder}")
+
+def split_videos_by_annotations(annotation_folder, video_folder, output_folder, profile=OUTPUT_PROFILES["source"], recordings=None):
+    """
+    1. For each .txt annotation file in annotation_folder (or only those of
+       the given recordings, e.g. the ones listed in a split bundle):
        - Build its base name (file without extension).
        - Find a matching .mp4 video in video_folder with the same base name.
        - Parse the annotation to get segments (start_frame, end_frame, label).
@@ -85,11 +252,19 @@ def split_videos_by_annotations(annotation_folder, video_folder, output_folder):
 
     os.makedirs(output_folder, exist_ok=True)
 
-    for ann_filename in os.listdir(annotation_folder):
+    if recordings is None:
+        ann_filenames = os.listdir(annotation_folder)
+    else:
+        ann_filenames = [recording + ".txt" for recording in recordings]
+
+    for ann_filename in ann_filenames:
         if not ann_filename.endswith(".txt"):
             continue
 
         annotation_path = os.path.join(annotation_folder, ann_filename)
+        if not os.path.exists(annotation_path):
+            print(f"[WARNING] Missing annotation: {annotation_path}")
+            continue
         base_name = os.path.splitext(ann_filename)[0]
         video_filename = base_name + ".mp4"
         video_path = os.path.join(video_folder, video_filename)
@@ -105,15 +280,79 @@ def split_videos_by_annotations(annotation_folder, video_folder, output_folder):
             continue
 
         # Extract clips from the video
-        extract_clips_from_video(video_path, segments, output_folder, base_name)
+        extract_clips_from_video(video_path, segments, output_folder, base_name, profile)
+
+def split_videos_hierarchical(pt_annotation_folder, aa_annotation_folder, video_folder,
+                              pt_output_folder, aa_output_folder, profile=OUTPUT_PROFILES["source"], recordings=None):
+    """
+    Like split_videos_by_annotations, but produces both granularities from a
+    single decode of each video: pt clips go to pt_output_folder and aa clips
+    to aa_output_folder. Recordings need an annotation file in both folders.
+    """
+    os.makedirs(pt_output_folder, exist_ok=True)
+    os.makedirs(aa_output_folder, exist_ok=True)
+    pt_ids = load_label_ids(LABEL_ID_FILES["pt"])
+    aa_ids = load_label_ids(LABEL_ID_FILES["aa"])
+
+    if recordings is None:
+        recordings = [os.path.splitext(f)[0] for f in os.listdir(pt_annotation_folder) if f.endswith(".txt")]
+
+    for base_name in recordings:
+        video_path = os.path.join(video_folder, base_name + ".mp4")
+        if not os.path.exists(video_path):
+            print(f"[WARNING] No matching .mp4 for annotation: {base_name}.txt")
+            continue
+
+        tree = load_segment_tree(os.path.join(pt_annotation_folder, base_name + ".txt"),
+                                 os.path.join(aa_annotation_folder, base_name + ".txt"),
+                                 pt_ids, aa_ids)
+        if not tree:
+            print(f"[WARNING] Missing or empty pt/aa annotation: {base_name}.txt")
+            continue
+
+        extract_hierarchical_clips(video_path, tree, pt_output_folder, aa_output_folder, base_name, profile)
+
+def split_videos_bimanual(lh_annotation_folder, rh_annotation_folder, video_folder, output_folder,
+                          profile=OUTPUT_PROFILES["source"], recordings=None):
+    """
+    Cuts every video once into joint left/right-hand segments (see
+    segmentation.joint_segments): a new clip starts whenever either hand's
+    label changes, so every clip has one label per hand. Naming convention:
+        baseName_lhLabel-rhLabel_index.mp4
+    The same clips serve the bimanual and the per-hand samples (see
+    generate_json_bimanual.py). Recordings need an annotation in both folders.
+    """
+    os.makedirs(output_folder, exist_ok=True)
+    if recordings is None:
+        recordings = [os.path.splitext(f)[0] for f in os.listdir(lh_annotation_folder) if f.endswith(".txt")]
+
+    for base_name in recordings:
+        lh_path = os.path.join(lh_annotation_folder, base_name + ".txt")
+        rh_path = os.path.join(rh_annotation_folder, base_name + ".txt")
+        video_path = os.path.join(video_folder, base_name + ".mp4")
+        if not os.path.exists(lh_path) or not os.path.exists(rh_path):
+            print(f"[WARNING] Missing lh/rh annotation: {base_name}.txt")
+            continue
+        if not os.path.exists(video_path):
+            print(f"[WARNING] No matching .mp4 for annotation: {base_name}.txt")
+            continue
+
+        segments = [(start, end, f"{lh}-{rh}")
+                    for start, end, lh, rh in joint_segments(read_frame_labels(lh_path), read_frame_labels(rh_path))]
+        if not segments:
+            print(f"[WARNING] No frames in annotation: {base_name}.txt")
+            continue
+        extract_clips_from_video(video_path, segments, output_folder, base_name, profile)
 
 def main():
     # Change these paths to match your setup
     annotation_folder = "./groundTruth/View0/lh_pt"
     video_folder = "./trimmed_videos"
     output_folder = "./split_videos/lh_v0"
+    # Output profile from output_profile.OUTPUT_PROFILES ("source" keeps fps and resolution)
+    profile = OUTPUT_PROFILES["source"]
 
-    split_videos_by_annotations(annotation_folder, video_folder, output_folder)
+    split_videos_by_annotations(annotation_folder, video_folder, output_folder, profile)
 
 if __name__ == "__main__":
     main()
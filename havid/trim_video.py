@@ -1,12 +1,16 @@
-import cv2
 import os
 
-def trim_video(input_folder, output_folder, frames_to_trim=5):
+from video_io import check_writer, close_video, close_writer, open_video, open_writer, read_frame, write_frame
+
+def trim_video(input_folder, output_folder, frames_to_trim=5, encoder=None, backend=None):
     """
     Trims the first `frames_to_trim` frames and the last `frames_to_trim` frames
     from each .mp4 video in `input_folder`, then saves the trimmed video to
-    `output_folder`, preserving the same filename.
+    `output_folder`, preserving the same filename. `encoder` is a key of
+    video_io.ENCODER_PRESETS (video_io.ENCODER by default), written with
+    `backend` (video_io.VIDEO_BACKEND by default).
     """
+    check_writer(backend, encoder)
 
     # Create the output folder if it doesn't exist
     os.makedirs(output_folder, exist_ok=True)
@@ -21,16 +25,15 @@ def trim_video(input_folder, output_folder, frames_to_trim=5):
         output_path = os.path.join(output_folder, filename)
 
         # Open the video
-        cap = cv2.VideoCapture(input_path)
-        if not cap.isOpened():
-            print(f"[WARNING] Could not open video: {input_path}")
+        video = open_video(input_path)
+        if video is None:
             continue
 
         # Get video properties
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        fps = cap.get(cv2.CAP_PROP_FPS)
-        width  = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        total_frames = video["num_frames"]
+        fps = video["fps"]
+        width  = video["width"]
+        height = video["height"]
 
         # Calculate the new start and end frames
         start_frame = frames_to_trim
@@ -39,29 +42,28 @@ def trim_video(input_folder, output_folder, frames_to_trim=5):
         # If the video is too short to trim, skip it (or handle as you wish)
         if end_frame <= start_frame:
             print(f"[WARNING] Video too short to trim: {filename} (frames={total_frames})")
-            cap.release()
+            close_video(video)
             continue
 
-        # Set up a VideoWriter to write the trimmed frames
-        fourcc = cv2.VideoWriter_fourcc(*'mp4v')  # or 'XVID', 'avc1', etc.
-        out = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
+        # Set up a writer for the trimmed frames
+        out = open_writer(output_path, fps, (width, height), backend, encoder)
 
         current_frame = 0
 
         # Read frames in a loop
         while True:
-            ret, frame = cap.read()
-            if not ret:
+            frame = read_frame(video)
+            if frame is None:
                 break
 
             # Write the frame if it's within our trimming range
             if start_frame <= current_frame < end_frame:
-                out.write(frame)
+                write_frame(out, frame)
 
             current_frame += 1
 
-        cap.release()
-        out.release()
+        close_video(video)
+        close_writer(out)
 
         print(f"Trimmed {filename}: removed first/last {frames_to_trim} frames.")
 
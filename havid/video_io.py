@@ -0,0 +1,375 @@
+import importlib.util
+import json
+import shutil
+import subprocess
+from fractions import Fraction
+
+import cv2
+import numpy as np
+
+# Configuration (Modify these as needed)
+VIDEO_BACKEND = "opencv"    # "opencv", "pyav" (needs the av package) or "ffmpeg" (needs ffmpeg/ffprobe on PATH)
+DECODE_THREADS = 0          # Decoder threads, 0 lets the backend decide
+ENCODER = "mp4v"            # Key of ENCODER_PRESETS used for written videos
+FFMPEG_BINARY = "ffmpeg"
+FFPROBE_BINARY = "ffprobe"
+
+# Encoder presets (Modify these as needed)
+#   fourcc:   codec of the OpenCV backend, which cannot set any encoder option
+#   codec:    encoder of the PyAV and ffmpeg backends
+#   options:  encoder options of the PyAV and ffmpeg backends, e.g. for libx264
+#             preset (speed/size trade-off), crf (quality, lower is better),
+#             g (GOP length in frames; 1 is intra-only: every frame is a keyframe)
+#             and tune=fastdecode (no CABAC/deblocking, cheaper to decode)
+#   backends: backends that write what the preset promises; OpenCV only gets the
+#             codec right, so presets defined by their options exclude it
+ENCODER_PRESETS = {
+    "mp4v": {"fourcc": "mp4v", "codec": "mpeg4", "options": {"flags": "+qscale", "global_quality": "590"},
+             "backends": ["opencv", "pyav", "ffmpeg"]},
+    "h264": {"fourcc": "avc1", "codec": "libx264", "options": {"preset": "medium", "crf": "23"},
+             "backends": ["pyav", "ffmpeg"]},
+    "h264_fast": {"fourcc": "avc1", "codec": "libx264",
+                  "options": {"preset": "veryfast", "crf": "26", "g": "32", "tune": "fastdecode"},
+                  "backends": ["pyav", "ffmpeg"]},
+    "h264_intra": {"fourcc": "avc1", "codec": "libx264",
+                   "options": {"preset": "veryfast", "crf": "23", "g": "1", "tune": "fastdecode"},
+                   "backends": ["pyav", "ffmpeg"]},
+    # Intra-only and writable by every OpenCV build
+    "mjpeg": {"fourcc": "MJPG", "codec": "mjpeg", "options": {"flags": "+qscale", "global_quality": "354"},
+              "backends": ["opencv", "pyav", "ffmpeg"]},
+}
+
+
+# OpenCV: cv2.VideoCapture / cv2.VideoWriter
+
+def _opencv_open(path, threads):
+    params = [cv2.CAP_PROP_N_THREADS, threads] if threads > 0 else []
+    cap = cv2.VideoCapture(path, cv2.CAP_ANY, params)
+    if not cap.isOpened():
+        return None
+    return {
+        "handle": cap,
+        "fps": cap.get(cv2.CAP_PROP_FPS),
+        "num_frames": int(cap.get(cv2.CAP_PROP_FRAME_COUNT)),
+        "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+    }
+
+
+def _opencv_read(video, out):
+    ret, frame = video["handle"].read(out) if out is not None else video["handle"].read()
+    return frame if ret else None
+
+
+def _opencv_grab(video):
+    return video["handle"].grab()
+
+
+def _opencv_seek(video, frame_number):
+    video["handle"].set(cv2.CAP_PROP_POS_FRAMES, frame_number)
+
+
+def _opencv_close(video):
+    video["handle"].release()
+
+
+def _opencv_open_writer(path, fps, size, preset):
+    out = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*preset["fourcc"]), fps, size)
+    if not out.isOpened():
+        raise RuntimeError(f"OpenCV cannot write {path} with fourcc {preset['fourcc']!r}")
+    return {"handle": out}
+
+
+def _opencv_write(writer, frame):
+    writer["handle"].write(frame)
+
+
+def _opencv_close_writer(writer):
+    writer["handle"].release()
+
+
+# PyAV: libav* through the av package
+
+def _pyav_open(path, threads):
+    import av
+    try:
+        container = av.open(path)
+    except av.error.FFmpegError:
+        return None
+    stream = container.streams.video[0]
+    stream.thread_type = "AUTO"
+    if threads > 0:
+        stream.thread_count = threads
+    fps = float(stream.average_rate or stream.guessed_rate or 0)
+    num_frames = stream.frames or (int(round(float(stream.duration * stream.time_base) * fps)) if stream.duration else 0)
+    return {
+        "handle": container,
+        "stream": stream,
+        "frames": container.decode(stream),
+        "fps": fps,
+        "num_frames": num_frames,
+        "width": stream.codec_context.width,
+        "height": stream.codec_context.height,
+    }
+
+
+def _pyav_next(video):
+    try:
+        return next(video["frames"])
+    except StopIteration:
+        return None
+
+
+def _pyav_read(video, out):
+    frame = _pyav_next(video)
+    if frame is None:
+        return None
+    array = frame.to_ndarray(format="bgr24")
+    if out is not None and out.shape == array.shape:
+        np.copyto(out, array)
+        return out
+    return array
+
+
+def _pyav_grab(video):
+    return _pyav_next(video) is not None
+
+
+def _pyav_seek(video, frame_number):
+    # Seek to the keyframe before the target, then decode up to it
+    stream = video["stream"]
+    if not video["fps"]:
+        return
+    ticks_per_frame = 1 / (video["fps"] * stream.time_base)
+    target = (stream.start_time or 0) + frame_number * ticks_per_frame
+    video["handle"].seek(int(target), stream=stream, backward=True, any_frame=False)
+    video["frames"] = video["handle"].decode(stream)
+    while True:
+        frame = _pyav_next(video)
+        if frame is None:
+            return
+        if frame.pts is not None and frame.pts >= target - ticks_per_frame / 2:
+            # Put the target frame back in front of the decoder
+            video["frames"] = _prepend(frame, video["frames"])
+            return
+
+
+def _prepend(frame, frames):
+    yield frame
+    yield from frames
+
+
+def _pyav_close(video):
+    video["handle"].close()
+
+
+def _pyav_open_writer(path, fps, size, preset):
+    import av
+    container = av.open(path, "w")
+    stream = container.add_stream(preset["codec"], rate=Fraction(fps).limit_denominator(1001))
+    stream.width, stream.height = size
+    stream.pix_fmt = "yuv420p"
+    stream.options = dict(preset["options"])
+    return {"handle": container, "stream": stream, "av": av}
+
+
+def _pyav_write(writer, frame):
+    video_frame = writer["av"].VideoFrame.from_ndarray(np.ascontiguousarray(frame), format="bgr24")
+    writer["handle"].mux(writer["stream"].encode(video_frame))
+
+
+def _pyav_close_writer(writer):
+    writer["handle"].mux(writer["stream"].encode(None))
+    writer["handle"].close()
+
+
+# ffmpeg: raw BGR frames through a subprocess pipe
+
+def _ffmpeg_probe(path):
+    result = subprocess.run([FFPROBE_BINARY, "-v", "error", "-select_streams", "v:0", "-count_packets",
+                             "-show_entries", "stream=width,height,avg_frame_rate,nb_read_packets",
+                             "-of", "json", path], capture_output=True, text=True)
+    streams = json.loads(result.stdout or "{}").get("streams", []) if result.returncode == 0 else []
+    return streams[0] if streams else None
+
+
+def _ffmpeg_start(video, frame_number):
+    if video.get("process") is not None:
+        video["process"].kill()
+        video["process"].wait()
+    command = [FFMPEG_BINARY, "-v", "error"]
+    if video["threads"] > 0:
+        command += ["-threads", str(video["threads"])]
+    if frame_number > 0:
+        # -ss before -i seeks to the keyframe and decodes up to the exact frame
+        command += ["-ss", f"{frame_number / video['fps']:.6f}"]
+    command += ["-i", video["path"], "-f", "rawvideo", "-pix_fmt", "bgr24", "-"]
+    video["process"] = subprocess.Popen(command, stdout=subprocess.PIPE, bufsize=video["width"] * video["height"] * 3)
+
+
+def _ffmpeg_open(path, threads):
+    if shutil.which(FFMPEG_BINARY) is None or shutil.which(FFPROBE_BINARY) is None:
+        raise RuntimeError(f"The ffmpeg backend needs {FFMPEG_BINARY} and {FFPROBE_BINARY} on PATH")
+    info = _ffmpeg_probe(path)
+    if info is None:
+        return None
+    video = {
+        "path": path,
+        "threads": threads,
+        "process": None,
+        "fps": float(Fraction(info["avg_frame_rate"])) if info.get("avg_frame_rate", "0/0") != "0/0" else 0.0,
+        "num_frames": int(info.get("nb_read_packets", 0)),
+        "width": int(info["width"]),
+        "height": int(info["height"]),
+    }
+    _ffmpeg_start(video, 0)
+    return video
+
+
+def _ffmpeg_read(video, out):
+    frame = out if out is not None else np.empty((video["height"], video["width"], 3), dtype=np.uint8)
+    view = memoryview(frame.reshape(-1))
+    filled = 0
+    while filled < len(view):
+        n = video["process"].stdout.readinto(view[filled:])
+        if not n:
+            return None
+        filled += n
+    return frame
+
+
+def _ffmpeg_grab(video):
+    return _ffmpeg_read(video, None) is not None
+
+
+def _ffmpeg_seek(video, frame_number):
+    _ffmpeg_start(video, frame_number)
+
+
+def _ffmpeg_close(video):
+    video["process"].stdout.close()
+    video["process"].kill()
+    video["process"].wait()
+
+
+def _ffmpeg_open_writer(path, fps, size, preset):
+    if shutil.which(FFMPEG_BINARY) is None:
+        raise RuntimeError(f"The ffmpeg backend needs {FFMPEG_BINARY} on PATH")
+    command = [FFMPEG_BINARY, "-v", "error", "-y", "-f", "rawvideo", "-pix_fmt", "bgr24",
+               "-s", f"{size[0]}x{size[1]}", "-r", f"{fps}", "-i", "-", "-c:v", preset["codec"]]
+    for key, value in preset["options"].items():
+        command += [f"-{key}", str(value)]
+    command += ["-pix_fmt", "yuv420p", path]
+    return {"process": subprocess.Popen(command, stdin=subprocess.PIPE)}
+
+
+def _ffmpeg_write(writer, frame):
+    writer["process"].stdin.write(np.ascontiguousarray(frame).data)
+
+
+def _ffmpeg_close_writer(writer):
+    writer["process"].stdin.close()
+    if writer["process"].wait() != 0:
+        print(f"[ERROR] ffmpeg exited with code {writer['process'].returncode}")
+
+
+BACKENDS = {
+    "opencv": {"open": _opencv_open, "read": _opencv_read, "grab": _opencv_grab, "seek": _opencv_seek,
+               "close": _opencv_close, "open_writer": _opencv_open_writer, "write": _opencv_write,
+               "close_writer": _opencv_close_writer},
+    "pyav": {"open": _pyav_open, "read": _pyav_read, "grab": _pyav_grab, "seek": _pyav_seek,
+             "close": _pyav_close, "open_writer": _pyav_open_writer, "write": _pyav_write,
+             "close_writer": _pyav_close_writer},
+    "ffmpeg": {"open": _ffmpeg_open, "read": _ffmpeg_read, "grab": _ffmpeg_grab, "seek": _ffmpeg_seek,
+               "close": _ffmpeg_close, "open_writer": _ffmpeg_open_writer, "write": _ffmpeg_write,
+               "close_writer": _ffmpeg_close_writer},
+}
+
+
+def open_video(path, backend=None, threads=None):
+    """
+    Opens a video for decoding with the given backend (VIDEO_BACKEND by
+    default). Returns a dictionary with fps, num_frames, width and height
+    plus the backend's state, or None if the video cannot be opened.
+    Frames are BGR uint8 arrays with every backend.
+    """
+    backend = backend or VIDEO_BACKEND
+    video = BACKENDS[backend]["open"](path, DECODE_THREADS if threads is None else threads)
+    if video is None:
+        print(f"[ERROR] Could not open video: {path}")
+        return None
+    video["backend"] = backend
+    return video
+
+
+def read_frame(video, out=None):
+    """
+    Decodes the next frame, into out when given. Returns None at the end.
+    """
+    return BACKENDS[video["backend"]]["read"](video, out)
+
+
+def grab_frame(video):
+    """
+    Skips the next frame without converting it. Returns False at the end.
+    """
+    return BACKENDS[video["backend"]]["grab"](video)
+
+
+def seek_frame(video, frame_number):
+    """
+    Moves the decoder so that the next read returns frame frame_number.
+    """
+    BACKENDS[video["backend"]]["seek"](video, frame_number)
+
+
+def close_video(video):
+    BACKENDS[video["backend"]]["close"](video)
+
+
+def backend_available(backend):
+    """
+    Whether the dependencies of a backend are installed.
+    """
+    if backend == "pyav":
+        return importlib.util.find_spec("av") is not None
+    if backend == "ffmpeg":
+        return shutil.which(FFMPEG_BINARY) is not None and shutil.which(FFPROBE_BINARY) is not None
+    return backend in BACKENDS
+
+
+def check_writer(backend=None, encoder=None):
+    """
+    Raises ValueError if the backend cannot apply the encoder preset, or
+    RuntimeError if the backend is not installed. Call it before starting a
+    batch so a profile that cannot be written fails once, up front.
+    """
+    backend = backend or VIDEO_BACKEND
+    encoder = encoder or ENCODER
+    if backend not in ENCODER_PRESETS[encoder]["backends"]:
+        raise ValueError(f"Encoder preset {encoder!r} needs one of the backends "
+                         f"{ENCODER_PRESETS[encoder]['backends']}, not {backend!r}")
+    if not backend_available(backend):
+        raise RuntimeError(f"Encoder preset {encoder!r} uses the {backend} backend, which is not installed "
+                           f"(pyav needs the av package, ffmpeg needs {FFMPEG_BINARY} and {FFPROBE_BINARY} on PATH)")
+
+
+def open_writer(path, fps, size, backend=None, encoder=None):
+    """
+    Opens path for writing BGR frames of size (width, height) at fps with an
+    encoder preset of ENCODER_PRESETS (ENCODER by default). Raises like
+    check_writer if the backend cannot write the preset.
+    """
+    backend = backend or VIDEO_BACKEND
+    check_writer(backend, encoder)
+    writer = BACKENDS[backend]["open_writer"](path, fps, size, ENCODER_PRESETS[encoder or ENCODER])
+    writer["backend"] = backend
+    return writer
+
+
+def write_frame(writer, frame):
+    BACKENDS[writer["backend"]]["write"](writer, frame)
+
+
+def close_writer(writer):
+    BACKENDS[writer["backend"]]["close_writer"](writer)
@@ -0,0 +1,92 @@
+import glob
+import importlib
+import os
+import sys
+
+import pytest
+
+HAVID = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "havid")
+sys.path.insert(0, HAVID)
+
+# Element keys of the multi-QA answers and their column in the decomposition
+QA_ELEMENTS = {"verb": 0, "manipulated_object": 1, "target_object": 2, "tool": 3}
+
+
+@pytest.fixture(scope="module")
+def mappings():
+    cwd = os.getcwd()
+    os.chdir(HAVID)     # The mapping paths are relative to havid/
+    try:
+        from evaluate_predictions import build_answer_vocabulary
+        from semantic_mappings import load_mappings
+        table = load_mappings()["table"]
+        yield table, build_answer_vocabulary(table)
+    finally:
+        os.chdir(cwd)
+
+
+def generator_labels(table):
+    # The generators spell a mistake "wrong"; task_mapping.txt calls it "w"
+    return [label for label in table["label_ids"] if label != "w"] + ["wrong"]
+
+
+def expected_task(label, table, vocabulary):
+    return table["label_ids"][label] if label in table["label_ids"] else vocabulary["wrong"]
+
+
+@pytest.mark.parametrize("module_name", sorted(
+    os.path.basename(path)[:-3] for path in glob.glob(os.path.join(HAVID, "generate_json_*.py"))
+    if "def read_annotation_file" in open(path, encoding="utf-8").read()))
+def test_generator_answers_parse(mappings, module_name):
+    from evaluate_predictions import parse_answer
+    from semantic_mappings import lookup_decomposition
+    table, vocabulary = mappings
+    generator = importlib.import_module(module_name)
+
+    labels = generator_labels(table)
+    if "CoT" in module_name:
+        labels.remove("wrong")  # The chain-of-thought templates have no branch for mistakes
+    for label in labels:
+        answers = generator.read_annotation_file(label, lookup_decomposition(table, label))[1]
+        if not isinstance(answers, dict):
+            answers = {"complete": answers}
+        task = expected_task(label, table, vocabulary)
+        for key, text in answers.items():
+            elements, parsed_task = parse_answer(text, vocabulary)
+            if key in QA_ELEMENTS:
+                assert elements[QA_ELEMENTS[key]] == int(table["indices"][task][QA_ELEMENTS[key]]), (label, key, text)
+            else:
+                assert parsed_task == task, (label, key, text)
+
+
+def test_record_builder_answers_parse(mappings):
+    from evaluate_predictions import parse_answer
+    from record_shards import record_answer
+    import generate_json_bimanual
+    import generate_json_context_windows
+    import generate_json_multi_view
+    table, vocabulary = mappings
+
+    for label in generator_labels(table):
+        window = {"label": label, "frames_before": [], "frames": [0], "frames_after": [], "labels_before": [],
+                  "labels_after": []}
+        records = [
+            generate_json_bimanual.build_record("clip.mp4", {"lh": label}, table),
+            generate_json_context_windows.build_record(window, ["0.jpg"], table),
+            generate_json_multi_view.build_record(label, [("View0", ["0.jpg"])], table),
+        ]
+        for record in records:
+            assert parse_answer(record_answer(record), vocabulary)[1] == expected_task(label, table, vocabulary), label
+
+
+def test_chain_of_thought_reference(mappings):
+    from evaluate_predictions import parse_answer
+    from record_shards import record_answer
+    table, vocabulary = mappings
+    label = next(iter(table["label_ids"]))
+    record = {"conversations": [
+        {"role": "user", "content": "<image>What did the left hand do?"},
+        {"role": "assistant", "content": {"chain_of_thought": "...",
+                                          "final_answer": f'Primitive task: "{table["rows"][label]["semantics"]}"'}},
+    ]}
+    assert parse_answer(record_answer(record), vocabulary)[1] == table["label_ids"][label]
@@ -0,0 +1,32 @@
+import os
+import sys
+
+import pytest
+
+HAVID = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "havid")
+sys.path.insert(0, HAVID)
+
+from record_shards import record_label  # noqa: E402
+
+
+@pytest.mark.parametrize("record, label", [
+    # split_videos clips and their extracted frames
+    ({"videos": ["../split_videos/lh_v0/S01A04I01M0_ibacb_6.mp4"]}, "ibacb"),
+    ({"images": ["../split_frames/S01A04I01M0_ibacb_6_3.jpg", "../split_frames/S01A04I01M0_ibacb_6_4.jpg"]}, "ibacb"),
+    ({"image": {"<image_1>": "S01A04I01M0_null_0_1.jpg"}}, "null"),
+    # split_videos_bimanual clips carry the joint label
+    ({"videos": ["S01A04I01M0_ibacb-null_2.mp4"]}, "ibacb-null"),
+    # crop_video appends _cropped to the clip name
+    ({"videos": ["../cropped_videos/lh_v0/S01A04I01M0_ibacb_6_cropped.mp4"]}, "ibacb"),
+    ({"images": ["S01A04I01M0_wrong_1_cropped_12.jpg"]}, "wrong"),
+    # Window clips hold one label per frame
+    ({"videos": ["S01A04I01M0_window_2.mp4"]}, None),
+    # Frame-number images (context windows, multi-view) have no label in their name ...
+    ({"images": ["../context_frames/S01A04I01M0_000123.jpg"]}, None),
+    # ... so their generators store it in the record
+    ({"images": ["../context_frames/S01A04I01M0_000123.jpg"], "label": "ibscb"}, "ibscb"),
+    ({"images": ["S01A04I01M0_000123.jpg", "S01A04I01S1_000123.jpg"], "label": "null"}, "null"),
+    ({"messages": []}, None),
+])
+def test_record_label(record, label):
+    assert record_label(record) == label